@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from accounts.models import User
+
+
+class Command(BaseCommand):
+    help = 'Corrige los contadores de notificaciones no leídas que no coinciden con la base de datos'
+
+    def handle(self, *args, **options):
+        corregidos = User.reconciliar_no_leidas()
+        self.stdout.write(self.style.SUCCESS(f'Contadores corregidos: {corregidos}'))
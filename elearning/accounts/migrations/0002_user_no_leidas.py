@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-18 05:50
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def inicializar_no_leidas(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    Notificacion = apps.get_model('courses', 'Notificacion')
+    User.objects.update(no_leidas=Coalesce(Subquery(
+        Notificacion.objects.filter(usuario=OuterRef('pk'), leida=False)
+        .order_by()
+        .values('usuario')
+        .annotate(total=Count('id'))
+        .values('total')
+    ), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('courses', '0006_cambioquiz'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='no_leidas',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(inicializar_no_leidas, migrations.RunPython.noop),
+    ]
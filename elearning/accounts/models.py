@@ -1,5 +1,8 @@
+from collections import defaultdict
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
 
 class User(AbstractUser):
     ROLES = (
@@ -9,7 +12,41 @@ class User(AbstractUser):
     )
     role = models.CharField(max_length=20, choices=ROLES, default='student')
     
+    # Contador desnormalizado: se carga junto con el usuario en cada petición
+    no_leidas = models.PositiveIntegerField(default=0, editable=False)
+    
     @property
     def notificaciones_no_leidas(self):
         """Retorna el número de notificaciones no leídas"""
-        return self.notificaciones.filter(leida=False).count()
\ No newline at end of file
+        return self.no_leidas
+    
+    @classmethod
+    def ajustar_no_leidas(cls, conteos):
+        """Suma (o resta, con valores negativos) al contador de varios usuarios: {usuario_id: delta}"""
+        por_delta = defaultdict(list)
+        for usuario_id, delta in conteos.items():
+            if delta:
+                por_delta[delta].append(usuario_id)
+        
+        for delta, usuario_ids in por_delta.items():
+            cls.objects.filter(id__in=usuario_ids).update(
+                no_leidas=Greatest(F('no_leidas') + delta, Value(0))
+            )
+    
+    @classmethod
+    def reconciliar_no_leidas(cls, usuario_ids=None):
+        """
+        Recalcula el contador de los usuarios (todos o los de `usuario_ids`) cuyo
+        valor no coincide con sus notificaciones; retorna cuántos se corrigieron
+        """
+        from courses.models import Notificacion
+        
+        reales = Coalesce(Subquery(
+            Notificacion.objects.filter(usuario=OuterRef('pk'), leida=False)
+            .order_by()
+            .values('usuario')
+            .annotate(total=Count('id'))
+            .values('total')
+        ), 0)
+        usuarios = cls.objects.all() if usuario_ids is None else cls.objects.filter(id__in=usuario_ids)
+        return usuarios.annotate(reales=reales).exclude(no_leidas=F('reales')).update(no_leidas=reales)
@@ -1,3 +1,29 @@
 from django.test import TestCase
 
-# Create your tests here.
+from courses.models import Notificacion
+from .models import User
+
+
+class ContadorNoLeidasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ana = User.objects.create_user('ana', password='x')
+        cls.beto = User.objects.create_user('beto', password='x')
+
+    def test_ajustar_no_baja_de_cero(self):
+        User.ajustar_no_leidas({self.ana.id: -5})
+        self.ana.refresh_from_db()
+        self.assertEqual(self.ana.no_leidas, 0)
+
+    def test_reconciliar_solo_los_usuarios_pedidos(self):
+        Notificacion.objects.create(usuario=self.ana, tipo='curso', titulo='t', mensaje='m')
+        User.objects.update(no_leidas=7)
+
+        self.assertEqual(User.reconciliar_no_leidas({self.ana.id}), 1)
+        self.ana.refresh_from_db()
+        self.beto.refresh_from_db()
+        self.assertEqual((self.ana.no_leidas, self.beto.no_leidas), (1, 7))
+
+        self.assertEqual(User.reconciliar_no_leidas(), 1)
+        self.beto.refresh_from_db()
+        self.assertEqual(self.beto.no_leidas, 0)
@@ -0,0 +1,135 @@
+"""
+Limpieza de intentos abandonados.
+
+Un intento que se abrió y nunca se envió queda con `completado=False`. Pasado
+`INTENTOS_ABANDONADOS_HORAS` ya nadie lo va a retomar: si tiene respuestas
+(autoguardadas) se califica con ellas, como si se hubiera enviado al acabarse
+el tiempo; si no tiene ninguna, o si el estudiante ya agotó sus intentos, se
+elimina. Se procesa por lotes, del más antiguo al más reciente.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from . import autoguardado
+from .claves import obtener_clave
+from .models import Enrollment, IntentoCuestionario, RespuestaEstudiante, ResumenCurso, ResumenQuiz
+
+
+def intentos_abandonados(limite):
+    """Intentos sin enviar abiertos antes de `limite` (usa el índice parcial intento_abierto_fecha_idx)"""
+    return IntentoCuestionario.objects.filter(completado=False, fecha_inicio__lt=limite)
+
+
+def barrer_intentos_abandonados(limite, batch_size=1000, dry_run=False, eliminar=False):
+    """
+    Califica o elimina los intentos abandonados antes de `limite`.
+    Con `eliminar=True` se eliminan todos, aunque tengan respuestas.
+    Retorna (calificados, eliminados); con `dry_run` solo cuenta los candidatos.
+    """
+    if dry_run:
+        return 0, intentos_abandonados(limite).count()
+
+    calificados = eliminados = 0
+    while True:
+        lote = list(
+            intentos_abandonados(limite).select_related('quiz').order_by('fecha_inicio', 'id')[:batch_size]
+        )
+        if not lote:
+            break
+        calificados_lote, eliminados_lote = _aplicar(*_clasificar(lote, eliminar))
+        calificados += calificados_lote
+        eliminados += eliminados_lote
+        if len(lote) < batch_size:
+            break
+    return calificados, eliminados
+
+
+def _clasificar(lote, eliminar):
+    """Separa el lote en (intentos a calificar con sus respuestas, intentos a eliminar)"""
+    ids = [intento.id for intento in lote]
+    selecciones = {intento_id: {} for intento_id in ids}
+    for intento_id, pregunta_id, opcion_id in RespuestaEstudiante.objects.filter(intento_id__in=ids).values_list(
+        'intento_id', 'pregunta_id', 'opcion_seleccionada_id'
+    ):
+        selecciones[intento_id][pregunta_id] = opcion_id
+
+    # Intentos completados de cada estudiante y quiz, para no pasar de `intentos_maximos`
+    completados = {
+        (estudiante_id, quiz_id): total
+        for estudiante_id, quiz_id, total in ResumenQuiz.objects.filter(
+            estudiante_id__in={intento.estudiante_id for intento in lote},
+            quiz_id__in={intento.quiz_id for intento in lote},
+        ).values_list('estudiante_id', 'quiz_id', 'total_intentos')
+    }
+
+    por_calificar, por_eliminar = [], []
+    for intento in lote:
+        clave = obtener_clave(intento.quiz_id)
+        # Lo autoguardado que nunca llegó a escribirse también cuenta
+        selecciones[intento.id].update(autoguardado.selecciones_en_cache(intento.id, clave.puntos))
+        # Una opción borrada después de elegirla ya no está en la clave
+        respuestas = {
+            pregunta_id: opcion_id for pregunta_id, opcion_id in selecciones[intento.id].items()
+            if clave.opcion_valida(pregunta_id, opcion_id)
+        }
+        par = (intento.estudiante_id, intento.quiz_id)
+        if eliminar or not respuestas or completados.get(par, 0) >= intento.quiz.intentos_maximos:
+            por_eliminar.append(intento)
+            continue
+        completados[par] = completados.get(par, 0) + 1
+        intento.aplicar_puntaje(*clave.calificar(respuestas))
+        por_calificar.append((intento, respuestas))
+    return por_calificar, por_eliminar
+
+
+def _aplicar(por_calificar, por_eliminar):
+    """Aplica la clasificación a los intentos que siguen sin enviar; retorna (calificados, eliminados)"""
+    ahora = timezone.now()
+    with transaction.atomic():
+        # El estudiante pudo enviar el intento después de leer el lote: se vuelven a leer
+        # bloqueados y se omiten los que ya no están abiertos
+        abiertos = set(
+            IntentoCuestionario.objects.select_for_update()
+            .filter(id__in=[intento.id for intento, _ in por_calificar] + [intento.id for intento in por_eliminar])
+            .filter(completado=False)
+            .values_list('id', flat=True)
+        )
+        por_calificar = [(intento, respuestas) for intento, respuestas in por_calificar if intento.id in abiertos]
+        por_eliminar = [intento for intento in por_eliminar if intento.id in abiertos]
+
+        RespuestaEstudiante.objects.bulk_create(
+            [
+                RespuestaEstudiante(intento=intento, pregunta_id=pregunta_id, opcion_seleccionada_id=opcion_id)
+                for intento, respuestas in por_calificar
+                for pregunta_id, opcion_id in respuestas.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['intento', 'pregunta'],
+            update_fields=['opcion_seleccionada'],
+            batch_size=1000,
+        )
+        for intento, _ in por_calificar:
+            intento.completado = True
+            intento.fecha_finalizacion = ahora
+        IntentoCuestionario.objects.bulk_update(
+            [intento for intento, _ in por_calificar],
+            ['puntaje_obtenido', 'puntaje_maximo', 'porcentaje', 'aprobado', 'completado', 'fecha_finalizacion'],
+            batch_size=500,
+        )
+        IntentoCuestionario.objects.filter(id__in=[intento.id for intento in por_eliminar], completado=False).delete()
+
+        # Solo los intentos calificados cambian los resúmenes
+        pares = {(intento.estudiante_id, intento.quiz) for intento, _ in por_calificar}
+        for estudiante_id, quiz in pares:
+            ResumenQuiz.recalcular(estudiante_id, quiz)
+        cursos = {(estudiante_id, quiz.curso_id) for estudiante_id, quiz in pares}
+        for inscripcion in Enrollment.objects.filter(
+            estudiante_id__in={estudiante_id for estudiante_id, _ in cursos},
+            curso_id__in={curso_id for _, curso_id in cursos},
+        ):
+            if (inscripcion.estudiante_id, inscripcion.curso_id) in cursos:
+                ResumenCurso.recalcular(inscripcion)
+
+        for intento in [intento for intento, _ in por_calificar] + por_eliminar:
+            autoguardado.descartar(intento.id, obtener_clave(intento.quiz_id).puntos)
+    return len(por_calificar), len(por_eliminar)
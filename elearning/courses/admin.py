@@ -1,5 +1,9 @@
+from collections import Counter
 from django.contrib import admin
-from .models import Curso, Leccion, Enrollment, Quiz, Pregunta, Opcion, IntentoCuestionario, RespuestaEstudiante, Notificacion
+from django.db import transaction
+from accounts.models import User
+from .models import Curso, Leccion, Enrollment, Quiz, Pregunta, Opcion, IntentoCuestionario, IntentoArchivado, RespuestaEstudiante, Notificacion, ResumenQuiz, ResumenCurso, Certificado
+from .replica import ListadoEnReplicaAdmin
 
 
 @admin.register(Curso)
@@ -18,7 +22,7 @@ class LeccionAdmin(admin.ModelAdmin):
 
 
 @admin.register(Enrollment)
-class EnrollmentAdmin(admin.ModelAdmin):
+class EnrollmentAdmin(ListadoEnReplicaAdmin, admin.ModelAdmin):
     list_display = ['estudiante', 'curso', 'fecha_inscripcion', 'completado']
     list_filter = ['completado', 'fecha_inscripcion']
     search_fields = ['estudiante__username', 'curso__titulo']
@@ -34,7 +38,7 @@ class OpcionInline(admin.TabularInline):
 
 @admin.register(Pregunta)
 class PreguntaAdmin(admin.ModelAdmin):
-    list_display = ['__str__', 'quiz', 'puntos', 'orden']
+    list_display = ['__str__', 'quiz', 'puntos', 'orden', 'num_opciones', 'num_correctas']
     list_filter = ['quiz']
     search_fields = ['texto', 'quiz__titulo']
     inlines = [OpcionInline]
@@ -42,14 +46,14 @@ class PreguntaAdmin(admin.ModelAdmin):
 
 @admin.register(Quiz)
 class QuizAdmin(admin.ModelAdmin):
-    list_display = ['titulo', 'curso', 'puntaje_minimo', 'intentos_maximos', 'deadline', 'activo']
+    list_display = ['titulo', 'curso', 'num_preguntas', 'puntaje_total', 'puntaje_minimo', 'intentos_maximos', 'deadline', 'activo']
     list_filter = ['activo', 'curso', 'fecha_creacion']
     search_fields = ['titulo', 'curso__titulo']
     ordering = ['curso', 'orden']
 
 
 @admin.register(IntentoCuestionario)
-class IntentoCuestionarioAdmin(admin.ModelAdmin):
+class IntentoCuestionarioAdmin(ListadoEnReplicaAdmin, admin.ModelAdmin):
     list_display = ['estudiante', 'quiz', 'porcentaje', 'aprobado', 'fecha_inicio', 'completado']
     list_filter = ['aprobado', 'completado', 'fecha_inicio']
     search_fields = ['estudiante__username', 'quiz__titulo']
@@ -57,23 +61,74 @@ class IntentoCuestionarioAdmin(admin.ModelAdmin):
 
 
 @admin.register(RespuestaEstudiante)
-class RespuestaEstudianteAdmin(admin.ModelAdmin):
+class RespuestaEstudianteAdmin(ListadoEnReplicaAdmin, admin.ModelAdmin):
     list_display = ['intento', 'pregunta', 'opcion_seleccionada', 'es_correcta']
     list_filter = ['fecha_respuesta']
     search_fields = ['intento__estudiante__username', 'pregunta__texto']
 
 
+@admin.register(IntentoArchivado)
+class IntentoArchivadoAdmin(ListadoEnReplicaAdmin, admin.ModelAdmin):
+    list_display = ['estudiante', 'quiz', 'porcentaje', 'aprobado', 'fecha_inicio', 'fecha_archivado']
+    list_filter = ['aprobado', 'fecha_archivado']
+    search_fields = ['estudiante__username', 'quiz__titulo']
+    ordering = ['-fecha_inicio']
+    list_select_related = ['estudiante', 'quiz']
+
+
+@admin.register(ResumenQuiz)
+class ResumenQuizAdmin(ListadoEnReplicaAdmin, admin.ModelAdmin):
+    list_display = ['estudiante', 'quiz', 'mejor_porcentaje', 'total_intentos', 'aprobado', 'fecha_actualizacion']
+    list_filter = ['aprobado']
+    search_fields = ['estudiante__username', 'quiz__titulo']
+    list_select_related = ['estudiante', 'quiz']
+
+
+@admin.register(ResumenCurso)
+class ResumenCursoAdmin(ListadoEnReplicaAdmin, admin.ModelAdmin):
+    list_display = ['inscripcion', 'promedio', 'quizzes_completados', 'total_quizzes', 'aprobado', 'fecha_actualizacion']
+    list_filter = ['aprobado']
+    search_fields = ['inscripcion__estudiante__username', 'inscripcion__curso__titulo']
+    list_select_related = ['inscripcion__estudiante', 'inscripcion__curso']
+
+
+@admin.register(Certificado)
+class CertificadoAdmin(admin.ModelAdmin):
+    list_display = ['codigo', 'inscripcion', 'promedio', 'fecha_emision', 'vigente']
+    list_filter = ['vigente', 'fecha_emision']
+    search_fields = ['codigo', 'inscripcion__estudiante__username', 'inscripcion__curso__titulo']
+    list_select_related = ['inscripcion__estudiante', 'inscripcion__curso']
+    readonly_fields = ['huella', 'codigo']
+
+
 # ========== ADMIN PARA NOTIFICACIONES ==========
 
 @admin.register(Notificacion)
-class NotificacionAdmin(admin.ModelAdmin):
+class NotificacionAdmin(ListadoEnReplicaAdmin, admin.ModelAdmin):
     list_display = ['usuario', 'tipo', 'titulo', 'leida', 'fecha_creacion']
     list_filter = ['tipo', 'leida', 'fecha_creacion']
     search_fields = ['usuario__username', 'titulo', 'mensaje']
     ordering = ['-fecha_creacion']
     
     def marcar_como_leidas(self, request, queryset):
-        queryset.update(leida=True)
+        # Se cuentan y se marcan las mismas filas, bloqueadas: un marcado concurrente no descuadra el contador
+        with transaction.atomic():
+            filas = list(queryset.filter(leida=False).select_for_update().values_list('id', 'usuario_id'))
+            Notificacion.objects.filter(id__in=[notificacion_id for notificacion_id, _ in filas]).update(leida=True)
+            conteos = Counter(usuario_id for _, usuario_id in filas)
+            User.ajustar_no_leidas({usuario_id: -total for usuario_id, total in conteos.items()})
     marcar_como_leidas.short_description = "Marcar seleccionadas como leídas"
     
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            super().delete_model(request, obj)
+            User.reconciliar_no_leidas({obj.usuario_id})
+    
+    def delete_queryset(self, request, queryset):
+        # La acción "eliminar seleccionadas" borra sin pasar por el contador: se recuenta a los afectados
+        with transaction.atomic():
+            usuario_ids = set(queryset.values_list('usuario_id', flat=True))
+            super().delete_queryset(request, queryset)
+            User.reconciliar_no_leidas(usuario_ids)
+    
     actions = [marcar_como_leidas]
\ No newline at end of file
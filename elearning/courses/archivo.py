@@ -0,0 +1,96 @@
+"""
+Archivo de intentos de cursos cerrados.
+
+Un curso está cerrado cuando ninguno de sus quizzes se puede realizar (todos
+están inactivos o con el deadline vencido). Sus intentos completados más
+antiguos que `ARCHIVO_INTENTOS_DIAS` pasan a `IntentoArchivado`: una fila por
+intento con las respuestas en una columna JSON, en lugar de una fila en
+`RespuestaEstudiante` por cada pregunta. Los resúmenes por quiz siguen
+contando los intentos archivados, así que calificaciones y certificados no
+cambian, y el resultado y el detalle del estudiante los leen igual que a los
+vigentes.
+"""
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .models import Curso, IntentoArchivado, IntentoCuestionario, Quiz, RespuestaEstudiante
+
+CAMPOS_ARCHIVADOS = (
+    'id', 'estudiante_id', 'quiz_id', 'fecha_inicio', 'fecha_finalizacion',
+    'puntaje_obtenido', 'puntaje_maximo', 'porcentaje', 'aprobado',
+)
+
+# Ids de los intentos que el lote en curso está archivando (ver `archivandose`)
+_archivando = ContextVar('archivando', default=frozenset())
+
+
+def archivandose(intento_id):
+    """Si el intento se elimina porque se está archivando: sin consultas, para no sumar una por fila del lote"""
+    return intento_id in _archivando.get()
+
+
+def cursos_cerrados():
+    """Cursos con quizzes, pero ninguno disponible para realizar"""
+    quizzes_abiertos = Quiz.objects.filter(curso=OuterRef('pk'), activo=True).filter(
+        Q(deadline__isnull=True) | Q(deadline__gt=timezone.now())
+    )
+    return Curso.objects.filter(Exists(Quiz.objects.filter(curso=OuterRef('pk')))).exclude(Exists(quizzes_abiertos))
+
+
+def intentos_archivables(limite, cursos=None):
+    """Intentos completados antes de `limite` de los cursos cerrados (o de los dados, si están cerrados)"""
+    cerrados = cursos_cerrados()
+    if cursos is not None:
+        cerrados = cerrados.filter(id__in=cursos)
+    return IntentoCuestionario.objects.filter(
+        completado=True,
+        fecha_inicio__lt=limite,
+        quiz__curso__in=cerrados,
+    )
+
+
+def archivar_intentos(limite, batch_size=1000, dry_run=False, cursos=None):
+    """
+    Mueve a `IntentoArchivado` los intentos archivables por lotes.
+    Retorna cuántos se archivaron (con `dry_run`, cuántos se archivarían).
+    """
+    candidatos = intentos_archivables(limite, cursos)
+    if dry_run:
+        return candidatos.count()
+
+    total = 0
+    while True:
+        lote = list(candidatos.order_by('id').values(*CAMPOS_ARCHIVADOS)[:batch_size])
+        if not lote:
+            break
+        _archivar(lote)
+        total += len(lote)
+        if len(lote) < batch_size:
+            break
+    return total
+
+
+def _archivar(lote):
+    ids = [fila['id'] for fila in lote]
+    respuestas = {intento_id: {} for intento_id in ids}
+    for intento_id, pregunta_id, opcion_id in RespuestaEstudiante.objects.filter(intento_id__in=ids).values_list(
+        'intento_id', 'pregunta_id', 'opcion_seleccionada_id'
+    ):
+        respuestas[intento_id][str(pregunta_id)] = opcion_id
+
+    with transaction.atomic():
+        IntentoArchivado.objects.bulk_create(
+            [IntentoArchivado(**fila, respuestas=respuestas[fila['id']]) for fila in lote],
+            batch_size=500,
+        )
+        RespuestaEstudiante.objects.filter(intento_id__in=ids).delete()
+        # Los resúmenes no cambian: ResumenQuiz ya cuenta los intentos archivados, y la
+        # señal post_delete de IntentoCuestionario omite los del lote
+        token = _archivando.set(frozenset(ids))
+        try:
+            IntentoCuestionario.objects.filter(id__in=ids).delete()
+        finally:
+            _archivando.reset(token)
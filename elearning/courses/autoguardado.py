@@ -0,0 +1,106 @@
+"""
+Autoguardado de respuestas mientras el estudiante resuelve un quiz.
+
+Cada clic se guarda primero en el cache (una clave por intento y pregunta, así
+dos clics casi simultáneos en preguntas distintas no se pisan) y solo se
+escribe en `RespuestaEstudiante` por lotes: cuando el intento acumula
+`AUTOGUARDADO_MAXIMO_PENDIENTES` cambios, cuando el primer cambio pendiente
+tiene más de `AUTOGUARDADO_SEGUNDOS`, cuando el navegador avisa que se cierra
+la página y, siempre, al enviar el quiz. Si la conexión se cae, el estudiante
+vuelve a abrir el intento y ve marcadas las respuestas que ya había elegido.
+
+Los lotes solo se hacen con un cache compartido: con el cache en memoria de
+cada proceso, lo pendiente no lo ve ningún otro proceso y se pierde si el
+proceso se reinicia, así que cada clic se escribe directamente.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from elearning.cache import CACHES_LOCALES
+
+from .models import RespuestaEstudiante
+
+# Lo que se guarda en el cache dura, como mucho, un día sin actividad
+SEGUNDOS_EN_CACHE = 24 * 60 * 60
+
+
+def _clave_respuesta(intento_id, pregunta_id):
+    return f'autoguardado:{intento_id}:{pregunta_id}'
+
+
+def _clave_pendientes(intento_id):
+    return f'autoguardado:{intento_id}:pendientes'
+
+
+def _clave_desde(intento_id):
+    return f'autoguardado:{intento_id}:desde'
+
+
+def _cache_compartido():
+    return settings.CACHES['default']['BACKEND'] not in CACHES_LOCALES
+
+
+def selecciones_en_cache(intento_id, pregunta_ids):
+    """{pregunta_id: opcion_id} de lo guardado en el cache para las preguntas dadas"""
+    claves = {_clave_respuesta(intento_id, pregunta_id): pregunta_id for pregunta_id in pregunta_ids}
+    return {claves[clave]: opcion_id for clave, opcion_id in cache.get_many(claves).items()}
+
+
+def selecciones_guardadas(intento, pregunta_ids):
+    """Respuestas del intento ya escritas en la base de datos, actualizadas con las del cache"""
+    selecciones = dict(intento.respuestas.values_list('pregunta_id', 'opcion_seleccionada_id'))
+    selecciones.update(selecciones_en_cache(intento.id, pregunta_ids))
+    return selecciones
+
+
+def registrar(intento, pregunta_id, opcion_id, pregunta_ids, forzar=False):
+    """
+    Guarda la opción elegida en el cache y, si toca, escribe en la base de datos
+    todas las respuestas pendientes del intento. Retorna (pendientes, escrito).
+    """
+    forzar = forzar or not _cache_compartido()
+    cache.set(_clave_respuesta(intento.id, pregunta_id), opcion_id, SEGUNDOS_EN_CACHE)
+    cache.add(_clave_desde(intento.id), time.time(), SEGUNDOS_EN_CACHE)
+    cache.add(_clave_pendientes(intento.id), 0, SEGUNDOS_EN_CACHE)
+    try:
+        pendientes = cache.incr(_clave_pendientes(intento.id))
+    except ValueError:
+        # La clave expiró justo entre el add y el incr
+        pendientes = 1
+
+    desde = cache.get(_clave_desde(intento.id)) or time.time()
+    if (
+        forzar
+        or pendientes >= settings.AUTOGUARDADO_MAXIMO_PENDIENTES
+        or time.time() - desde >= settings.AUTOGUARDADO_SEGUNDOS
+    ):
+        escribir_pendientes(intento, pregunta_ids)
+        return 0, True
+    return pendientes, False
+
+
+def escribir_pendientes(intento, pregunta_ids):
+    """Escribe en `RespuestaEstudiante` lo que el intento tiene en el cache, en una sola consulta"""
+    # Se reinicia antes de leer: un clic que llegue mientras tanto cuenta para el siguiente lote
+    cache.delete_many([_clave_pendientes(intento.id), _clave_desde(intento.id)])
+    selecciones = selecciones_en_cache(intento.id, pregunta_ids)
+    RespuestaEstudiante.objects.bulk_create(
+        [
+            RespuestaEstudiante(intento=intento, pregunta_id=pregunta_id, opcion_seleccionada_id=opcion_id)
+            for pregunta_id, opcion_id in selecciones.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['intento', 'pregunta'],
+        update_fields=['opcion_seleccionada'],
+    )
+
+
+def descartar(intento_id, pregunta_ids):
+    """Borra del cache lo autoguardado de un intento (después de enviarlo)"""
+    claves = [_clave_respuesta(intento_id, pregunta_id) for pregunta_id in pregunta_ids]
+    transaction.on_commit(
+        lambda: cache.delete_many([*claves, _clave_pendientes(intento_id), _clave_desde(intento_id)])
+    )
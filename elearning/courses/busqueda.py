@@ -0,0 +1,255 @@
+"""
+Índice de búsqueda de texto completo sobre cursos y lecciones.
+
+En SQLite se usa una tabla virtual FTS5; en PostgreSQL una tabla con columnas
+`tsvector` generadas e índices GIN. Ambas se llaman igual y tienen las mismas
+columnas (tipo, objeto_id, curso_id, titulo, cuerpo, contenido), así que el
+resto del código solo cambia en la consulta de búsqueda.
+
+`titulo` y `cuerpo` son públicos (lo que detalle_curso muestra a cualquiera);
+`contenido` es el texto de las lecciones, que solo ven los inscritos y los
+instructores: sus coincidencias y fragmentos solo aparecen para ellos.
+
+Cada fila se identifica con una clave numérica derivada de (tipo, objeto_id):
+el `rowid` en FTS5 (cuyas demás columnas no tienen índice) y la clave primaria
+en PostgreSQL, para reemplazar o quitar un documento sin recorrer el índice.
+"""
+import re
+from django.db import connection, transaction
+from django.utils.html import escape, strip_tags
+from django.utils.safestring import mark_safe
+
+TABLA = 'courses_busqueda'
+
+# Marcadores para resaltar coincidencias; se escapa el texto y luego se cambian por <mark>
+_INICIO, _FIN = '\x02', '\x03'
+
+
+def _es_postgres(conexion=None):
+    return (conexion or connection).vendor == 'postgresql'
+
+
+def _columna_clave():
+    return 'clave' if _es_postgres() else 'rowid'
+
+
+def clave_documento(tipo, objeto_id):
+    """Clave numérica única de un documento: cursos en los pares, lecciones en los impares"""
+    return objeto_id * 2 + (1 if tipo == 'leccion' else 0)
+
+
+def crear_tabla(conexion):
+    """Crea la tabla del índice según el motor de base de datos"""
+    with conexion.cursor() as cursor:
+        if _es_postgres(conexion):
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {TABLA} (
+                    clave bigint PRIMARY KEY,
+                    tipo varchar(10) NOT NULL,
+                    objeto_id bigint NOT NULL,
+                    curso_id bigint NOT NULL,
+                    titulo text NOT NULL,
+                    cuerpo text NOT NULL,
+                    contenido text NOT NULL,
+                    documento_publico tsvector GENERATED ALWAYS AS (
+                        setweight(to_tsvector('spanish', titulo), 'A') ||
+                        setweight(to_tsvector('spanish', cuerpo), 'B')
+                    ) STORED,
+                    documento tsvector GENERATED ALWAYS AS (
+                        setweight(to_tsvector('spanish', titulo), 'A') ||
+                        setweight(to_tsvector('spanish', cuerpo), 'B') ||
+                        setweight(to_tsvector('spanish', contenido), 'B')
+                    ) STORED
+                )
+            """)
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {TABLA}_publico_idx ON {TABLA} USING GIN (documento_publico)")
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {TABLA}_documento_idx ON {TABLA} USING GIN (documento)")
+        else:
+            cursor.execute(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS {TABLA} USING fts5(
+                    tipo UNINDEXED, objeto_id UNINDEXED, curso_id UNINDEXED, titulo, cuerpo, contenido,
+                    tokenize = 'unicode61 remove_diacritics 2'
+                )
+            """)
+
+
+def eliminar_tabla(conexion):
+    with conexion.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLA}")
+
+
+# ========== DOCUMENTOS ==========
+
+def documento_curso(curso):
+    return ('curso', curso.id, curso.id, curso.titulo, strip_tags(curso.descripcion), '')
+
+
+def documento_leccion(leccion):
+    return (
+        'leccion', leccion.id, leccion.curso_id, leccion.titulo,
+        leccion.descripcion or '', strip_tags(leccion.contenido_texto or ''),
+    )
+
+
+def _guardar(cursor, documentos):
+    documentos = list(documentos)
+    if not documentos:
+        return
+    # FTS5 no admite restricciones UNIQUE, así que en ambos motores se reemplaza borrando primero
+    claves = [(clave_documento(tipo, objeto_id),) for tipo, objeto_id, *_ in documentos]
+    cursor.executemany(f"DELETE FROM {TABLA} WHERE {_columna_clave()} = %s", claves)
+    cursor.executemany(
+        f"INSERT INTO {TABLA} ({_columna_clave()}, tipo, objeto_id, curso_id, titulo, cuerpo, contenido) "
+        f"VALUES (%s, %s, %s, %s, %s, %s, %s)",
+        [(clave, *documento) for (clave,), documento in zip(claves, documentos)]
+    )
+
+
+def indexar_curso(curso):
+    with transaction.atomic(), connection.cursor() as cursor:
+        _guardar(cursor, [documento_curso(curso)])
+
+
+def indexar_leccion(leccion):
+    with transaction.atomic(), connection.cursor() as cursor:
+        _guardar(cursor, [documento_leccion(leccion)])
+
+
+def quitar_del_indice(tipo, objeto_id):
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLA} WHERE {_columna_clave()} = %s", [clave_documento(tipo, objeto_id)])
+
+
+def quitar_curso_del_indice(curso_id):
+    """Quita el curso y todas sus lecciones"""
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLA} WHERE curso_id = %s", [curso_id])
+
+
+def reconstruir_indice(Curso, Leccion, tamano_lote=500):
+    """
+    Vacía el índice y lo vuelve a llenar por lotes. Recibe los modelos para
+    poder usarse también desde las migraciones. Retorna (cursos, lecciones).
+    """
+    totales = {'curso': 0, 'leccion': 0}
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLA}")
+        consultas = [
+            (Curso.objects.order_by('id'), documento_curso),
+            (Leccion.objects.only('id', 'curso_id', 'titulo', 'descripcion', 'contenido_texto').order_by('id'), documento_leccion),
+        ]
+        for consulta, documento in consultas:
+            lote = []
+            for objeto in consulta.iterator(chunk_size=tamano_lote):
+                lote.append(documento(objeto))
+                if len(lote) >= tamano_lote:
+                    _guardar(cursor, lote)
+                    totales[lote[0][0]] += len(lote)
+                    lote = []
+            if lote:
+                _guardar(cursor, lote)
+                totales[lote[0][0]] += len(lote)
+    return totales['curso'], totales['leccion']
+
+
+# ========== BÚSQUEDA ==========
+
+def _consulta_fts5(texto):
+    """
+    Convierte el texto del usuario en una consulta FTS5 segura: cada palabra se
+    cita (para que no se interprete la sintaxis de FTS5) y se busca por prefijo.
+    """
+    palabras = re.findall(r'\w+', texto)
+    return ' '.join(f'"{palabra}"*' for palabra in palabras)
+
+
+def _resaltar(fragmento):
+    return mark_safe(escape(fragmento).replace(_INICIO, '<mark>').replace(_FIN, '</mark>'))
+
+
+def buscar(texto, limite=20, desplazamiento=0, cursos_con_contenido=None):
+    """
+    Resultados ordenados por relevancia (el título pesa más que el cuerpo). Cada
+    resultado es un dict con tipo, objeto_id, curso_id, titulo y fragmento (HTML
+    seguro con las coincidencias resaltadas).
+
+    `cursos_con_contenido` son los ids de los cursos cuyo contenido de lecciones
+    puede ver quien busca; en los demás solo se busca en títulos y descripciones.
+    None significa todos (instructores y administradores).
+    """
+    todos = cursos_con_contenido is None
+    cursos = sorted(cursos_con_contenido or ())
+    if _es_postgres():
+        if not texto.strip():
+            return []
+        # Sin cursos con contenido visible, la condición queda en falso y solo se usa documento_publico
+        visible = 'TRUE' if todos else 'curso_id = ANY(%s)'
+        parametros_visible = [] if todos else [cursos]
+        sql = f"""
+            SELECT tipo, objeto_id, curso_id, titulo,
+                   ts_headline('spanish', CASE WHEN {visible} THEN cuerpo || ' ' || contenido ELSE cuerpo END,
+                               consulta, %s) AS fragmento
+            FROM {TABLA}, websearch_to_tsquery('spanish', %s) AS consulta
+            WHERE documento_publico @@ consulta OR ({visible} AND documento @@ consulta)
+            ORDER BY ts_rank_cd(CASE WHEN {visible} THEN documento ELSE documento_publico END, consulta) DESC,
+                     tipo, objeto_id
+            LIMIT %s OFFSET %s
+        """
+        opciones = f'StartSel={_INICIO}, StopSel={_FIN}, MaxWords=25, MinWords=10, MaxFragments=2'
+        parametros = [
+            *parametros_visible, opciones, texto, *parametros_visible, *parametros_visible,
+            limite, desplazamiento,
+        ]
+    else:
+        consulta = _consulta_fts5(texto)
+        if not consulta:
+            return []
+        completa = f"""
+            SELECT tipo, objeto_id, curso_id, titulo,
+                   snippet({TABLA}, -1, %s, %s, '…', 16) AS fragmento,
+                   bm25({TABLA}, 0, 0, 0, 10.0, 1.0, 1.0) AS rango
+            FROM {TABLA}
+            WHERE {TABLA} MATCH %s
+        """
+        # Columnas públicas: el filtro de columnas de FTS5 deja fuera a `contenido`
+        publica = f"""
+            SELECT tipo, objeto_id, curso_id, titulo,
+                   snippet({TABLA}, 4, %s, %s, '…', 16) AS fragmento,
+                   bm25({TABLA}, 0, 0, 0, 10.0, 1.0, 1.0) AS rango
+            FROM {TABLA}
+            WHERE {TABLA} MATCH %s
+        """
+        if todos:
+            partes, parametros = [completa], [_INICIO, _FIN, consulta]
+        elif not cursos:
+            partes, parametros = [publica], [_INICIO, _FIN, f'{{titulo cuerpo}} : ({consulta})']
+        else:
+            marcadores = ', '.join(['%s'] * len(cursos))
+            partes = [
+                f'{completa} AND curso_id IN ({marcadores})',
+                f'{publica} AND curso_id NOT IN ({marcadores})',
+            ]
+            parametros = [
+                _INICIO, _FIN, consulta, *cursos,
+                _INICIO, _FIN, f'{{titulo cuerpo}} : ({consulta})', *cursos,
+            ]
+        sql = f"""
+            SELECT tipo, objeto_id, curso_id, titulo, fragmento
+            FROM ({' UNION ALL '.join(partes)})
+            ORDER BY rango, tipo, objeto_id
+            LIMIT %s OFFSET %s
+        """
+        parametros += [limite, desplazamiento]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, parametros)
+        return [
+            {
+                'tipo': tipo,
+                'objeto_id': objeto_id,
+                'curso_id': curso_id,
+                'titulo': titulo,
+                'fragmento': _resaltar(fragmento or ''),
+            }
+            for tipo, objeto_id, curso_id, titulo, fragmento in cursor.fetchall()
+        ]
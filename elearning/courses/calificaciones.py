@@ -0,0 +1,177 @@
+from collections import defaultdict
+from django.db.models import Count, Q, Value
+from django.db.models.functions import Coalesce, Lower
+from .models import IntentoCuestionario, IntentoArchivado, Enrollment, ResumenQuiz, PROMEDIO_APROBATORIO
+
+
+class LibroCalificaciones:
+    """
+    Matriz estudiante × quiz de un curso construida con consultas agregadas.
+
+    En lugar de buscar el mejor intento de cada estudiante en cada quiz, se
+    leen los resúmenes por (estudiante, quiz) que se mantienen al completar
+    cada intento. Promedios y aprobación por quiz se resuelven en memoria; el
+    libro se construye solo para las inscripciones de la página o lote pedido.
+    """
+
+    def __init__(self, curso, inscripciones=None, quizzes=None):
+        self.curso = curso
+        self.quizzes = quizzes if quizzes is not None else list(curso.quizzes.all().order_by('orden'))
+
+        if inscripciones is None:
+            self.inscripciones = list(Enrollment.objects.filter(curso=curso).select_related('estudiante'))
+            self._mejores = self._cargar_mejores()
+        else:
+            self.inscripciones = list(inscripciones)
+            self._mejores = self._cargar_mejores([inscripcion.estudiante_id for inscripcion in self.inscripciones])
+        self._filas = None
+
+    def _cargar_mejores(self, estudiantes=None):
+        """Mejor porcentaje, intentos y aprobación por (estudiante, quiz) en una sola consulta"""
+        resumenes = ResumenQuiz.objects.filter(quiz__curso=self.curso)
+        if estudiantes is not None:
+            resumenes = resumenes.filter(estudiante_id__in=estudiantes)
+
+        return {
+            (fila['estudiante_id'], fila['quiz_id']): fila
+            for fila in resumenes.values(
+                'estudiante_id', 'quiz_id', 'mejor_porcentaje', 'total_intentos', 'aprobado'
+            )
+        }
+
+    @property
+    def total_quizzes(self):
+        return len(self.quizzes)
+
+    def _construir_fila(self, inscripcion):
+        estudiante = inscripcion.estudiante
+        calificaciones = []
+        suma_porcentajes = 0
+        quizzes_completados = 0
+
+        for quiz in self.quizzes:
+            resumen = self._mejores.get((estudiante.id, quiz.id))
+            mejor = resumen['mejor_porcentaje'] if resumen else None
+            calificaciones.append({
+                'quiz': quiz,
+                'porcentaje': mejor,
+                'aprobado': resumen['aprobado'] if resumen else False,
+                'total_intentos': resumen['total_intentos'] if resumen else 0,
+            })
+            if mejor is not None:
+                suma_porcentajes += mejor
+                quizzes_completados += 1
+
+        promedio = suma_porcentajes / quizzes_completados if quizzes_completados > 0 else 0
+        aprobado = promedio >= PROMEDIO_APROBATORIO and quizzes_completados == self.total_quizzes
+
+        return {
+            'estudiante': estudiante,
+            'inscripcion': inscripcion,
+            'calificaciones': calificaciones,
+            'promedio': promedio,
+            'quizzes_completados': quizzes_completados,
+            'total_quizzes': self.total_quizzes,
+            'aprobado': aprobado,
+        }
+
+    def filas(self):
+        """Todas las filas del libro, en orden de inscripción"""
+        if self._filas is None:
+            self._filas = [self._construir_fila(inscripcion) for inscripcion in self.inscripciones]
+        return self._filas
+
+
+# Órdenes disponibles en el libro: parámetro GET -> campo anotado en las inscripciones
+ORDENES = {
+    'estudiante': 'orden_estudiante',
+    'promedio': 'orden_promedio',
+    'completados': 'orden_completados',
+}
+
+
+def consultar_inscripciones(curso, busqueda='', estado='', orden=''):
+    """
+    Inscripciones del curso con filtros y orden resueltos en la base de datos a
+    partir de los resúmenes por inscripción. Retorna el queryset y el orden a
+    usar para paginar por cursor.
+    """
+    inscripciones = Enrollment.objects.filter(curso=curso).select_related('estudiante').annotate(
+        orden_estudiante=Lower('estudiante__username'),
+        orden_promedio=Coalesce('resumen__promedio', Value(0.0)),
+        orden_completados=Coalesce('resumen__quizzes_completados', Value(0)),
+    )
+
+    if busqueda:
+        inscripciones = inscripciones.filter(
+            Q(estudiante__username__icontains=busqueda)
+            | Q(estudiante__email__icontains=busqueda)
+            | Q(estudiante__first_name__icontains=busqueda)
+            | Q(estudiante__last_name__icontains=busqueda)
+        )
+
+    if estado == 'aprobado':
+        inscripciones = inscripciones.filter(resumen__aprobado=True)
+    elif estado == 'reprobado':
+        inscripciones = inscripciones.exclude(resumen__aprobado=True)
+
+    campo = ORDENES.get(orden.lstrip('-'), 'fecha_inscripcion')
+    if orden.startswith('-'):
+        return inscripciones, (f'-{campo}', '-id')
+    return inscripciones, (campo, 'id')
+
+
+def resumen_curso(curso):
+    """Totales de estudiantes, aprobados y reprobados del curso con una consulta agregada"""
+    totales = Enrollment.objects.filter(curso=curso).aggregate(
+        total=Count('id'),
+        aprobados=Count('id', filter=Q(resumen__aprobado=True)),
+    )
+    return {
+        'total_estudiantes': totales['total'],
+        'total_aprobados': totales['aprobados'],
+        'total_reprobados': totales['total'] - totales['aprobados'],
+    }
+
+
+def iterar_filas(curso, tamano_lote=500):
+    """
+    Genera las filas del libro de calificaciones por lotes de inscripciones, de
+    modo que la memoria no crece con el tamaño del curso.
+    """
+    quizzes = list(curso.quizzes.all().order_by('orden'))
+    inscripciones = Enrollment.objects.filter(curso=curso).select_related('estudiante').order_by('id')
+
+    lote = []
+    for inscripcion in inscripciones.iterator(chunk_size=tamano_lote):
+        lote.append(inscripcion)
+        if len(lote) >= tamano_lote:
+            yield from LibroCalificaciones(curso, inscripciones=lote, quizzes=quizzes).filas()
+            lote = []
+    if lote:
+        yield from LibroCalificaciones(curso, inscripciones=lote, quizzes=quizzes).filas()
+
+
+def intentos_por_quiz(curso, estudiante):
+    """
+    Intentos completados de un estudiante en un curso, vigentes y archivados,
+    agrupados por quiz y del más reciente al más antiguo
+    """
+    agrupados = defaultdict(list)
+    intentos = IntentoCuestionario.objects.filter(
+        estudiante=estudiante,
+        quiz__curso=curso,
+        completado=True
+    ).order_by('-fecha_inicio')
+    archivados = IntentoArchivado.objects.filter(
+        estudiante=estudiante,
+        quiz__curso=curso
+    ).defer('respuestas').order_by('-fecha_inicio')
+
+    for intento in intentos:
+        agrupados[intento.quiz_id].append(intento)
+    for intento in archivados:
+        agrupados[intento.quiz_id].append(intento)
+    for lista in agrupados.values():
+        lista.sort(key=lambda intento: intento.fecha_inicio, reverse=True)
+    return agrupados
@@ -0,0 +1,101 @@
+import hashlib
+from io import BytesIO
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+from reportlab.lib.units import inch
+from .models import Certificado
+
+
+def huella_certificado(estudiante_id, curso_id, promedio, fecha_emision):
+    """Huella del contenido del certificado; cambia solo si cambia la calificación o la fecha"""
+    datos = f'{estudiante_id}:{curso_id}:{promedio:.1f}:{fecha_emision.isoformat()}'
+    return hashlib.sha256(datos.encode()).hexdigest()
+
+
+def dibujar_certificado(estudiante, curso, promedio, fecha_emision, codigo, url_verificacion):
+    """Genera el PDF del certificado con ReportLab y retorna sus bytes"""
+    buffer = BytesIO()
+    p = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    
+    # Configurar el certificado
+    p.setFont("Helvetica-Bold", 36)
+    p.drawCentredString(width/2, height - 2*inch, "CERTIFICADO")
+    
+    p.setFont("Helvetica", 16)
+    p.drawCentredString(width/2, height - 2.8*inch, "Se otorga a:")
+    
+    p.setFont("Helvetica-Bold", 24)
+    p.drawCentredString(width/2, height - 3.5*inch, estudiante.get_full_name() or estudiante.username)
+    
+    p.setFont("Helvetica", 16)
+    p.drawCentredString(width/2, height - 4.2*inch, "Por haber completado exitosamente el curso:")
+    
+    p.setFont("Helvetica-Bold", 20)
+    p.drawCentredString(width/2, height - 4.9*inch, curso.titulo)
+    
+    p.setFont("Helvetica", 14)
+    p.drawCentredString(width/2, height - 5.6*inch, f"Con un promedio de: {promedio:.1f}%")
+    
+    p.setFont("Helvetica-Oblique", 12)
+    p.drawCentredString(width/2, height - 6.3*inch, f"Instructor: {curso.instructor}")
+    p.drawCentredString(width/2, height - 6.7*inch, f"Fecha: {fecha_emision.strftime('%d de %B de %Y')}")
+    
+    # Línea decorativa
+    p.line(2*inch, height - 7.5*inch, width - 2*inch, height - 7.5*inch)
+    
+    p.setFont("Helvetica", 10)
+    p.drawCentredString(width/2, 1.4*inch, f"Código de verificación: {codigo} - {url_verificacion}")
+    p.drawCentredString(width/2, 1*inch, "E-learning Platform - Certificado de Finalización")
+    
+    p.showPage()
+    p.save()
+    return buffer.getvalue()
+
+
+def obtener_certificado(inscripcion, promedio, url_verificacion):
+    """
+    Retorna el certificado vigente de la inscripción. Solo se genera un PDF nuevo
+    si el último certificado emitido tiene otro promedio (o si su archivo se perdió);
+    en ese caso los anteriores dejan de estar vigentes.
+    `url_verificacion` recibe el código y retorna la URL pública de verificación.
+    """
+    promedio = round(promedio, 1)
+    certificado = inscripcion.certificados.filter(vigente=True).first()
+    if certificado and certificado.promedio != promedio:
+        certificado = None
+    if certificado and certificado.archivo and certificado.archivo.storage.exists(certificado.archivo.name):
+        return certificado
+    
+    if certificado is None:
+        fecha_emision = timezone.localdate()
+        huella = huella_certificado(inscripcion.estudiante_id, inscripcion.curso_id, promedio, fecha_emision)
+        with transaction.atomic():
+            certificado, _ = Certificado.objects.get_or_create(
+                huella=huella,
+                defaults={
+                    'inscripcion': inscripcion,
+                    'promedio': promedio,
+                    'fecha_emision': fecha_emision,
+                    'codigo': huella[:12].upper(),
+                }
+            )
+            # Si el promedio vuelve el mismo día a un valor anterior, se reutiliza ese certificado
+            if not certificado.vigente:
+                certificado.vigente = True
+                certificado.save(update_fields=['vigente'])
+            inscripcion.certificados.filter(vigente=True).exclude(id=certificado.id).update(vigente=False)
+    
+    contenido = dibujar_certificado(
+        inscripcion.estudiante,
+        inscripcion.curso,
+        certificado.promedio,
+        certificado.fecha_emision,
+        certificado.codigo,
+        url_verificacion(certificado.codigo),
+    )
+    certificado.archivo.save(f'{certificado.huella}.pdf', ContentFile(contenido), save=True)
+    return certificado
@@ -0,0 +1,159 @@
+import threading
+from collections import OrderedDict
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from .models import Quiz, Pregunta, Opcion, IntentoCuestionario, IntentoArchivado, RespuestaEstudiante, ResumenQuiz, ResumenCurso
+
+
+# Claves compiladas en este proceso: {quiz_id: ClaveRespuestas}, de la menos a la más usada.
+# Solo se guardan las MAXIMO_CLAVES_LOCALES más recientes; el resto sigue en el cache compartido.
+MAXIMO_CLAVES_LOCALES = 256
+_claves_locales = OrderedDict()
+_candado_claves = threading.Lock()
+
+
+def version_clave(quiz_id):
+    """Versión vigente de la clave de un quiz (se incrementa con cada cambio de preguntas u opciones)"""
+    return Quiz.objects.filter(id=quiz_id).values_list('version_clave', flat=True).first() or 0
+
+
+def invalidar_clave(quiz_id):
+    """
+    Incrementa la versión guardada en el quiz para que todos los procesos
+    recompilen la clave, aunque no compartan el cache. Se escribe después del
+    cambio y dentro de su transacción si la hay: nadie ve la versión nueva sin
+    ver también las preguntas y opciones nuevas.
+    """
+    Quiz.objects.filter(id=quiz_id).update(version_clave=F('version_clave') + 1)
+    transaction.on_commit(lambda: _descartar_local(quiz_id))
+
+
+def _descartar_local(quiz_id):
+    with _candado_claves:
+        _claves_locales.pop(quiz_id, None)
+
+
+def _clave_local(quiz_id, version):
+    with _candado_claves:
+        clave = _claves_locales.get(quiz_id)
+        if clave is None or clave.version != version:
+            return None
+        _claves_locales.move_to_end(quiz_id)
+        return clave
+
+
+def _guardar_local(clave):
+    with _candado_claves:
+        _claves_locales[clave.quiz_id] = clave
+        _claves_locales.move_to_end(clave.quiz_id)
+        while len(_claves_locales) > MAXIMO_CLAVES_LOCALES:
+            _claves_locales.popitem(last=False)
+
+
+class ClaveRespuestas:
+    """Clave de respuestas compilada de un quiz: puntos y opciones correctas de cada pregunta"""
+
+    def __init__(self, quiz_id, version, puntos, correctas, opciones):
+        self.quiz_id = quiz_id
+        self.version = version
+        self.puntos = puntos
+        self.correctas = correctas
+        # {opcion_id: pregunta_id}, para validar respuestas sin consultar la base de datos
+        self.opciones = opciones
+
+    @classmethod
+    def compilar(cls, quiz_id, version):
+        puntos = dict(Pregunta.objects.filter(quiz_id=quiz_id).values_list('id', 'puntos'))
+        correctas = {pregunta_id: set() for pregunta_id in puntos}
+        opciones = {}
+        for pregunta_id, opcion_id, es_correcta in Opcion.objects.filter(
+            pregunta__quiz_id=quiz_id
+        ).values_list('pregunta_id', 'id', 'es_correcta'):
+            opciones[opcion_id] = pregunta_id
+            if es_correcta:
+                correctas[pregunta_id].add(opcion_id)
+        return cls(quiz_id, version, puntos, correctas, opciones)
+
+    def opcion_valida(self, pregunta_id, opcion_id):
+        return self.opciones.get(opcion_id) == pregunta_id
+
+    def calificar(self, selecciones):
+        """
+        Califica un intento a partir de {pregunta_id: opcion_id}.
+        Como hasta ahora, el puntaje máximo solo suma las preguntas respondidas.
+        Retorna (puntos_obtenidos, total_puntos).
+        """
+        total_puntos = 0
+        puntos_obtenidos = 0
+        for pregunta_id, opcion_id in selecciones.items():
+            puntos = self.puntos.get(pregunta_id, 0)
+            total_puntos += puntos
+            if opcion_id in self.correctas.get(pregunta_id, ()):
+                puntos_obtenidos += puntos
+        return puntos_obtenidos, total_puntos
+
+
+def obtener_clave(quiz_id):
+    """
+    Clave de respuestas vigente del quiz. La versión se lee de la base de datos
+    (una consulta por clave primaria); la clave se busca primero en memoria del
+    proceso, luego en el cache y solo se compila si ninguno tiene esa versión.
+    """
+    version = version_clave(quiz_id)
+
+    clave = _clave_local(quiz_id, version)
+    if clave is not None:
+        return clave
+
+    clave_cache = f'clave_respuestas:{quiz_id}:{version}'
+    clave = cache.get(clave_cache)
+    if clave is None:
+        # La versión se leyó antes de compilar: si cambia mientras tanto, la siguiente lectura recompila
+        clave = ClaveRespuestas.compilar(quiz_id, version)
+        cache.set(clave_cache, clave, timeout=None)
+
+    _guardar_local(clave)
+    return clave
+
+
+def recalificar_quiz(quiz):
+    """Vuelve a calificar todos los intentos completados (y archivados) de un quiz con su clave vigente"""
+    clave = obtener_clave(quiz.id)
+    intentos = {intento.id: intento for intento in IntentoCuestionario.objects.filter(quiz=quiz, completado=True)}
+
+    selecciones = {intento_id: {} for intento_id in intentos}
+    respuestas = RespuestaEstudiante.objects.filter(intento__quiz=quiz, intento__completado=True)
+    for intento_id, pregunta_id, opcion_id in respuestas.values_list(
+        'intento_id', 'pregunta_id', 'opcion_seleccionada_id'
+    ).iterator(chunk_size=2000):
+        # Un intento completado después de leer `intentos` no se recalifica en esta pasada
+        if intento_id in selecciones:
+            selecciones[intento_id][pregunta_id] = opcion_id
+
+    for intento_id, intento in intentos.items():
+        intento.quiz = quiz
+        intento.aplicar_puntaje(*clave.calificar(selecciones.get(intento_id, {})))
+    
+    # Los archivados guardan sus respuestas en el mismo registro
+    archivados = list(IntentoArchivado.objects.filter(quiz=quiz))
+    for intento in archivados:
+        intento.quiz = quiz
+        intento.aplicar_puntaje(*clave.calificar(
+            {int(pregunta_id): opcion_id for pregunta_id, opcion_id in intento.respuestas.items()}
+        ))
+
+    with transaction.atomic():
+        IntentoCuestionario.objects.bulk_update(
+            intentos.values(),
+            ['puntaje_obtenido', 'puntaje_maximo', 'porcentaje', 'aprobado'],
+            batch_size=500,
+        )
+        IntentoArchivado.objects.bulk_update(
+            archivados,
+            ['puntaje_obtenido', 'puntaje_maximo', 'porcentaje', 'aprobado'],
+            batch_size=500,
+        )
+        ResumenQuiz.reconstruir(quiz.curso)
+        ResumenCurso.recalcular_curso(quiz.curso)
+    return len(intentos) + len(archivados)
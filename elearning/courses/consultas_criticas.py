@@ -0,0 +1,177 @@
+"""
+Registro de las consultas más frecuentes del proyecto y revisión de sus planes.
+
+Cada consulta registrada se arma igual que en la vista o función que la usa,
+con ids reales de la base de datos. `manage.py explain_hot_queries` pide el
+plan de cada una y falla si alguna recorre una tabla completa u ordena en una
+tabla temporal, es decir, si le falta un índice.
+"""
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .abandonados import intentos_abandonados
+from .models import Enrollment, IntentoArchivado, IntentoCuestionario, Notificacion, Quiz, ResumenQuiz
+from .notificaciones import (
+    VENTANAS_DEADLINE, _filtros_ventanas, notificaciones_vencidas, pendientes_deadline, recordatorios_repetidos,
+)
+
+CONSULTAS = {}
+
+
+def consulta_critica(descripcion):
+    """Registra una función que recibe la muestra de ids y retorna el queryset a revisar"""
+    def registrar(funcion):
+        CONSULTAS[funcion.__name__] = (descripcion, funcion)
+        return funcion
+    return registrar
+
+
+def obtener_muestra():
+    """Ids reales para armar las consultas, o None si no hay intentos completados"""
+    intento = IntentoCuestionario.objects.filter(completado=True).select_related('quiz').order_by().first()
+    if intento is None:
+        return None
+    return {
+        'estudiante': intento.estudiante_id,
+        'quiz': intento.quiz_id,
+        'curso': intento.quiz.curso_id,
+    }
+
+
+# ========== CONSULTAS ==========
+
+@consulta_critica('Intentos del estudiante en el detalle del quiz (views_quiz.detalle_quiz)')
+def intentos_detalle_quiz(muestra):
+    return IntentoCuestionario.objects.filter(
+        estudiante_id=muestra['estudiante'], quiz_id=muestra['quiz']
+    ).order_by('-fecha_inicio')
+
+
+@consulta_critica('Intentos completados antes de un nuevo intento (views_quiz.realizar_quiz)')
+def intentos_completados(muestra):
+    return IntentoCuestionario.objects.filter(
+        estudiante_id=muestra['estudiante'], quiz_id=muestra['quiz'], completado=True
+    ).order_by().values('id')
+
+
+@consulta_critica('Intento sin enviar para retomarlo (views_quiz.realizar_quiz)')
+def intento_abierto(muestra):
+    return IntentoCuestionario.objects.filter(
+        estudiante_id=muestra['estudiante'], quiz_id=muestra['quiz'], completado=False
+    ).order_by('-fecha_inicio')[:1]
+
+
+@consulta_critica('Intentos abandonados más antiguos (abandonados.barrer_intentos_abandonados)')
+def intentos_abandonados_lote(muestra):
+    limite = timezone.now() - timedelta(hours=settings.INTENTOS_ABANDONADOS_HORAS)
+    return intentos_abandonados(limite).order_by('fecha_inicio', 'id')[:1000]
+
+
+@consulta_critica('Mejor porcentaje y total de intentos (ResumenQuiz.recalcular)')
+def mejor_intento(muestra):
+    return IntentoCuestionario.objects.filter(
+        estudiante_id=muestra['estudiante'], quiz_id=muestra['quiz'], completado=True
+    ).order_by().values('estudiante_id', 'quiz_id').annotate(mejor=Max('porcentaje'), total=Count('id'))
+
+
+@consulta_critica('Mejor porcentaje y total de intentos archivados (ResumenQuiz.recalcular)')
+def mejor_intento_archivado(muestra):
+    return IntentoArchivado.objects.filter(
+        estudiante_id=muestra['estudiante'], quiz_id=muestra['quiz']
+    ).order_by().values('estudiante_id', 'quiz_id').annotate(mejor=Max('porcentaje'), total=Count('id'))
+
+
+@consulta_critica('Intentos de un estudiante en un curso (calificaciones.intentos_por_quiz)')
+def intentos_estudiante_curso(muestra):
+    return IntentoCuestionario.objects.filter(
+        estudiante_id=muestra['estudiante'], quiz__curso_id=muestra['curso'], completado=True
+    ).order_by('-fecha_inicio')
+
+
+@consulta_critica('Resúmenes de un curso en el libro de calificaciones (LibroCalificaciones)')
+def resumenes_curso(muestra):
+    return ResumenQuiz.objects.filter(quiz__curso_id=muestra['curso']).values(
+        'estudiante_id', 'quiz_id', 'mejor_porcentaje', 'total_intentos', 'aprobado'
+    )
+
+
+@consulta_critica('Inscripciones de un curso para exportar el libro (calificaciones.iterar_filas)')
+def inscripciones_curso(muestra):
+    return Enrollment.objects.filter(curso_id=muestra['curso']).select_related('estudiante').order_by('id')
+
+
+@consulta_critica('Primera página de notificaciones (views_notificaciones.mis_notificaciones)')
+def notificaciones_usuario(muestra):
+    return Notificacion.objects.filter(usuario_id=muestra['estudiante']).order_by('-fecha_creacion', '-id')[:20]
+
+
+@consulta_critica('Notificaciones no leídas (marcar todas como leídas, reconciliar_no_leidas)')
+def notificaciones_no_leidas(muestra):
+    return Notificacion.objects.filter(usuario_id=muestra['estudiante'], leida=False).order_by().values('id')
+
+
+@consulta_critica('Quizzes con deadline futuro (programador de deadlines, carga inicial)')
+def quizzes_programables(muestra):
+    return Quiz.objects.filter(activo=True, deadline__gt=timezone.now()).order_by().values_list('id', 'deadline')
+
+
+@consulta_critica('Recordatorios de deadline repetidos (notificaciones.recordatorios_repetidos)')
+def recordatorios_repetidos_lote(muestra):
+    return recordatorios_repetidos().order_by('fecha_creacion').values_list('id', 'usuario_id', 'leida')[:1000]
+
+
+@consulta_critica('Notificaciones leídas vencidas (notificaciones.notificaciones_vencidas)')
+def notificaciones_vencidas_lote(muestra):
+    _, consulta = notificaciones_vencidas(timezone.now())[0]
+    return consulta.order_by('fecha_creacion').values_list('id', 'usuario_id', 'leida')[:1000]
+
+
+def _consulta_ventana(ventana):
+    def recordatorios_pendientes(muestra):
+        filtro = next(filtro for clave, filtro, *_ in _filtros_ventanas(timezone.now()) if clave == ventana)
+        return pendientes_deadline(ventana, filtro)
+    recordatorios_pendientes.__name__ = f'recordatorios_pendientes_{ventana}'
+    return recordatorios_pendientes
+
+
+# Una consulta por ventana, tal como las arma generar_notificaciones_deadlines
+for _ventana, *_ in VENTANAS_DEADLINE:
+    consulta_critica(f'Recordatorios pendientes de la ventana {_ventana} (notificaciones.pendientes_deadline)')(
+        _consulta_ventana(_ventana)
+    )
+
+
+# ========== PLANES ==========
+
+def plan(queryset):
+    """
+    Retorna (líneas del plan, problemas). En PostgreSQL se desactivan los
+    recorridos secuenciales para que tablas pequeñas no oculten un índice
+    faltante: si aun así aparece un Seq Scan, no hay índice que sirva.
+    """
+    if connection.vendor == 'postgresql':
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            nodos = list(_nodos_postgres(json.loads(queryset.explain(format='json'))[0]['Plan']))
+        lineas = [f"{nodo['Node Type']} {nodo.get('Relation Name', '')}".strip() for nodo in nodos]
+        problemas = [linea for linea in lineas if linea.startswith(('Seq Scan', 'Sort'))]
+    else:
+        # Cada línea de SQLite es "id padre no_usado detalle"
+        lineas = [linea.split(' ', 3)[-1] for linea in queryset.explain().splitlines()]
+        problemas = [
+            linea for linea in lineas
+            if (linea.startswith('SCAN ') and 'CONSTANT ROW' not in linea) or 'USE TEMP B-TREE' in linea
+        ]
+    return lineas, problemas
+
+
+def _nodos_postgres(nodo):
+    yield nodo
+    for hijo in nodo.get('Plans', []):
+        yield from _nodos_postgres(hijo)
@@ -0,0 +1,112 @@
+"""
+Descarga de archivos protegidos con soporte de peticiones Range, GET
+condicional y delegación del envío al servidor web (X-Accel-Redirect de Nginx
+o X-Sendfile de Apache) según `settings.DESCARGAS_ACELERADAS`.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+BLOQUE_LECTURA = 64 * 1024
+
+_RANGO = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _rango(cabecera, tamano):
+    """
+    Interpreta una cabecera Range de un solo rango. Retorna (inicio, fin), None
+    si debe ignorarse (sintaxis inválida o varios rangos: se envía el archivo
+    completo) o False si el rango no se puede satisfacer.
+    """
+    coincidencia = _RANGO.match(cabecera.strip())
+    if not coincidencia:
+        return None
+    inicio, fin = coincidencia.groups()
+    if not inicio and not fin:
+        return None
+    if not inicio:
+        # bytes=-N: los últimos N bytes
+        longitud = int(fin)
+        if longitud == 0:
+            return False
+        return max(tamano - longitud, 0), tamano - 1
+    inicio = int(inicio)
+    fin = min(int(fin), tamano - 1) if fin else tamano - 1
+    if inicio > fin or inicio >= tamano:
+        return False
+    return inicio, fin
+
+
+def _if_range_valido(request, etag, ultima_modificacion):
+    """If-Range: el rango solo aplica si el archivo no cambió desde que el cliente obtuvo la primera parte"""
+    valor = request.META.get('HTTP_IF_RANGE')
+    if not valor:
+        return True
+    if valor.startswith('"'):
+        return valor == etag
+    return parse_http_date_safe(valor) == ultima_modificacion
+
+
+def _leer(ruta, inicio, longitud):
+    with open(ruta, 'rb') as archivo:
+        archivo.seek(inicio)
+        while longitud > 0:
+            bloque = archivo.read(min(BLOQUE_LECTURA, longitud))
+            if not bloque:
+                break
+            longitud -= len(bloque)
+            yield bloque
+
+
+def servir_archivo(request, archivo, nombre_descarga=None):
+    """
+    Respuesta para descargar el FieldFile `archivo`. El ETag y Last-Modified se
+    derivan del tamaño y la fecha de modificación del archivo en disco.
+    """
+    ruta = archivo.path
+    estado = os.stat(ruta)
+    tamano = estado.st_size
+    ultima_modificacion = int(estado.st_mtime)
+    etag = f'"{tamano:x}-{ultima_modificacion:x}"'
+    nombre_descarga = nombre_descarga or os.path.basename(archivo.name)
+    tipo = mimetypes.guess_type(nombre_descarga)[0] or 'application/octet-stream'
+
+    respuesta = get_conditional_response(request, etag=etag, last_modified=ultima_modificacion)
+    if respuesta is None:
+        modo = getattr(settings, 'DESCARGAS_ACELERADAS', None)
+        rango = None
+        if not modo and 'HTTP_RANGE' in request.META and _if_range_valido(request, etag, ultima_modificacion):
+            rango = _rango(request.META['HTTP_RANGE'], tamano)
+
+        if modo == 'x-accel-redirect':
+            # Nginx atiende el archivo (incluidos los rangos) desde una location `internal`
+            respuesta = HttpResponse(content_type=tipo)
+            respuesta['X-Accel-Redirect'] = quote(settings.DESCARGAS_ACCEL_PREFIJO + archivo.name)
+        elif modo == 'x-sendfile':
+            respuesta = HttpResponse(content_type=tipo)
+            respuesta['X-Sendfile'] = ruta
+        elif rango is False:
+            respuesta = HttpResponse(status=416)
+            respuesta['Content-Range'] = f'bytes */{tamano}'
+        elif rango:
+            inicio, fin = rango
+            respuesta = StreamingHttpResponse(_leer(ruta, inicio, fin - inicio + 1), status=206, content_type=tipo)
+            respuesta['Content-Range'] = f'bytes {inicio}-{fin}/{tamano}'
+            respuesta['Content-Length'] = fin - inicio + 1
+        else:
+            # FileResponse usa wsgi.file_wrapper (sendfile) cuando el servidor lo ofrece
+            respuesta = FileResponse(open(ruta, 'rb'), content_type=tipo)
+
+        respuesta['Content-Disposition'] = content_disposition_header(False, nombre_descarga)
+        respuesta['Accept-Ranges'] = 'bytes'
+
+    respuesta['ETag'] = etag
+    respuesta['Last-Modified'] = http_date(ultima_modificacion)
+    # Los documentos solo son accesibles para inscritos: nada de caches compartidos
+    patch_cache_control(respuesta, private=True, no_cache=True)
+    return respuesta
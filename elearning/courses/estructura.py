@@ -0,0 +1,71 @@
+"""
+Bloque de estructura del curso (quizzes y lecciones) cacheado como fragmento.
+
+La clave del fragmento incluye una versión por curso que se incrementa con
+cualquier cambio en sus lecciones, quizzes o preguntas (ver signals.py), de
+modo que nunca se sirve una versión vieja. Solo varía según lo que el usuario
+puede ver (contenido de lecciones y botones de edición), no por usuario.
+Versión y fragmento viven en el mismo cache: con varios procesos hace falta
+un cache compartido (ELEARNING_CACHE) para que un cambio llegue a todos.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+TIEMPO_MAXIMO = 60 * 60
+
+
+def _clave_version(curso_id):
+    return f'estructura_curso:{curso_id}:version'
+
+
+def version_estructura(curso_id):
+    version = cache.get(_clave_version(curso_id))
+    if version is None:
+        cache.add(_clave_version(curso_id), 1, timeout=None)
+        version = cache.get(_clave_version(curso_id), 1)
+    return version
+
+
+def invalidar_estructura(curso_id):
+    # Al confirmar la transacción: antes, otra petición podría volver a guardar
+    # el fragmento con la versión nueva pero los datos de antes del cambio
+    transaction.on_commit(lambda: _incrementar_version(curso_id))
+
+
+def _incrementar_version(curso_id):
+    try:
+        cache.incr(_clave_version(curso_id))
+    except ValueError:
+        cache.set(_clave_version(curso_id), 2, timeout=None)
+
+
+def _segundos_vigencia(quizzes):
+    """
+    El fragmento muestra si cada quiz está disponible o cerrado, así que no
+    puede durar más allá del próximo deadline.
+    """
+    ahora = timezone.now()
+    futuros = [quiz.deadline for quiz in quizzes if quiz.activo and quiz.deadline and quiz.deadline > ahora]
+    if not futuros:
+        return TIEMPO_MAXIMO
+    return max(1, min(TIEMPO_MAXIMO, int((min(futuros) - ahora).total_seconds()) + 1))
+
+
+def renderizar_estructura(request, curso, puede_ver_contenido, puede_editar):
+    clave = f'estructura_curso:{curso.id}:{version_estructura(curso.id)}:{int(puede_ver_contenido)}:{int(puede_editar)}'
+    html = cache.get(clave)
+    if html is None:
+        # El número de preguntas viene en la propia fila del quiz (Quiz.num_preguntas)
+        quizzes = list(curso.quizzes.all())
+        html = render_to_string('courses/estructura_curso.html', {
+            'course': curso,
+            'quizzes': quizzes,
+            'lessons': curso.lecciones.all(),
+            'puede_ver_contenido': puede_ver_contenido,
+            'puede_editar': puede_editar,
+        }, request=request)
+        cache.set(clave, html, _segundos_vigencia(quizzes))
+    return mark_safe(html)
@@ -0,0 +1,200 @@
+"""
+Notificaciones en vivo con server-sent events (requiere servir con ASGI).
+
+Cada conexión abierta es solo una cola en memoria: no ocupa un hilo ni hace
+consultas propias. Una única tarea por proceso (`CentralEventos`) revisa la
+base de datos cada `EVENTOS_INTERVALO_SEGUNDOS` buscando notificaciones nuevas
+(por id, usando la llave primaria) y cambios en el contador de no leídas de
+los usuarios conectados, y reparte los eventos a sus colas. Así funciona con
+varios procesos y con notificaciones creadas desde comandos de `manage.py`;
+cuando la notificación se crea en el mismo proceso, la señal `post_save`
+despierta a la tarea sin esperar al intervalo.
+"""
+import asyncio
+import json
+import logging
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+from django.db.models import Max
+from django.urls import reverse
+
+from accounts.models import User
+from .models import Notificacion
+
+logger = logging.getLogger(__name__)
+
+# Comentario vacío cada tanto para detectar clientes desconectados y que los proxies no corten la conexión
+SEGUNDOS_LATIDO = 20
+MAXIMO_EN_COLA = 100
+LOTE_CONSULTA = 500
+
+
+def en_vivo(request):
+    """
+    Los eventos solo se sirven con ASGI: con WSGI la respuesta en streaming de un
+    generador asíncrono se consume completa antes de enviarse y nunca termina.
+    """
+    return isinstance(request, ASGIRequest)
+
+
+def contexto_eventos(request):
+    """Procesador de contexto: la plantilla base solo abre la conexión de eventos con ASGI"""
+    return {'eventos_en_vivo': en_vivo(request)}
+
+
+def _evento(tipo, datos, evento_id=None):
+    lineas = [f'id: {evento_id}'] if evento_id is not None else []
+    lineas += [f'event: {tipo}', f'data: {json.dumps(datos, ensure_ascii=False)}']
+    return '\n'.join(lineas) + '\n\n'
+
+
+def _serializar(notificacion):
+    return {
+        'id': notificacion['id'],
+        'tipo': notificacion['tipo'],
+        'titulo': notificacion['titulo'],
+        'mensaje': notificacion['mensaje'],
+        'url': reverse('marcar_leida', args=[notificacion['id']]),
+    }
+
+
+_CAMPOS = ('id', 'usuario_id', 'tipo', 'titulo', 'mensaje')
+
+
+# ========== CONSULTAS (síncronas) ==========
+
+def _ultimo_id():
+    close_old_connections()
+    return Notificacion.objects.aggregate(ultimo=Max('id'))['ultimo'] or 0
+
+
+def _revisar_base(ultimo_id, usuario_ids):
+    """Notificaciones con id mayor a `ultimo_id` de los usuarios dados y sus contadores actuales"""
+    close_old_connections()
+    nuevas = []
+    while True:
+        lote = list(Notificacion.objects.filter(id__gt=ultimo_id).order_by('id').values(*_CAMPOS)[:LOTE_CONSULTA])
+        if not lote:
+            break
+        ultimo_id = lote[-1]['id']
+        nuevas += [notificacion for notificacion in lote if notificacion['usuario_id'] in usuario_ids]
+        if len(lote) < LOTE_CONSULTA:
+            break
+
+    conteos = {}
+    usuario_ids = list(usuario_ids)
+    for inicio in range(0, len(usuario_ids), LOTE_CONSULTA):
+        conteos.update(User.objects.filter(id__in=usuario_ids[inicio:inicio + LOTE_CONSULTA]).values_list('id', 'no_leidas'))
+    return ultimo_id, nuevas, conteos
+
+
+def _estado_inicial(usuario_id, ultimo_recibido):
+    """Contador actual y, si el navegador se reconecta, lo que se perdió mientras estuvo desconectado"""
+    close_old_connections()
+    perdidas = []
+    if ultimo_recibido is not None:
+        perdidas = list(
+            Notificacion.objects.filter(usuario_id=usuario_id, id__gt=ultimo_recibido)
+            .order_by('id').values(*_CAMPOS)[:MAXIMO_EN_COLA]
+        )
+    no_leidas = User.objects.filter(id=usuario_id).values_list('no_leidas', flat=True).first() or 0
+    return perdidas, no_leidas
+
+
+# ========== CENTRAL POR PROCESO ==========
+
+class CentralEventos:
+    def __init__(self):
+        self.suscriptores = defaultdict(set)  # usuario_id -> colas de sus conexiones abiertas
+        self.conteos = {}
+        self.ultimo_id = None
+        self.tarea = None
+        self.loop = None
+        self.despertar = None
+
+    def suscribir(self, usuario_id):
+        cola = asyncio.Queue(maxsize=MAXIMO_EN_COLA)
+        self.suscriptores[usuario_id].add(cola)
+        if self.tarea is None or self.tarea.done():
+            self.loop = asyncio.get_running_loop()
+            self.despertar = asyncio.Event()
+            self.tarea = self.loop.create_task(self._ciclo())
+        return cola
+
+    def cancelar(self, usuario_id, cola):
+        colas = self.suscriptores.get(usuario_id)
+        if colas is not None:
+            colas.discard(cola)
+            if not colas:
+                del self.suscriptores[usuario_id]
+                self.conteos.pop(usuario_id, None)
+
+    def avisar(self):
+        """Despierta la revisión; se puede llamar desde cualquier hilo"""
+        if self.loop is not None and self.tarea is not None and not self.tarea.done():
+            self.loop.call_soon_threadsafe(self.despertar.set)
+
+    def _repartir(self, usuario_id, evento):
+        for cola in self.suscriptores.get(usuario_id, ()):
+            try:
+                cola.put_nowait(evento)
+            except asyncio.QueueFull:
+                # Cliente lento: pierde eventos, pero el contador se vuelve a enviar cuando cambie
+                pass
+
+    async def _ciclo(self):
+        self.ultimo_id = await sync_to_async(_ultimo_id)()
+        while self.suscriptores:
+            try:
+                await asyncio.wait_for(self.despertar.wait(), settings.EVENTOS_INTERVALO_SEGUNDOS)
+            except asyncio.TimeoutError:
+                pass
+            self.despertar.clear()
+            if not self.suscriptores:
+                break
+
+            try:
+                self.ultimo_id, nuevas, conteos = await sync_to_async(_revisar_base)(
+                    self.ultimo_id, set(self.suscriptores)
+                )
+            except Exception:
+                # Un fallo de la base de datos no debe cortar los eventos de todos; se reintenta en el siguiente ciclo
+                logger.exception('No se pudieron revisar las notificaciones nuevas')
+                continue
+            for notificacion in nuevas:
+                self._repartir(notificacion['usuario_id'], _evento('notificacion', _serializar(notificacion), notificacion['id']))
+            for usuario_id, no_leidas in conteos.items():
+                if self.conteos.get(usuario_id) != no_leidas:
+                    self.conteos[usuario_id] = no_leidas
+                    self._repartir(usuario_id, _evento('no_leidas', no_leidas))
+
+
+_central = CentralEventos()
+
+
+def avisar_nueva_notificacion():
+    _central.avisar()
+
+
+async def flujo_eventos(usuario_id, ultimo_recibido=None):
+    """Generador asíncrono con los eventos de un usuario; termina cuando el cliente se desconecta"""
+    cola = _central.suscribir(usuario_id)
+    try:
+        yield 'retry: 5000\n\n'
+        perdidas, no_leidas = await sync_to_async(_estado_inicial)(usuario_id, ultimo_recibido)
+        for notificacion in perdidas:
+            yield _evento('notificacion', _serializar(notificacion), notificacion['id'])
+        _central.conteos.setdefault(usuario_id, no_leidas)
+        yield _evento('no_leidas', no_leidas)
+
+        while True:
+            try:
+                yield await asyncio.wait_for(cola.get(), SEGUNDOS_LATIDO)
+            except asyncio.TimeoutError:
+                yield ': latido\n\n'
+    finally:
+        _central.cancelar(usuario_id, cola)
@@ -1,5 +1,6 @@
 from django import forms
-from .models import Curso, Leccion, Quiz, Pregunta, Opcion
+from .models import Curso, Leccion, Quiz, Pregunta, Opcion, SubidaDocumento
+from .subidas import archivo_de_subida
 
 
 class CursoForm(forms.ModelForm):
@@ -15,6 +16,14 @@ class CursoForm(forms.ModelForm):
 
 
 class LeccionForm(forms.ModelForm):
+    # Id de una subida por fragmentos ya completa; sustituye al campo `documento`
+    subida = forms.UUIDField(required=False, widget=forms.HiddenInput)
+
+    def __init__(self, *args, usuario=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.usuario = usuario
+        self.subida_documento = None
+
     class Meta:
         model = Leccion
         fields = ['titulo', 'descripcion', 'tipo', 'orden', 'video_url', 'documento', 'contenido_texto']
@@ -34,6 +43,14 @@ class LeccionForm(forms.ModelForm):
         video_url = cleaned_data.get('video_url')
         documento = cleaned_data.get('documento')
         contenido_texto = cleaned_data.get('contenido_texto')
+
+        if cleaned_data.get('subida'):
+            self.subida_documento = SubidaDocumento.objects.filter(
+                id=cleaned_data['subida'], usuario=self.usuario
+            ).first()
+            if self.subida_documento is None or not self.subida_documento.completa:
+                raise forms.ValidationError('La subida del documento no se completó, vuelve a seleccionarlo')
+            documento = cleaned_data['documento'] = archivo_de_subida(self.subida_documento)
         
         if tipo == 'video' and not video_url:
             raise forms.ValidationError('Debes proporcionar una URL de video')
@@ -44,6 +61,12 @@ class LeccionForm(forms.ModelForm):
         
         return cleaned_data
 
+    def finalizar_subida(self):
+        """Tras guardar la lección, el archivo ya se movió a su lugar: se elimina el registro de la subida"""
+        if self.subida_documento is not None:
+            self.cleaned_data['documento'].close()
+            self.subida_documento.descartar()
+
 
 # ========== FORMULARIOS PARA QUIZZES ==========
 
@@ -0,0 +1,45 @@
+import os
+import sqlite3
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from courses.replica import ALIAS
+
+
+class Command(BaseCommand):
+    help = 'Refresca la copia SQLite que sirve como réplica de lectura para los reportes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cada', type=int, help='Repetir cada N segundos en lugar de refrescar una sola vez')
+
+    def handle(self, *args, **options):
+        if ALIAS not in settings.DATABASES:
+            raise CommandError('No hay una base "replica" configurada (ELEARNING_DB_REPLICA)')
+        principal = connections[DEFAULT_DB_ALIAS]
+        if principal.vendor != 'sqlite' or connections[ALIAS].vendor != 'sqlite':
+            raise CommandError('Solo aplica a SQLite; en PostgreSQL la réplica la mantiene la replicación del servidor')
+
+        destino = urlsplit(str(settings.DATABASES[ALIAS]['NAME'])).path
+        while True:
+            inicio = time.monotonic()
+            self._copiar(str(principal.settings_dict['NAME']), destino)
+            self.stdout.write(f'Réplica actualizada en {time.monotonic() - inicio:.1f} s: {destino}')
+            if not options['cada']:
+                break
+            time.sleep(options['cada'])
+
+    def _copiar(self, origen, destino):
+        """
+        Copia consistente con la API de backup de SQLite (no bloquea a los escritores
+        en modo WAL) a un archivo temporal que luego reemplaza a la réplica de forma
+        atómica: las conexiones abiertas siguen leyendo la copia anterior.
+        """
+        temporal = f'{destino}.nueva'
+        with sqlite3.connect(origen) as fuente, sqlite3.connect(temporal) as copia:
+            fuente.backup(copia)
+            # La réplica se abre en solo lectura: no debe quedar en modo WAL
+            copia.execute('PRAGMA journal_mode=DELETE')
+        os.replace(temporal, destino)
@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from courses.archivo import archivar_intentos
+
+
+class Command(BaseCommand):
+    help = 'Mueve los intentos antiguos de cursos cerrados a la tabla compacta de intentos archivados'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=settings.ARCHIVO_INTENTOS_DIAS,
+                            help=f'Antigüedad mínima del intento (por defecto {settings.ARCHIVO_INTENTOS_DIAS})')
+        parser.add_argument('--curso', type=int, action='append', help='Solo este curso (se puede repetir)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Intentos por lote (por defecto 1000)')
+        parser.add_argument('--dry-run', action='store_true', help='Solo cuenta los intentos archivables')
+
+    def handle(self, *args, **options):
+        limite = timezone.now() - timedelta(days=options['dias'])
+        total = archivar_intentos(
+            limite,
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+            cursos=options['curso'],
+        )
+
+        accion = 'archivables' if options['dry_run'] else 'archivados'
+        self.stdout.write(self.style.SUCCESS(f'Intentos {accion} (anteriores a {limite:%Y-%m-%d}): {total}'))
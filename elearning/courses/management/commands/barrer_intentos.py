@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from courses.abandonados import barrer_intentos_abandonados
+
+
+class Command(BaseCommand):
+    help = 'Califica (si tienen respuestas) o elimina los intentos de quiz abiertos y nunca enviados'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horas', type=float, default=settings.INTENTOS_ABANDONADOS_HORAS,
+                            help=f'Antigüedad mínima del intento (por defecto {settings.INTENTOS_ABANDONADOS_HORAS})')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Intentos por lote (por defecto 1000)')
+        parser.add_argument('--dry-run', action='store_true', help='Solo cuenta los intentos abandonados')
+        parser.add_argument('--eliminar', action='store_true', help='Eliminar también los que tienen respuestas, sin calificarlos')
+
+    def handle(self, *args, **options):
+        limite = timezone.now() - timedelta(hours=options['horas'])
+        calificados, eliminados = barrer_intentos_abandonados(
+            limite,
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+            eliminar=options['eliminar'],
+        )
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'Intentos abandonados antes de {limite:%Y-%m-%d %H:%M}: {eliminados}'))
+            return
+        self.stdout.write(self.style.SUCCESS(f'Intentos abandonados: {calificados} calificados, {eliminados} eliminados'))
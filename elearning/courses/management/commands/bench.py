@@ -0,0 +1,229 @@
+import json
+import platform
+import statistics
+import subprocess
+import time
+from contextlib import ExitStack, nullcontext
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from courses.models import Curso, Enrollment, IntentoCuestionario, Quiz, ResumenCurso
+from courses.notificaciones import generar_notificaciones_deadlines
+from courses.rendimiento import MedidorConsultas, percentil
+
+
+class _Deshacer(Exception):
+    """Se lanza para revertir la transacción de un escenario que escribe datos"""
+
+
+class Command(BaseCommand):
+    help = 'Mide la latencia y las consultas de las rutas principales y reporta los resultados en JSON'
+
+    ESCENARIOS = (
+        'calificaciones_curso',
+        'detalle_quiz',
+        'responder_quiz',
+        'detalle_estudiante_curso',
+        'generar_certificado',
+        'generar_notificaciones_deadlines',
+    )
+    ESCRIBEN = {'responder_quiz', 'generar_notificaciones_deadlines'}
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iteraciones', type=int, default=20)
+        parser.add_argument('--calentamiento', type=int, default=2, help='Iteraciones iniciales que no se cuentan')
+        parser.add_argument('--solo', help=f'Escenarios separados por comas ({", ".join(self.ESCENARIOS)})')
+        parser.add_argument('--curso', type=int, help='Curso a usar (por defecto, el de más inscripciones)')
+        parser.add_argument('--salida', help='Archivo donde guardar el JSON (por defecto, la salida estándar)')
+        parser.add_argument('--comparar', help='JSON de una corrida anterior para mostrar las diferencias')
+
+    def handle(self, *args, **options):
+        escenarios = options['solo'].split(',') if options['solo'] else list(self.ESCENARIOS)
+        desconocidos = set(escenarios) - set(self.ESCENARIOS)
+        if desconocidos:
+            raise CommandError(f'Escenarios desconocidos: {", ".join(sorted(desconocidos))}')
+
+        self._preparar(options['curso'])
+        resultados = {}
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for nombre in escenarios:
+                resultados[nombre] = self._medir(nombre, options['iteraciones'], options['calentamiento'])
+                self.stderr.write(f"{nombre}: p50 {resultados[nombre]['p50_ms']:.1f} ms, {resultados[nombre]['consultas']} consultas")
+
+        reporte = {
+            'fecha': timezone.now().isoformat(),
+            'commit': self._commit(),
+            'entorno': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'base_de_datos': connection.vendor,
+            },
+            'volumen': {
+                modelo.__name__: modelo.objects.count()
+                for modelo in (User, Curso, Enrollment, Quiz, IntentoCuestionario)
+            },
+            'objetivos': {'curso': self.curso.id, 'estudiante': self.estudiante.id, 'quiz': self.quiz.id},
+            'iteraciones': options['iteraciones'],
+            'resultados': resultados,
+        }
+        texto = json.dumps(reporte, indent=2, ensure_ascii=False)
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                archivo.write(texto)
+        else:
+            self.stdout.write(texto)
+
+        if options['comparar']:
+            with open(options['comparar'], encoding='utf-8') as archivo:
+                self._comparar(json.load(archivo), reporte)
+
+    # ========== PREPARACIÓN ==========
+
+    def _preparar(self, curso_id):
+        cursos = Curso.objects.annotate(inscritos=Count('enrollment')).filter(inscritos__gt=0)
+        self.curso = (cursos.filter(id=curso_id) if curso_id else cursos.order_by('-inscritos')).first()
+        if self.curso is None:
+            raise CommandError('No hay un curso con inscripciones; genera datos con `manage.py seed_scale`')
+
+        self.profesor = User.objects.filter(role__in=['teacher', 'admin']).order_by('id').first()
+        if self.profesor is None:
+            raise CommandError('Se necesita al menos un instructor')
+
+        self.quiz = Quiz.objects.filter(curso=self.curso, num_preguntas__gt=0).order_by('orden', 'id').first()
+        if self.quiz is None:
+            raise CommandError('El curso no tiene quizzes con preguntas')
+
+        # Un estudiante aprobado (para el certificado) o, si no hay, cualquier inscrito
+        resumen = ResumenCurso.objects.filter(inscripcion__curso=self.curso).order_by('-aprobado', '-promedio').select_related('inscripcion__estudiante').first()
+        self.estudiante = resumen.inscripcion.estudiante if resumen else Enrollment.objects.filter(curso=self.curso).first().estudiante
+        self.estudiante_aprobado = bool(resumen and resumen.aprobado)
+
+        self.cliente_profesor = Client()
+        self.cliente_profesor.force_login(self.profesor)
+        self.cliente_estudiante = Client()
+        self.cliente_estudiante.force_login(self.estudiante)
+
+    # ========== ESCENARIOS ==========
+    # Cada escenario prepara lo necesario y retorna la acción que se mide
+
+    def _get(self, cliente, url):
+        respuesta = cliente.get(url)
+        if respuesta.status_code != 200:
+            raise CommandError(f'{url} respondió {respuesta.status_code}')
+        if respuesta.streaming:
+            b''.join(respuesta.streaming_content)
+
+    def _calificaciones_curso(self):
+        return lambda: self._get(self.cliente_profesor, reverse('calificaciones_curso', args=[self.curso.id]))
+
+    def _detalle_quiz(self):
+        return lambda: self._get(self.cliente_estudiante, reverse('detalle_quiz', args=[self.quiz.id]))
+
+    def _detalle_estudiante_curso(self):
+        return lambda: self._get(
+            self.cliente_profesor, reverse('detalle_estudiante_curso', args=[self.curso.id, self.estudiante.id])
+        )
+
+    def _generar_certificado(self):
+        if not self.estudiante_aprobado:
+            raise CommandError('Ningún estudiante del curso aprobó; no se puede medir el certificado')
+        return lambda: self._get(
+            self.cliente_profesor, reverse('generar_certificado', args=[self.curso.id, self.estudiante.id])
+        )
+
+    def _responder_quiz(self):
+        """Envía un intento completo; crear el intento y elegir las opciones no se mide"""
+        intento = IntentoCuestionario.objects.create(estudiante=self.estudiante, quiz=self.quiz)
+        datos = {}
+        for pregunta in self.quiz.preguntas.prefetch_related('opciones'):
+            opciones = list(pregunta.opciones.all())
+            if opciones:
+                datos[f'pregunta_{pregunta.id}'] = opciones[0].id
+        url = reverse('responder_quiz', args=[intento.id])
+
+        def enviar():
+            respuesta = self.cliente_estudiante.post(url, datos)
+            if respuesta.status_code != 302:
+                raise CommandError(f'{url} respondió {respuesta.status_code}')
+        return enviar
+
+    def _generar_notificaciones_deadlines(self):
+        return generar_notificaciones_deadlines
+
+    # ========== MEDICIÓN ==========
+
+    def _ejecutar(self, nombre, medidor):
+        """Ejecuta una iteración y retorna su duración en segundos; lo que escribe se revierte"""
+        escribe = nombre in self.ESCRIBEN
+        try:
+            with transaction.atomic() if escribe else nullcontext():
+                accion = getattr(self, f'_{nombre}')()
+                with ExitStack() as pila:
+                    for conexion in connections.all():
+                        pila.enter_context(conexion.execute_wrapper(medidor))
+                    inicio = time.perf_counter()
+                    accion()
+                    duracion = time.perf_counter() - inicio
+                if escribe:
+                    raise _Deshacer
+        except _Deshacer:
+            pass
+        return duracion
+
+    def _medir(self, nombre, iteraciones, calentamiento):
+        for _ in range(calentamiento):
+            self._ejecutar(nombre, MedidorConsultas())
+
+        tiempos, consultas, duplicadas = [], [], []
+        for _ in range(iteraciones):
+            medidor = MedidorConsultas()
+            tiempos.append(self._ejecutar(nombre, medidor) * 1000)
+            consultas.append(medidor.consultas)
+            duplicadas.append(medidor.duplicadas)
+
+        ordenados = sorted(tiempos)
+        return {
+            'min_ms': round(ordenados[0], 2),
+            'p50_ms': round(percentil(ordenados, 50), 2),
+            'p95_ms': round(percentil(ordenados, 95), 2),
+            'p99_ms': round(percentil(ordenados, 99), 2),
+            'max_ms': round(ordenados[-1], 2),
+            'media_ms': round(statistics.fmean(tiempos), 2),
+            'desviacion_ms': round(statistics.pstdev(tiempos), 2),
+            'consultas': int(statistics.median(consultas)),
+            'consultas_max': max(consultas),
+            'duplicadas_max': max(duplicadas),
+        }
+
+    # ========== REPORTE ==========
+
+    def _commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, timeout=5
+            ).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            return None
+
+    def _comparar(self, anterior, actual):
+        # A stderr, para no mezclarse con el JSON cuando este va a la salida estándar
+        salida = self.stderr
+        salida.write(f"\nComparación con {anterior.get('commit') or 'corrida anterior'}:")
+        for nombre, resultado in actual['resultados'].items():
+            previo = anterior.get('resultados', {}).get(nombre)
+            if not previo:
+                continue
+            cambio = (resultado['p50_ms'] - previo['p50_ms']) / previo['p50_ms'] * 100 if previo['p50_ms'] else 0
+            salida.write(
+                f"{nombre:<36} p50 {previo['p50_ms']:>8.1f} → {resultado['p50_ms']:>8.1f} ms ({cambio:+.0f}%)  "
+                f"consultas {previo['consultas']:>4} → {resultado['consultas']:>4}"
+            )
@@ -0,0 +1,171 @@
+import json
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, connections
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from courses.models import Enrollment, IntentoCuestionario, Quiz, ResumenCurso, ResumenQuiz
+from courses.rendimiento import percentil
+
+
+def _enviar_intentos(estudiante_ids, quiz_id, datos, segundos):
+    """
+    Trabajo de cada proceso: mientras dure la prueba, cada estudiante asignado
+    abre un intento y envía sus respuestas a `responder_quiz`. Retorna las
+    latencias de los envíos exitosos, los errores, los intentos creados y los
+    segundos medidos (sin contar el arranque del proceso ni el login).
+    """
+    clientes = []
+    for estudiante in User.objects.filter(id__in=estudiante_ids):
+        cliente = Client()
+        cliente.force_login(estudiante)
+        clientes.append((estudiante, cliente))
+
+    latencias, errores, intentos = [], {}, []
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+        inicio_prueba = time.monotonic()
+        fin = inicio_prueba + segundos
+        turno = 0
+        while time.monotonic() < fin:
+            estudiante, cliente = clientes[turno % len(clientes)]
+            turno += 1
+            inicio = time.perf_counter()
+            try:
+                intento = IntentoCuestionario.objects.create(estudiante=estudiante, quiz_id=quiz_id)
+                intentos.append(intento.id)
+                respuesta = cliente.post(reverse('responder_quiz', args=[intento.id]), datos)
+            except DatabaseError as error:
+                # Típicamente "database is locked" cuando SQLite agota el busy timeout
+                errores[str(error)] = errores.get(str(error), 0) + 1
+                continue
+            if respuesta.status_code == 302:
+                latencias.append((time.perf_counter() - inicio) * 1000)
+            else:
+                clave = f'HTTP {respuesta.status_code}'
+                errores[clave] = errores.get(clave, 0) + 1
+        duracion = time.monotonic() - inicio_prueba
+
+    for _, cliente in clientes:
+        cliente.logout()
+    connections.close_all()
+    return latencias, errores, intentos, duracion
+
+
+class Command(BaseCommand):
+    help = 'Mide cuántos envíos de quiz por segundo soporta la base de datos configurada con varios procesos a la vez'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--procesos', type=int, default=4, help='Procesos enviando respuestas al mismo tiempo')
+        parser.add_argument('--segundos', type=float, default=10, help='Duración de la prueba')
+        parser.add_argument('--estudiantes', type=int, default=5, help='Estudiantes distintos por proceso')
+        parser.add_argument('--quiz', type=int, help='Quiz a responder (por defecto, uno del curso con más inscripciones)')
+        parser.add_argument('--salida', help='Archivo donde guardar el JSON (por defecto, la salida estándar)')
+        parser.add_argument('--conservar', action='store_true', help='No eliminar los intentos creados por la prueba')
+
+    def handle(self, *args, **options):
+        quiz = self._quiz(options['quiz'])
+        necesarios = options['procesos'] * options['estudiantes']
+        estudiante_ids = list(
+            Enrollment.objects.filter(curso_id=quiz.curso_id, estudiante__role='student')
+            .order_by('id').values_list('estudiante_id', flat=True)[:necesarios]
+        )
+        if len(estudiante_ids) < options['procesos']:
+            raise CommandError(f'El curso del quiz {quiz.id} tiene menos estudiantes inscritos que procesos')
+        datos = self._respuestas(quiz)
+        perfil = self._perfil()
+
+        # Los procesos hijos abren sus propias conexiones; no deben heredar la del padre
+        connections.close_all()
+        grupos = [estudiante_ids[i::options['procesos']] for i in range(options['procesos'])]
+        with ProcessPoolExecutor(max_workers=options['procesos'], initializer=django.setup) as pool:
+            tareas = [pool.submit(_enviar_intentos, grupo, quiz.id, datos, options['segundos']) for grupo in grupos]
+            resultados = [tarea.result() for tarea in tareas]
+        duracion = max(resultado[3] for resultado in resultados)
+
+        latencias = sorted(latencia for resultado in resultados for latencia in resultado[0])
+        errores = {}
+        for _, errores_proceso, *_ in resultados:
+            for clave, veces in errores_proceso.items():
+                errores[clave] = errores.get(clave, 0) + veces
+        intentos = [intento_id for resultado in resultados for intento_id in resultado[2]]
+
+        reporte = {
+            'fecha': timezone.now().isoformat(),
+            'base_de_datos': perfil,
+            'quiz': quiz.id,
+            'procesos': options['procesos'],
+            'segundos': round(duracion, 2),
+            'envios': len(latencias),
+            'envios_por_segundo': round(len(latencias) / duracion, 1),
+            'p50_ms': round(percentil(latencias, 50), 2) if latencias else None,
+            'p95_ms': round(percentil(latencias, 95), 2) if latencias else None,
+            'p99_ms': round(percentil(latencias, 99), 2) if latencias else None,
+            'media_ms': round(statistics.fmean(latencias), 2) if latencias else None,
+            'errores': errores,
+        }
+        texto = json.dumps(reporte, indent=2, ensure_ascii=False)
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                archivo.write(texto)
+        else:
+            self.stdout.write(texto)
+        self.stderr.write(
+            f"{perfil['motor']} ({perfil.get('journal_mode') or perfil.get('pool')}): "
+            f"{reporte['envios_por_segundo']} envíos/s con {options['procesos']} procesos, "
+            f"p95 {reporte['p95_ms']} ms, {sum(errores.values())} errores"
+        )
+
+        if not options['conservar']:
+            self._limpiar(quiz, intentos)
+
+    def _quiz(self, quiz_id):
+        quizzes = Quiz.objects.filter(num_preguntas__gt=0)
+        if quiz_id:
+            quiz = quizzes.filter(id=quiz_id).first()
+        else:
+            quiz = quizzes.annotate(inscritos=Count('curso__enrollment')).order_by('-inscritos').first()
+        if quiz is None:
+            raise CommandError('No hay un quiz con preguntas; genera datos con `manage.py seed_scale`')
+        return quiz
+
+    def _respuestas(self, quiz):
+        datos = {}
+        for pregunta in quiz.preguntas.prefetch_related('opciones'):
+            opciones = list(pregunta.opciones.all())
+            if opciones:
+                datos[f'pregunta_{pregunta.id}'] = opciones[0].id
+        return datos
+
+    def _perfil(self):
+        ajustes = connection.settings_dict
+        perfil = {'motor': connection.vendor}
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                for pragma in ('journal_mode', 'synchronous', 'busy_timeout', 'mmap_size'):
+                    cursor.execute(f'PRAGMA {pragma}')
+                    perfil[pragma] = cursor.fetchone()[0]
+            perfil['transaction_mode'] = ajustes['OPTIONS'].get('transaction_mode')
+        else:
+            perfil['pool'] = ajustes['OPTIONS'].get('pool') or False
+            perfil['conn_max_age'] = ajustes['CONN_MAX_AGE']
+        return perfil
+
+    def _limpiar(self, quiz, intentos):
+        """Elimina los intentos de la prueba y deja los resúmenes como estaban"""
+        estudiantes = set(
+            IntentoCuestionario.objects.filter(id__in=intentos).values_list('estudiante_id', flat=True).distinct()
+        )
+        IntentoCuestionario.objects.filter(id__in=intentos).delete()
+        for estudiante_id in estudiantes:
+            ResumenQuiz.recalcular(estudiante_id, quiz)
+        for inscripcion in Enrollment.objects.filter(curso_id=quiz.curso_id, estudiante_id__in=estudiantes):
+            ResumenCurso.recalcular(inscripcion)
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from courses.consultas_criticas import CONSULTAS, obtener_muestra, plan
+
+
+class Command(BaseCommand):
+    help = 'Revisa el plan de las consultas más frecuentes y falla si alguna recorre una tabla completa u ordena sin índice'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--solo', help=f'Consultas separadas por comas ({", ".join(CONSULTAS)})')
+        parser.add_argument('--sql', action='store_true', help='Muestra también el SQL de cada consulta')
+
+    def handle(self, *args, **options):
+        nombres = options['solo'].split(',') if options['solo'] else list(CONSULTAS)
+        desconocidas = set(nombres) - set(CONSULTAS)
+        if desconocidas:
+            raise CommandError(f'Consultas desconocidas: {", ".join(sorted(desconocidas))}')
+
+        muestra = obtener_muestra()
+        if muestra is None:
+            raise CommandError('No hay intentos completados; genera datos con `manage.py seed_scale`')
+
+        fallidas = []
+        for nombre in nombres:
+            descripcion, construir = CONSULTAS[nombre]
+            consulta = construir(muestra)
+            lineas, problemas = plan(consulta)
+
+            estilo = self.style.ERROR if problemas else self.style.SUCCESS
+            self.stdout.write(estilo(f"{'✗' if problemas else '✓'} {nombre}") + f' — {descripcion}')
+            if options['sql']:
+                self.stdout.write(f'    {consulta.query}')
+            for linea in lineas:
+                self.stdout.write(f"    {'!!' if linea in problemas else '  '} {linea}")
+            if problemas:
+                fallidas.append(nombre)
+
+        if fallidas:
+            raise CommandError(f'{len(fallidas)} consultas sin un índice adecuado: {", ".join(fallidas)}')
+        self.stdout.write(self.style.SUCCESS(f'Las {len(nombres)} consultas usan índices'))
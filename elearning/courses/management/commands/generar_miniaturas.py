@@ -0,0 +1,42 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+from courses.miniaturas import esta_al_dia, generar_variantes
+from courses.models import Curso
+
+
+class Command(BaseCommand):
+    help = 'Genera las miniaturas de las imágenes de cursos existentes usando varios procesos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--procesos', type=int, default=os.cpu_count(), help='Procesos en paralelo (por defecto, uno por CPU)')
+        parser.add_argument('--todos', action='store_true', help='Regenerar también los cursos que ya tienen miniaturas')
+
+    def handle(self, *args, **options):
+        cursos = Curso.objects.exclude(imagen='').exclude(imagen__isnull=True).only('id', 'imagen', 'miniaturas')
+        pendientes = {
+            curso.id: curso.imagen.name
+            for curso in cursos.iterator()
+            if options['todos'] or not esta_al_dia(curso)
+        }
+        if not pendientes:
+            self.stdout.write('No hay imágenes pendientes')
+            return
+
+        generadas = fallidas = 0
+        # Los procesos solo leen y escriben archivos; la base de datos se actualiza desde aquí
+        with ProcessPoolExecutor(max_workers=options['procesos'], initializer=django.setup) as pool:
+            tareas = {pool.submit(generar_variantes, nombre): curso_id for curso_id, nombre in pendientes.items()}
+            for tarea in as_completed(tareas):
+                miniaturas = tarea.result()
+                if miniaturas:
+                    Curso.objects.filter(id=tareas[tarea]).update(miniaturas=miniaturas)
+                    generadas += 1
+                else:
+                    fallidas += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Miniaturas generadas para {generadas} cursos'))
+        if fallidas:
+            self.stdout.write(self.style.WARNING(f'{fallidas} imágenes no se pudieron procesar'))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from courses.notificaciones import generar_notificaciones_deadlines
+from courses.programador import purgar_cambios
+
+
+class Command(BaseCommand):
+    help = 'Genera los recordatorios de deadlines próximos (24 horas y 3 días) en lotes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Solo cuenta las notificaciones pendientes, sin crearlas')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Notificaciones por inserción (por defecto 1000)')
+
+    def handle(self, *args, **options):
+        reporte = generar_notificaciones_deadlines(
+            dry_run=options['dry_run'],
+            batch_size=options['batch_size'],
+        )
+
+        accion = 'pendientes' if options['dry_run'] else 'creadas'
+        for ventana, datos in reporte.items():
+            self.stdout.write(f'Ventana {ventana}: {datos["creadas"]} {accion} en {datos["segundos"]:.2f}s')
+
+        total = sum(datos['creadas'] for datos in reporte.values())
+        self.stdout.write(self.style.SUCCESS(f'Total: {total} notificaciones {accion}'))
+
+        # Sin el programador corriendo nadie consume el registro de cambios de quizzes
+        cambios = purgar_cambios(dry_run=options['dry_run'], batch_size=options['batch_size'])
+        accion = 'a eliminar' if options['dry_run'] else 'eliminados'
+        self.stdout.write(f'Cambios de quizzes sin consumir: {cambios} {accion}')
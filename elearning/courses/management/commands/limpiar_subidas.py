@@ -0,0 +1,20 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from courses.models import SubidaDocumento
+
+
+class Command(BaseCommand):
+    help = 'Elimina las subidas de documentos abandonadas y sus archivos parciales'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horas', type=int, default=24, help='Antigüedad mínima desde el último fragmento (por defecto 24)')
+
+    def handle(self, *args, **options):
+        limite = timezone.now() - timedelta(hours=options['horas'])
+        eliminadas = 0
+        for subida in SubidaDocumento.objects.filter(fecha_actualizacion__lt=limite).iterator():
+            subida.descartar()
+            eliminadas += 1
+        self.stdout.write(self.style.SUCCESS(f'Subidas abandonadas eliminadas: {eliminadas}'))
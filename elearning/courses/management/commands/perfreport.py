@@ -0,0 +1,61 @@
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from courses.rendimiento import obtener_almacen, percentil
+
+
+class Command(BaseCommand):
+    help = 'Reporte de latencia (p50/p95/p99) y consultas por vista a partir de las mediciones del middleware'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horas', type=float, help='Solo mediciones de las últimas N horas')
+        parser.add_argument('--vista', help='Solo una vista (nombre de la URL, por ejemplo calificaciones_curso)')
+        parser.add_argument('--orden', choices=['p50', 'p95', 'p99', 'peticiones', 'consultas'], default='p95')
+        parser.add_argument('--sql', action='store_true', help='Mostrar la consulta más repetida de cada vista')
+        parser.add_argument('--limpiar', action='store_true', help='Eliminar todas las mediciones guardadas')
+
+    def handle(self, *args, **options):
+        almacen = obtener_almacen()
+        if options['limpiar']:
+            self.stdout.write(self.style.SUCCESS(f'Mediciones eliminadas: {almacen.limpiar()}'))
+            return
+
+        desde = time.time() - options['horas'] * 3600 if options['horas'] else None
+        por_vista = defaultdict(list)
+        for fila in almacen.leer(desde, options['vista']):
+            por_vista[fila[0]].append(fila)
+        if not por_vista:
+            self.stdout.write('No hay mediciones (¿está RENDIMIENTO_ACTIVO = True?)')
+            return
+
+        reporte = []
+        for vista, filas in por_vista.items():
+            tiempos = sorted(fila[1] for fila in filas)
+            repetidas = [fila[5] for fila in filas if fila[5]]
+            reporte.append({
+                'vista': vista,
+                'peticiones': len(filas),
+                'p50': percentil(tiempos, 50),
+                'p95': percentil(tiempos, 95),
+                'p99': percentil(tiempos, 99),
+                'db': sum(fila[2] for fila in filas) / len(filas),
+                'consultas': sum(fila[3] for fila in filas) / len(filas),
+                'max_consultas': max(fila[3] for fila in filas),
+                'duplicadas': sum(fila[4] for fila in filas) / len(filas),
+                'sql': max(set(repetidas), key=repetidas.count) if repetidas else None,
+            })
+        reporte.sort(key=lambda fila: fila[options['orden']], reverse=True)
+
+        self.stdout.write(
+            f"{'Vista':<32} {'Pet.':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'BD ms':>8} {'Cons.':>6} {'Máx.':>5} {'Rep.':>5}"
+        )
+        for fila in reporte:
+            self.stdout.write(
+                f"{fila['vista'][:32]:<32} {fila['peticiones']:>6} {fila['p50']:>8.1f} {fila['p95']:>8.1f} "
+                f"{fila['p99']:>8.1f} {fila['db']:>8.1f} {fila['consultas']:>6.1f} {fila['max_consultas']:>5} "
+                f"{fila['duplicadas']:>5.1f}"
+            )
+            if options['sql'] and fila['sql']:
+                self.stdout.write(f"    ↳ {fila['sql'][:300]}")
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from courses.programador import ProgramadorDeadlines
+
+
+class Command(BaseCommand):
+    help = 'Proceso de larga duración que genera los recordatorios de deadlines en cuanto vencen'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--intervalo', type=int, default=30, help='Segundos entre revisiones de cambios de quizzes (por defecto 30)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Notificaciones por inserción (por defecto 1000)')
+        parser.add_argument('--una-vez', action='store_true', help='Procesa lo pendiente y termina')
+
+    def handle(self, *args, **options):
+        programador = ProgramadorDeadlines(
+            intervalo_cambios=options['intervalo'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS('Programador de deadlines iniciado (Ctrl+C para detener)'))
+        try:
+            programador.ejecutar(una_vez=options['una_vez'])
+        except KeyboardInterrupt:
+            self.stdout.write('Programador de deadlines detenido')
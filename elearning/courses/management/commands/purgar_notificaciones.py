@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from courses.notificaciones import purgar_notificaciones
+
+
+class Command(BaseCommand):
+    help = 'Compacta los recordatorios de deadline repetidos y elimina las notificaciones vencidas, en lotes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Solo cuenta las notificaciones a eliminar')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Notificaciones por lote (por defecto 1000)')
+        parser.add_argument('--pausa', type=float, default=0, help='Segundos de espera entre lotes, para dejar pasar otras escrituras')
+
+    def handle(self, *args, **options):
+        reporte = purgar_notificaciones(
+            dry_run=options['dry_run'],
+            batch_size=options['batch_size'],
+            pausa=options['pausa'],
+        )
+
+        accion = 'a eliminar' if options['dry_run'] else 'eliminadas'
+        for etiqueta, total in reporte.items():
+            self.stdout.write(f'{etiqueta}: {total} {accion}')
+        self.stdout.write(self.style.SUCCESS(f'Total: {sum(reporte.values())} notificaciones {accion}'))
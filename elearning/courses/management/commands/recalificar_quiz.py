@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+from courses.models import Quiz
+from courses.claves import recalificar_quiz
+
+
+class Command(BaseCommand):
+    help = 'Vuelve a calificar todos los intentos completados de un quiz con su clave de respuestas vigente'
+
+    def add_arguments(self, parser):
+        parser.add_argument('quiz_id', type=int, help='ID del quiz a recalificar')
+
+    def handle(self, *args, **options):
+        try:
+            quiz = Quiz.objects.select_related('curso').get(id=options['quiz_id'])
+        except Quiz.DoesNotExist:
+            raise CommandError(f'No existe el quiz {options["quiz_id"]}')
+
+        total = recalificar_quiz(quiz)
+        self.stdout.write(self.style.SUCCESS(f'Intentos recalificados: {total}'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from courses.busqueda import reconstruir_indice
+from courses.models import Curso, Leccion
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye desde cero el índice de búsqueda de cursos y lecciones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Documentos por lote (por defecto 500)')
+
+    def handle(self, *args, **options):
+        cursos, lecciones = reconstruir_indice(Curso, Leccion, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Índice reconstruido: {cursos} cursos y {lecciones} lecciones'
+        ))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from courses.models import Curso, ResumenQuiz, ResumenCurso
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye desde cero los resúmenes de calificaciones por quiz y por inscripción'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--curso', type=int, help='ID del curso a reconstruir (por defecto, todos)')
+
+    def handle(self, *args, **options):
+        if options['curso']:
+            try:
+                cursos = [Curso.objects.get(id=options['curso'])]
+            except Curso.DoesNotExist:
+                raise CommandError(f'No existe el curso {options["curso"]}')
+        else:
+            cursos = Curso.objects.all()
+
+        total_quizzes = 0
+        total_inscripciones = 0
+        for curso in cursos:
+            total_quizzes += ResumenQuiz.reconstruir(curso)
+            total_inscripciones += ResumenCurso.recalcular_curso(curso)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Resúmenes reconstruidos: {total_quizzes} por quiz, {total_inscripciones} por inscripción'
+        ))
@@ -0,0 +1,298 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import User
+from courses import busqueda
+from courses.models import (
+    Curso, Leccion, Enrollment, Quiz, Pregunta, Opcion, IntentoCuestionario,
+    RespuestaEstudiante, Notificacion, ResumenQuiz, ResumenCurso,
+)
+
+PALABRAS = (
+    'python django datos algoritmos redes seguridad diseño álgebra cálculo estadística historia '
+    'literatura química física biología economía finanzas marketing gestión proyectos web móvil '
+    'bases consultas índices funciones clases objetos pruebas despliegue servidores nube'
+).split()
+
+
+@contextmanager
+def fechas_explicitas(*campos):
+    """Permite asignar fechas propias a campos auto_now_add durante bulk_create"""
+    for campo in campos:
+        campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo in campos:
+            campo.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = 'Genera datos sintéticos a escala de producción con inserciones masivas (para pruebas de rendimiento)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--estudiantes', type=int, default=1000)
+        parser.add_argument('--instructores', type=int, default=20)
+        parser.add_argument('--cursos', type=int, default=50)
+        parser.add_argument('--lecciones', type=int, default=10, help='Lecciones por curso')
+        parser.add_argument('--quizzes', type=int, default=5, help='Quizzes por curso')
+        parser.add_argument('--preguntas', type=int, default=10, help='Preguntas por quiz')
+        parser.add_argument('--opciones', type=int, default=4, help='Opciones por pregunta')
+        parser.add_argument('--inscripciones', type=int, default=5, help='Cursos por estudiante')
+        parser.add_argument('--intentos', type=int, default=2, help='Máximo de intentos por estudiante y quiz')
+        parser.add_argument('--notificaciones', type=int, default=20, help='Notificaciones por estudiante')
+        parser.add_argument('--semilla', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--prefijo', default='carga', help='Prefijo de usuarios y cursos generados')
+        parser.add_argument('--limpiar', action='store_true', help='Eliminar antes los datos generados con el mismo prefijo')
+
+    def handle(self, *args, **options):
+        self.opciones = options
+        self.azar = random.Random(options['semilla'])
+        self.lote = options['batch_size']
+        self.ahora = timezone.now()
+        prefijo = options['prefijo']
+
+        usuarios = User.objects.filter(username__startswith=f'{prefijo}_')
+        cursos = Curso.objects.filter(titulo__startswith=f'[{prefijo}]')
+        if options['limpiar']:
+            self._paso('Limpieza', lambda: (cursos.delete(), usuarios.delete()))
+        elif usuarios.exists() or cursos.exists():
+            raise CommandError(f'Ya existen datos con el prefijo "{prefijo}"; usa --limpiar o cambia --prefijo')
+
+        with transaction.atomic():
+            estudiantes, instructores = self._paso('Usuarios', self._usuarios)
+            cursos = self._paso('Cursos y lecciones', lambda: self._cursos(instructores))
+            quizzes = self._paso('Quizzes, preguntas y opciones', lambda: self._quizzes(cursos))
+            inscripciones = self._paso('Inscripciones', lambda: self._inscripciones(estudiantes, cursos))
+            self._paso('Intentos y respuestas', lambda: self._intentos(inscripciones, quizzes))
+            self._paso('Notificaciones', lambda: self._notificaciones(estudiantes, inscripciones, quizzes))
+
+        # Lo que normalmente mantienen las señales, que bulk_create no dispara
+        self._paso('Resúmenes de calificaciones', lambda: [
+            (ResumenQuiz.reconstruir(curso), ResumenCurso.recalcular_curso(curso)) for curso in cursos
+        ])
+        self._paso('Metadatos de quizzes', lambda: (
+            Pregunta.actualizar_metadatos(Pregunta.objects.filter(quiz__curso__in=cursos).values('id')),
+            Quiz.actualizar_metadatos(Quiz.objects.filter(curso__in=cursos).values('id')),
+        ))
+        self._paso('Índice de búsqueda', lambda: busqueda.reconstruir_indice(Curso, Leccion))
+        self._paso('Contadores de no leídas', User.reconciliar_no_leidas)
+
+        self.stdout.write(self.style.SUCCESS('Datos generados: ' + ', '.join(
+            f'{modelo.__name__}={modelo.objects.count()}'
+            for modelo in (User, Curso, Leccion, Quiz, Pregunta, Opcion, Enrollment,
+                           IntentoCuestionario, RespuestaEstudiante, Notificacion)
+        )))
+
+    def _paso(self, nombre, funcion):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        self.stdout.write(f'{nombre}: {time.perf_counter() - inicio:.1f} s')
+        return resultado
+
+    def _insertar(self, modelo, objetos, retornar=True):
+        """bulk_create por lotes desde un generador; retorna los objetos con su id si se piden"""
+        creados, lote = [], []
+        for objeto in objetos:
+            lote.append(objeto)
+            if len(lote) >= self.lote:
+                modelo.objects.bulk_create(lote)
+                if retornar:
+                    creados += lote
+                lote = []
+        if lote:
+            modelo.objects.bulk_create(lote)
+            if retornar:
+                creados += lote
+        return creados
+
+    def _texto(self, palabras):
+        return ' '.join(self.azar.choice(PALABRAS) for _ in range(palabras))
+
+    def _fecha_pasada(self, dias=90):
+        return self.ahora - timedelta(seconds=self.azar.randint(0, dias * 86400))
+
+    # ========== GENERADORES ==========
+
+    def _usuarios(self):
+        prefijo = self.opciones['prefijo']
+        password = make_password('carga1234')  # Un solo hash: calcularlo por usuario tomaría minutos
+        estudiantes = self._insertar(User, (
+            User(username=f'{prefijo}_est{n}', email=f'{prefijo}_est{n}@ejemplo.com', password=password, role='student')
+            for n in range(self.opciones['estudiantes'])
+        ))
+        instructores = self._insertar(User, (
+            User(username=f'{prefijo}_prof{n}', email=f'{prefijo}_prof{n}@ejemplo.com', password=password, role='teacher')
+            for n in range(self.opciones['instructores'])
+        ))
+        return estudiantes, instructores
+
+    def _cursos(self, instructores):
+        prefijo = self.opciones['prefijo']
+        with fechas_explicitas(Curso._meta.get_field('fecha_creacion')):
+            cursos = self._insertar(Curso, (
+                Curso(
+                    titulo=f'[{prefijo}] {self._texto(3).capitalize()} {n}',
+                    descripcion=self._texto(40),
+                    instructor=self.azar.choice(instructores).username if instructores else prefijo,
+                    fecha_creacion=self._fecha_pasada(365).date(),
+                )
+                for n in range(self.opciones['cursos'])
+            ))
+        self._insertar(Leccion, (
+            Leccion(
+                curso=curso,
+                titulo=f'Lección {n + 1}: {self._texto(4)}',
+                descripcion=self._texto(15),
+                tipo='texto',
+                orden=n,
+                contenido_texto=f'<p>{self._texto(200)}</p>',
+            )
+            for curso in cursos for n in range(self.opciones['lecciones'])
+        ), retornar=False)
+        return cursos
+
+    def _quizzes(self, cursos):
+        """Quizzes con deadlines repartidos entre el último mes y el próximo (algunos sin deadline)"""
+        quizzes = self._insertar(Quiz, (
+            Quiz(
+                curso=curso,
+                titulo=f'Quiz {n + 1}: {self._texto(3)}',
+                descripcion=self._texto(10),
+                intentos_maximos=max(self.opciones['intentos'], 1),
+                deadline=None if self.azar.random() < 0.2 else self.ahora + timedelta(hours=self.azar.randint(-720, 720)),
+                orden=n,
+            )
+            for curso in cursos for n in range(self.opciones['quizzes'])
+        ))
+        preguntas = self._insertar(Pregunta, (
+            Pregunta(quiz=quiz, texto=f'¿{self._texto(8)}?', puntos=self.azar.randint(1, 3), orden=n)
+            for quiz in quizzes for n in range(self.opciones['preguntas'])
+        ))
+        correctas = {pregunta.id: self.azar.randrange(self.opciones['opciones']) for pregunta in preguntas}
+        opciones = self._insertar(Opcion, (
+            Opcion(pregunta=pregunta, texto=self._texto(5), es_correcta=n == correctas[pregunta.id], orden=n)
+            for pregunta in preguntas for n in range(self.opciones['opciones'])
+        ))
+
+        # Estructura en memoria para calificar los intentos sin consultar: quiz -> [(pregunta, [opciones])]
+        opciones_por_pregunta = {}
+        for opcion in opciones:
+            opciones_por_pregunta.setdefault(opcion.pregunta_id, []).append(opcion)
+        preguntas_por_quiz = {}
+        for pregunta in preguntas:
+            preguntas_por_quiz.setdefault(pregunta.quiz_id, []).append((pregunta, opciones_por_pregunta.get(pregunta.id, [])))
+        return [(quiz, preguntas_por_quiz.get(quiz.id, [])) for quiz in quizzes]
+
+    def _inscripciones(self, estudiantes, cursos):
+        por_estudiante = min(self.opciones['inscripciones'], len(cursos))
+        with fechas_explicitas(Enrollment._meta.get_field('fecha_inscripcion')):
+            return self._insertar(Enrollment, (
+                Enrollment(estudiante=estudiante, curso=curso, fecha_inscripcion=self._fecha_pasada())
+                for estudiante in estudiantes for curso in self.azar.sample(cursos, por_estudiante)
+            ))
+
+    def _intentos(self, inscripciones, quizzes):
+        """
+        Cada estudiante tiene una habilidad (probabilidad de acertar) y responde
+        la mayoría de los quizzes de sus cursos; algunos intentos quedan en curso.
+        """
+        habilidad = {}
+        quizzes_por_curso = {}
+        for quiz, preguntas in quizzes:
+            quizzes_por_curso.setdefault(quiz.curso_id, []).append((quiz, preguntas))
+
+        def intentos():
+            for inscripcion in inscripciones:
+                acierto = habilidad.setdefault(inscripcion.estudiante_id, self.azar.uniform(0.4, 0.98))
+                for quiz, preguntas in quizzes_por_curso.get(inscripcion.curso_id, []):
+                    if self.azar.random() > 0.85:
+                        continue
+                    for _ in range(self.azar.randint(1, max(self.opciones['intentos'], 1))):
+                        inicio = self._fecha_pasada()
+                        intento = IntentoCuestionario(estudiante_id=inscripcion.estudiante_id, quiz=quiz, fecha_inicio=inicio)
+                        if self.azar.random() < 0.05:
+                            intento.respuestas_generadas = []
+                            yield intento
+                            continue
+                        elegidas, obtenidos, total = [], 0, 0
+                        for pregunta, opciones in preguntas:
+                            if not opciones:
+                                continue
+                            correcta = next((opcion for opcion in opciones if opcion.es_correcta), opciones[0])
+                            opcion = correcta if self.azar.random() < acierto else self.azar.choice(opciones)
+                            elegidas.append((pregunta, opcion))
+                            total += pregunta.puntos
+                            obtenidos += pregunta.puntos if opcion.es_correcta else 0
+                        intento.respuestas_generadas = elegidas
+                        intento.completado = True
+                        intento.fecha_finalizacion = inicio + timedelta(minutes=self.azar.randint(3, 60))
+                        intento.puntaje_obtenido = obtenidos
+                        intento.puntaje_maximo = total
+                        intento.porcentaje = obtenidos / total * 100 if total else 0
+                        intento.aprobado = intento.porcentaje >= quiz.puntaje_minimo
+                        yield intento
+
+        with fechas_explicitas(
+            IntentoCuestionario._meta.get_field('fecha_inicio'),
+            RespuestaEstudiante._meta.get_field('fecha_respuesta'),
+        ):
+            # Se insertan por tandas para no tener todos los intentos y respuestas en memoria
+            pendientes = []
+            for intento in intentos():
+                pendientes.append(intento)
+                if len(pendientes) >= self.lote:
+                    self._guardar_intentos(pendientes)
+                    pendientes = []
+            self._guardar_intentos(pendientes)
+
+    def _guardar_intentos(self, intentos):
+        if not intentos:
+            return
+        IntentoCuestionario.objects.bulk_create(intentos)
+        self._insertar(RespuestaEstudiante, (
+            RespuestaEstudiante(
+                intento=intento, pregunta=pregunta, opcion_seleccionada=opcion,
+                fecha_respuesta=intento.fecha_finalizacion,
+            )
+            for intento in intentos for pregunta, opcion in intento.respuestas_generadas
+        ), retornar=False)
+
+    def _notificaciones(self, estudiantes, inscripciones, quizzes):
+        cursos_por_estudiante = {}
+        for inscripcion in inscripciones:
+            cursos_por_estudiante.setdefault(inscripcion.estudiante_id, []).append(inscripcion.curso_id)
+        quizzes_por_curso = {}
+        for quiz, _ in quizzes:
+            quizzes_por_curso.setdefault(quiz.curso_id, []).append(quiz)
+
+        def notificaciones():
+            for estudiante in estudiantes:
+                cursos = cursos_por_estudiante.get(estudiante.id)
+                if not cursos:
+                    continue
+                for _ in range(self.opciones['notificaciones']):
+                    curso_id = self.azar.choice(cursos)
+                    quiz = self.azar.choice(quizzes_por_curso[curso_id]) if quizzes_por_curso.get(curso_id) else None
+                    tipo = self.azar.choice(['nuevo_quiz', 'resultado', 'curso'])
+                    yield Notificacion(
+                        usuario=estudiante,
+                        tipo=tipo,
+                        titulo=self._texto(5).capitalize(),
+                        mensaje=self._texto(20),
+                        quiz=quiz if tipo != 'curso' else None,
+                        curso_id=curso_id,
+                        leida=self.azar.random() < 0.7,
+                        fecha_creacion=self._fecha_pasada(),
+                    )
+
+        with fechas_explicitas(Notificacion._meta.get_field('fecha_creacion')):
+            self._insertar(Notificacion, notificaciones(), retornar=False)
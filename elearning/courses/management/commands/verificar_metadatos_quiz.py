@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from courses.models import Quiz, Pregunta
+
+
+class Command(BaseCommand):
+    help = 'Compara los contadores guardados de quizzes y preguntas con los reales y, opcionalmente, los corrige'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--corregir', action='store_true', help='Recalcula los contadores que no coinciden')
+        parser.add_argument('--mostrar', type=int, default=20, help='Máximo de diferencias a listar por modelo')
+
+    def handle(self, *args, **options):
+        preguntas = Pregunta.objects.annotate(
+            real_opciones=Count('opciones'),
+            real_correctas=Count('opciones', filter=Q(opciones__es_correcta=True)),
+        ).filter(~Q(num_opciones=F('real_opciones')) | ~Q(num_correctas=F('real_correctas')))
+        quizzes = Quiz.objects.annotate(
+            real_preguntas=Count('preguntas'),
+            real_puntaje=Coalesce(Sum('preguntas__puntos'), Value(0)),
+        ).filter(~Q(num_preguntas=F('real_preguntas')) | ~Q(puntaje_total=F('real_puntaje')))
+
+        # Primero las preguntas: corregirlas no cambia los contadores de los quizzes
+        diferencias_preguntas = self._reportar(
+            preguntas, options['mostrar'],
+            lambda p: f'Pregunta {p.id}: opciones {p.num_opciones} → {p.real_opciones}, correctas {p.num_correctas} → {p.real_correctas}'
+        )
+        diferencias_quizzes = self._reportar(
+            quizzes, options['mostrar'],
+            lambda q: f'Quiz {q.id}: preguntas {q.num_preguntas} → {q.real_preguntas}, puntaje {q.puntaje_total} → {q.real_puntaje}'
+        )
+
+        if not diferencias_preguntas and not diferencias_quizzes:
+            self.stdout.write(self.style.SUCCESS('Todos los contadores están al día'))
+            return
+
+        if not options['corregir']:
+            raise CommandError(
+                f'{len(diferencias_preguntas)} preguntas y {len(diferencias_quizzes)} quizzes con contadores '
+                'desactualizados; ejecuta con --corregir'
+            )
+
+        Pregunta.actualizar_metadatos(diferencias_preguntas)
+        Quiz.actualizar_metadatos(diferencias_quizzes)
+        self.stdout.write(self.style.SUCCESS(
+            f'Corregidos: {len(diferencias_preguntas)} preguntas, {len(diferencias_quizzes)} quizzes'
+        ))
+
+    def _reportar(self, consulta, mostrar, describir):
+        """Lista las primeras diferencias y retorna los ids de todas"""
+        ids = []
+        for objeto in consulta.order_by('id').iterator():
+            if len(ids) < mostrar:
+                self.stdout.write(self.style.WARNING(describir(objeto)))
+            ids.append(objeto.id)
+        return ids
@@ -0,0 +1,95 @@
+# Generated by Django 5.2.8 on 2026-10-18 05:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Sum
+
+
+def poblar_resumenes(apps, schema_editor):
+    """Genera los resúmenes a partir de los intentos existentes"""
+    Quiz = apps.get_model('courses', 'Quiz')
+    Enrollment = apps.get_model('courses', 'Enrollment')
+    IntentoCuestionario = apps.get_model('courses', 'IntentoCuestionario')
+    ResumenQuiz = apps.get_model('courses', 'ResumenQuiz')
+    ResumenCurso = apps.get_model('courses', 'ResumenCurso')
+
+    agregados = IntentoCuestionario.objects.filter(completado=True).values(
+        'estudiante_id', 'quiz_id', 'quiz__puntaje_minimo'
+    ).annotate(mejor=Max('porcentaje'), total=Count('id'))
+    ResumenQuiz.objects.bulk_create([
+        ResumenQuiz(
+            estudiante_id=fila['estudiante_id'],
+            quiz_id=fila['quiz_id'],
+            mejor_porcentaje=fila['mejor'],
+            total_intentos=fila['total'],
+            aprobado=fila['mejor'] >= fila['quiz__puntaje_minimo'],
+        )
+        for fila in agregados
+    ], batch_size=1000)
+
+    totales = dict(Quiz.objects.values('curso_id').annotate(total=Count('id')).values_list('curso_id', 'total'))
+    sumas = {
+        (fila['estudiante_id'], fila['quiz__curso_id']): fila
+        for fila in ResumenQuiz.objects.values('estudiante_id', 'quiz__curso_id').annotate(
+            suma=Sum('mejor_porcentaje'), completados=Count('id')
+        )
+    }
+    resumenes = []
+    for inscripcion in Enrollment.objects.all():
+        fila = sumas.get((inscripcion.estudiante_id, inscripcion.curso_id), {'suma': 0, 'completados': 0})
+        total_quizzes = totales.get(inscripcion.curso_id, 0)
+        promedio = fila['suma'] / fila['completados'] if fila['completados'] else 0
+        resumenes.append(ResumenCurso(
+            inscripcion=inscripcion,
+            promedio=promedio,
+            quizzes_completados=fila['completados'],
+            total_quizzes=total_quizzes,
+            aprobado=promedio >= 70 and fila['completados'] == total_quizzes,
+        ))
+    ResumenCurso.objects.bulk_create(resumenes, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0003_notificacion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenCurso',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('promedio', models.FloatField(default=0)),
+                ('quizzes_completados', models.PositiveIntegerField(default=0)),
+                ('total_quizzes', models.PositiveIntegerField(default=0)),
+                ('aprobado', models.BooleanField(default=False)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+                ('inscripcion', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='resumen', to='courses.enrollment')),
+            ],
+            options={
+                'verbose_name': 'Resumen de Curso',
+                'verbose_name_plural': 'Resúmenes de Cursos',
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenQuiz',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mejor_porcentaje', models.FloatField(default=0)),
+                ('total_intentos', models.PositiveIntegerField(default=0)),
+                ('aprobado', models.BooleanField(default=False)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+                ('estudiante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_quiz', to=settings.AUTH_USER_MODEL)),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes', to='courses.quiz')),
+            ],
+            options={
+                'verbose_name': 'Resumen de Quiz',
+                'verbose_name_plural': 'Resúmenes de Quizzes',
+                'unique_together': {('estudiante', 'quiz')},
+            },
+        ),
+        migrations.RunPython(poblar_resumenes, migrations.RunPython.noop),
+    ]
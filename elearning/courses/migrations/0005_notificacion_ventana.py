@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-18 05:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_resumenquiz_resumencurso'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificacion',
+            name='ventana',
+            field=models.CharField(blank=True, choices=[('24h', 'Menos de 24 horas'), ('3d', 'Menos de 3 días')], max_length=3, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='notificacion',
+            constraint=models.UniqueConstraint(condition=models.Q(('ventana__isnull', False)), fields=('usuario', 'quiz', 'ventana'), name='notificacion_deadline_unica'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-18 05:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_notificacion_ventana'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CambioQuiz',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quiz_id', models.BigIntegerField()),
+                ('fecha', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Cambio de Quiz',
+                'verbose_name_plural': 'Cambios de Quizzes',
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-18 05:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0006_cambioquiz'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Certificado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('promedio', models.FloatField()),
+                ('fecha_emision', models.DateField()),
+                ('huella', models.CharField(max_length=64, unique=True)),
+                ('codigo', models.CharField(max_length=12, unique=True)),
+                ('archivo', models.FileField(upload_to='certificados/')),
+                ('inscripcion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='certificados', to='courses.enrollment')),
+            ],
+            options={
+                'verbose_name': 'Certificado',
+                'verbose_name_plural': 'Certificados',
+                'ordering': ['-fecha_emision', '-id'],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations
+
+from courses import busqueda
+
+
+def crear_indice(apps, schema_editor):
+    busqueda.crear_tabla(schema_editor.connection)
+    busqueda.reconstruir_indice(apps.get_model('courses', 'Curso'), apps.get_model('courses', 'Leccion'))
+
+
+def eliminar_indice(apps, schema_editor):
+    busqueda.eliminar_tabla(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0008_indices_paginacion'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indice, eliminar_indice),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 05:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0009_indice_busqueda'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='curso',
+            name='miniaturas',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:06
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def poblar_metadatos(apps, schema_editor):
+    """Calcula los contadores de las preguntas y quizzes existentes"""
+    Quiz = apps.get_model('courses', 'Quiz')
+    Pregunta = apps.get_model('courses', 'Pregunta')
+    Opcion = apps.get_model('courses', 'Opcion')
+
+    opciones = Opcion.objects.filter(pregunta=OuterRef('pk')).order_by().values('pregunta')
+    Pregunta.objects.update(
+        num_opciones=Coalesce(Subquery(opciones.annotate(n=Count('id')).values('n')), 0),
+        num_correctas=Coalesce(Subquery(opciones.filter(es_correcta=True).annotate(n=Count('id')).values('n')), 0),
+    )
+    preguntas = Pregunta.objects.filter(quiz=OuterRef('pk')).order_by().values('quiz')
+    Quiz.objects.update(
+        num_preguntas=Coalesce(Subquery(preguntas.annotate(n=Count('id')).values('n')), 0),
+        puntaje_total=Coalesce(Subquery(preguntas.annotate(total=Sum('puntos')).values('total')), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0011_subidadocumento'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pregunta',
+            name='num_correctas',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='pregunta',
+            name='num_opciones',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='num_preguntas',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='puntaje_total',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(poblar_metadatos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0012_metadatos_quiz'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['curso', 'estudiante'], name='inscripcion_curso_est_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='intentocuestionario',
+            index=models.Index(fields=['estudiante', 'quiz', '-fecha_inicio'], name='intento_est_quiz_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='intentocuestionario',
+            index=models.Index(fields=['estudiante', 'quiz', 'completado', 'porcentaje'], name='intento_mejor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='intentocuestionario',
+            index=models.Index(condition=models.Q(('completado', True)), fields=['estudiante', '-fecha_inicio'], name='intento_completado_est_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificacion',
+            index=models.Index(fields=['usuario', 'leida', '-fecha_creacion'], name='notificacion_usr_leida_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(condition=models.Q(('activo', True)), fields=['deadline'], name='quiz_deadline_activo_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0013_indices_consultas_criticas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='intentocuestionario',
+            index=models.Index(condition=models.Q(('completado', False)), fields=['fecha_inicio'], name='intento_abierto_fecha_idx'),
+        ),
+    ]
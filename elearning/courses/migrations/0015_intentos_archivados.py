@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0014_intentos_abiertos'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IntentoArchivado',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('fecha_inicio', models.DateTimeField()),
+                ('fecha_finalizacion', models.DateTimeField(blank=True, null=True)),
+                ('puntaje_obtenido', models.FloatField(default=0)),
+                ('puntaje_maximo', models.FloatField(default=0)),
+                ('porcentaje', models.FloatField(default=0)),
+                ('aprobado', models.BooleanField(default=False)),
+                ('respuestas', models.JSONField(default=dict)),
+                ('fecha_archivado', models.DateTimeField(auto_now_add=True)),
+                ('estudiante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='intentos_archivados', to=settings.AUTH_USER_MODEL)),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='intentos_archivados', to='courses.quiz')),
+            ],
+            options={
+                'verbose_name': 'Intento archivado',
+                'verbose_name_plural': 'Intentos archivados',
+                'ordering': ['-fecha_inicio'],
+                'indexes': [models.Index(fields=['estudiante', 'quiz', 'porcentaje'], name='archivado_mejor_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0015_intentos_archivados'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notificacion',
+            index=models.Index(fields=['tipo', 'fecha_creacion'], name='notificacion_tipo_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 06:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0016_retencion_notificaciones'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='version_clave',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
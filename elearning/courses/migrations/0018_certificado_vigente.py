@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-18 07:20
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def marcar_reemplazados(apps, schema_editor):
+    """De cada inscripción solo queda vigente el certificado más reciente"""
+    Certificado = apps.get_model('courses', 'Certificado')
+
+    ultimo = Certificado.objects.filter(inscripcion=OuterRef('inscripcion')).order_by('-fecha_emision', '-id').values('id')[:1]
+    Certificado.objects.annotate(ultimo=Subquery(ultimo)).exclude(id=models.F('ultimo')).update(vigente=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0017_version_clave_quiz'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificado',
+            name='vigente',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.RunPython(marcar_reemplazados, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+from courses import busqueda
+
+
+def recrear_indice(apps, schema_editor):
+    """La tabla cambia de columnas (contenido aparte, clave por documento): se recrea y se vuelve a llenar"""
+    busqueda.eliminar_tabla(schema_editor.connection)
+    busqueda.crear_tabla(schema_editor.connection)
+    busqueda.reconstruir_indice(apps.get_model('courses', 'Curso'), apps.get_model('courses', 'Leccion'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0018_certificado_vigente'),
+    ]
+
+    operations = [
+        migrations.RunPython(recrear_indice, migrations.RunPython.noop),
+    ]
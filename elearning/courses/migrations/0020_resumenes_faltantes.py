@@ -0,0 +1,45 @@
+from django.db import migrations
+from django.db.models import Count, Sum
+
+
+def crear_resumenes_faltantes(apps, schema_editor):
+    """
+    Las inscripciones creadas después de 0004 solo tenían resumen al completar
+    un intento: se crea el de las que aún no lo tienen.
+    """
+    Quiz = apps.get_model('courses', 'Quiz')
+    Enrollment = apps.get_model('courses', 'Enrollment')
+    ResumenQuiz = apps.get_model('courses', 'ResumenQuiz')
+    ResumenCurso = apps.get_model('courses', 'ResumenCurso')
+
+    totales = dict(Quiz.objects.values('curso_id').annotate(total=Count('id')).values_list('curso_id', 'total'))
+    sumas = {
+        (fila['estudiante_id'], fila['quiz__curso_id']): fila
+        for fila in ResumenQuiz.objects.values('estudiante_id', 'quiz__curso_id').annotate(
+            suma=Sum('mejor_porcentaje'), completados=Count('id')
+        )
+    }
+    resumenes = []
+    for inscripcion in Enrollment.objects.filter(resumen__isnull=True).iterator(chunk_size=1000):
+        fila = sumas.get((inscripcion.estudiante_id, inscripcion.curso_id), {'suma': 0, 'completados': 0})
+        total_quizzes = totales.get(inscripcion.curso_id, 0)
+        promedio = fila['suma'] / fila['completados'] if fila['completados'] else 0
+        resumenes.append(ResumenCurso(
+            inscripcion=inscripcion,
+            promedio=promedio,
+            quizzes_completados=fila['completados'],
+            total_quizzes=total_quizzes,
+            aprobado=promedio >= 70 and fila['completados'] == total_quizzes,
+        ))
+    ResumenCurso.objects.bulk_create(resumenes, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0019_busqueda_contenido_privado'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_resumenes_faltantes, migrations.RunPython.noop),
+    ]
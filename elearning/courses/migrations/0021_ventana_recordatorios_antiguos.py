@@ -0,0 +1,45 @@
+from django.db import migrations
+from django.db.models import Exists, OuterRef
+
+# Títulos con los que se generaban los recordatorios antes de 0005, por ventana
+PREFIJOS_VENTANA = (
+    ('24h', '⏰ Deadline urgente: '),
+    ('3d', '📅 Próximo deadline: '),
+)
+
+
+def asignar_ventanas(apps, schema_editor):
+    """
+    Los recordatorios anteriores a 0005 no tienen ventana, así que la restricción
+    única no los ve y se volvían a generar. Se asigna la ventana (según el título)
+    al más reciente de cada usuario y quiz, salvo que ya exista uno con esa
+    ventana; los repetidos más antiguos quedan sin ventana y se eliminan por antigüedad.
+    """
+    Notificacion = apps.get_model('courses', 'Notificacion')
+
+    for ventana, prefijo in PREFIJOS_VENTANA:
+        antiguos = Notificacion.objects.filter(
+            tipo='deadline', ventana__isnull=True, quiz__isnull=False, titulo__startswith=prefijo
+        )
+        con_ventana = Notificacion.objects.filter(
+            usuario_id=OuterRef('usuario_id'), quiz_id=OuterRef('quiz_id'), ventana=ventana
+        )
+        mas_reciente = antiguos.filter(
+            usuario_id=OuterRef('usuario_id'), quiz_id=OuterRef('quiz_id'), id__gt=OuterRef('id')
+        )
+        ids = list(
+            antiguos.exclude(Exists(con_ventana)).exclude(Exists(mas_reciente)).values_list('id', flat=True)
+        )
+        for inicio in range(0, len(ids), 1000):
+            Notificacion.objects.filter(id__in=ids[inicio:inicio + 1000]).update(ventana=ventana)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0020_resumenes_faltantes'),
+    ]
+
+    operations = [
+        migrations.RunPython(asignar_ventanas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,90 @@
+"""
+Variantes redimensionadas de las imágenes de los cursos.
+
+Cada imagen subida se re-codifica una sola vez en varios anchos y formatos
+(WebP y JPEG). Los nombres llevan un hash del contenido del original, así que
+una variante nunca cambia bajo el mismo nombre: se puede servir con cache
+inmutable y dos imágenes idénticas comparten sus variantes.
+"""
+import hashlib
+import logging
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+DIRECTORIO = 'cursos/miniaturas'
+
+# Ancho de la tarjeta del catálogo, su versión 2x y el ancho de la vista de detalle
+ANCHOS = (400, 800, 1200)
+
+# formato -> (formato de Pillow, extensión, opciones de guardado)
+FORMATOS = {
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 6}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def _huella(contenido):
+    return hashlib.sha256(contenido).hexdigest()[:16]
+
+
+def _preparar(imagen, formato):
+    """JPEG no admite transparencia: se aplana sobre fondo blanco"""
+    if formato == 'JPEG' and imagen.mode != 'RGB':
+        imagen = imagen.convert('RGBA')
+        fondo = Image.new('RGB', imagen.size, (255, 255, 255))
+        fondo.paste(imagen, mask=imagen.split()[3])
+        return fondo
+    if imagen.mode not in ('RGB', 'RGBA'):
+        return imagen.convert('RGBA')
+    return imagen
+
+
+def generar_variantes(nombre, storage=None):
+    """
+    Genera (o reutiliza si ya existen) las variantes de la imagen `nombre` del
+    storage. Retorna el dict que se guarda en `Curso.miniaturas`, o un dict
+    vacío si el archivo no existe o no es una imagen válida.
+    """
+    storage = storage or default_storage
+    try:
+        with storage.open(nombre, 'rb') as archivo:
+            contenido = archivo.read()
+        original = ImageOps.exif_transpose(Image.open(BytesIO(contenido)))
+        original.load()
+    except (OSError, UnidentifiedImageError) as error:
+        logger.warning('No se pudieron generar miniaturas de %s: %s', nombre, error)
+        return {}
+
+    huella = _huella(contenido)
+    resultado = {'original': nombre, 'ancho': original.width, 'alto': original.height}
+
+    for clave, (formato, extension, opciones) in FORMATOS.items():
+        variantes = []
+        base = _preparar(original, formato)
+        # Nunca se amplía: anchos mayores que el original se reducen al ancho del original
+        for ancho in sorted({min(ancho, original.width) for ancho in ANCHOS}):
+            destino = f'{DIRECTORIO}/{huella}-{ancho}w.{extension}'
+            if not storage.exists(destino):
+                alto = max(1, round(original.height * ancho / original.width))
+                buffer = BytesIO()
+                base.resize((ancho, alto), Image.LANCZOS).save(buffer, formato, **opciones)
+                guardado = storage.save(destino, ContentFile(buffer.getvalue()))
+                if guardado != destino:
+                    # Otro proceso generó la misma variante al mismo tiempo
+                    storage.delete(guardado)
+            variantes.append([ancho, destino])
+        resultado[clave] = variantes
+
+    return resultado
+
+
+def esta_al_dia(curso):
+    """True si las variantes guardadas corresponden a la imagen actual del curso"""
+    if not curso.imagen:
+        return not curso.miniaturas
+    return curso.miniaturas.get('original') == curso.imagen.name
@@ -1,21 +1,57 @@
-from django.db import models
+import os
+import uuid
+from django.db import models, transaction
+from django.db.models import Count, Max, Q, Sum, ExpressionWrapper, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.conf import settings
 from django.utils import timezone
 
 
+# Promedio mínimo del curso para considerarlo aprobado (%)
+PROMEDIO_APROBATORIO = 70
+
+
 class Curso(models.Model):
     titulo = models.CharField(max_length=100)
     descripcion = models.TextField()
     instructor = models.CharField(max_length=100)
     fecha_creacion = models.DateField(auto_now_add=True)
     imagen = models.ImageField(upload_to='cursos/', blank=True, null=True)
+    # Variantes redimensionadas de la imagen (ver courses/miniaturas.py)
+    miniaturas = models.JSONField(default=dict, blank=True, editable=False)
 
     def __str__(self):
         return self.titulo
 
+    def _srcset(self, formato):
+        return ', '.join(
+            f'{self.imagen.storage.url(nombre)} {ancho}w'
+            for ancho, nombre in self.miniaturas.get(formato, [])
+        )
+
+    @property
+    def srcset_webp(self):
+        return self._srcset('webp')
+
+    @property
+    def srcset_jpeg(self):
+        return self._srcset('jpeg')
+
+    @property
+    def imagen_url(self):
+        """Variante JPEG intermedia como `src` de respaldo; el original si aún no hay variantes"""
+        variantes = self.miniaturas.get('jpeg')
+        if variantes:
+            return self.imagen.storage.url(variantes[len(variantes) // 2][1])
+        return self.imagen.url
+
     class Meta:
         verbose_name = 'Curso'
         verbose_name_plural = 'Cursos'
+        indexes = [
+            # Paginación por cursor del catálogo
+            models.Index(fields=['-fecha_creacion', '-id'], name='curso_fecha_id_idx'),
+        ]
 
 
 class Leccion(models.Model):
@@ -46,6 +82,40 @@ class Leccion(models.Model):
         ordering = ['orden', 'fecha_creacion']
 
 
+class SubidaDocumento(models.Model):
+    """Subida de un documento por fragmentos; se ensambla en disco y puede reanudarse"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='subidas')
+    nombre = models.CharField(max_length=255)
+    tamano = models.PositiveBigIntegerField()
+    recibido = models.PositiveBigIntegerField(default=0)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.nombre} ({self.recibido}/{self.tamano})"
+
+    @property
+    def ruta_parcial(self):
+        return os.path.join(settings.SUBIDAS_DIR, f'{self.id}.part')
+
+    @property
+    def completa(self):
+        return self.recibido == self.tamano
+
+    def descartar(self):
+        """Elimina la subida y su archivo parcial, si todavía existe"""
+        try:
+            os.remove(self.ruta_parcial)
+        except FileNotFoundError:
+            pass
+        self.delete()
+
+    class Meta:
+        verbose_name = 'Subida de documento'
+        verbose_name_plural = 'Subidas de documentos'
+
+
 class Enrollment(models.Model):
     """Inscripción de estudiantes a cursos"""
     estudiante = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
@@ -60,6 +130,12 @@ class Enrollment(models.Model):
         verbose_name = 'Inscripción'
         verbose_name_plural = 'Inscripciones'
         unique_together = ['estudiante', 'curso']
+        indexes = [
+            # Paginación por cursor de "Mis cursos"
+            models.Index(fields=['estudiante', '-fecha_inscripcion', '-id'], name='inscripcion_est_fecha_idx'),
+            # Cubre el join de los recordatorios de deadlines (curso -> estudiantes)
+            models.Index(fields=['curso', 'estudiante'], name='inscripcion_curso_est_idx'),
+        ]
 
 
 # ========== NUEVOS MODELOS: EVALUACIONES ==========
@@ -80,11 +156,34 @@ class Quiz(models.Model):
     fecha_creacion = models.DateTimeField(auto_now_add=True)
     activo = models.BooleanField(default=True)
     
+    # Mantenidos por señales al crear, editar o eliminar preguntas
+    num_preguntas = models.PositiveIntegerField(default=0, editable=False)
+    puntaje_total = models.PositiveIntegerField(default=0, editable=False)
+    # Versión de la clave de respuestas compilada (ver courses/claves.py)
+    version_clave = models.PositiveIntegerField(default=1, editable=False)
+    CAMPOS_MANTENIDOS = ('num_preguntas', 'puntaje_total', 'version_clave')
+    
     def __str__(self):
         return f"{self.curso.titulo} - {self.titulo}"
     
+    def save(self, *args, **kwargs):
+        # Al editar el quiz no se pisan los contadores con valores leídos antes de un cambio en sus preguntas
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = _campos_editables(self)
+        super().save(*args, **kwargs)
+    
     def total_preguntas(self):
-        return self.preguntas.count()
+        return self.num_preguntas
+    
+    @classmethod
+    def actualizar_metadatos(cls, ids=None):
+        """Recalcula número de preguntas y puntaje total con un solo UPDATE (de algunos quizzes o de todos)"""
+        preguntas = Pregunta.objects.filter(quiz=OuterRef('pk')).order_by().values('quiz')
+        quizzes = cls.objects.all() if ids is None else cls.objects.filter(id__in=ids)
+        return quizzes.update(
+            num_preguntas=Coalesce(Subquery(preguntas.annotate(n=Count('id')).values('n')), 0),
+            puntaje_total=Coalesce(Subquery(preguntas.annotate(total=Sum('puntos')).values('total')), 0),
+        )
     
     def esta_disponible(self):
         """Verifica si el quiz está disponible para realizar"""
@@ -98,6 +197,33 @@ class Quiz(models.Model):
         verbose_name = 'Quiz'
         verbose_name_plural = 'Quizzes'
         ordering = ['orden', 'fecha_creacion']
+        indexes = [
+            # Quizzes activos por deadline (programador y recordatorios de deadlines). Es parcial
+            # porque Django compara los booleanos sin "= 1" y SQLite no usaría una columna booleana
+            # del índice para buscar
+            models.Index(fields=['deadline'], condition=Q(activo=True), name='quiz_deadline_activo_idx'),
+        ]
+
+
+def _campos_editables(instancia):
+    return [
+        campo.name for campo in instancia._meta.concrete_fields
+        if not campo.primary_key and campo.name not in instancia.CAMPOS_MANTENIDOS
+    ]
+
+
+class CambioQuiz(models.Model):
+    """Registro de quizzes creados, editados o eliminados que consume el programador de deadlines"""
+    # Sin ForeignKey: el registro debe sobrevivir a la eliminación del quiz
+    quiz_id = models.BigIntegerField()
+    fecha = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"Quiz {self.quiz_id} - {self.fecha}"
+    
+    class Meta:
+        verbose_name = 'Cambio de Quiz'
+        verbose_name_plural = 'Cambios de Quizzes'
 
 
 class Pregunta(models.Model):
@@ -107,9 +233,29 @@ class Pregunta(models.Model):
     puntos = models.PositiveIntegerField(default=1, help_text="Puntos que vale esta pregunta")
     orden = models.PositiveIntegerField(default=0)
     
+    # Mantenidos por señales al crear, editar o eliminar opciones
+    num_opciones = models.PositiveIntegerField(default=0, editable=False)
+    num_correctas = models.PositiveIntegerField(default=0, editable=False)
+    CAMPOS_MANTENIDOS = ('num_opciones', 'num_correctas')
+    
     def __str__(self):
         return f"{self.quiz.titulo} - Pregunta {self.orden}"
     
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = _campos_editables(self)
+        super().save(*args, **kwargs)
+    
+    @classmethod
+    def actualizar_metadatos(cls, ids=None):
+        """Recalcula número de opciones y de opciones correctas con un solo UPDATE"""
+        opciones = Opcion.objects.filter(pregunta=OuterRef('pk')).order_by().values('pregunta')
+        preguntas = cls.objects.all() if ids is None else cls.objects.filter(id__in=ids)
+        return preguntas.update(
+            num_opciones=Coalesce(Subquery(opciones.annotate(n=Count('id')).values('n')), 0),
+            num_correctas=Coalesce(Subquery(opciones.filter(es_correcta=True).annotate(n=Count('id')).values('n')), 0),
+        )
+    
     class Meta:
         verbose_name = 'Pregunta'
         verbose_name_plural = 'Preguntas'
@@ -150,24 +296,59 @@ class IntentoCuestionario(models.Model):
     def __str__(self):
         return f"{self.estudiante.username} - {self.quiz.titulo} - Intento {self.fecha_inicio}"
     
-    def calcular_resultado(self):
-        """Calcula el resultado del intento"""
-        respuestas = self.respuestas.all()
-        total_puntos = sum([r.pregunta.puntos for r in respuestas])
-        puntos_obtenidos = sum([r.pregunta.puntos for r in respuestas if r.es_correcta()])
+    def calcular_resultado(self, respuestas=None):
+        """
+        Calcula el resultado del intento y actualiza los resúmenes de calificaciones.
+        Si se reciben las respuestas ya cargadas se califica sin volver a leerlas.
+        """
+        from .claves import obtener_clave
         
+        if respuestas is None:
+            selecciones = dict(self.respuestas.values_list('pregunta_id', 'opcion_seleccionada_id'))
+        else:
+            selecciones = {r.pregunta_id: r.opcion_seleccionada_id for r in respuestas}
+        
+        # La clave de respuestas compilada se comparte entre todos los intentos del quiz
+        self.aplicar_puntaje(*obtener_clave(self.quiz_id).calificar(selecciones))
+        self.completado = True
+        self.fecha_finalizacion = timezone.now()
+        
+        with transaction.atomic():
+            self.save()
+            self.actualizar_resumenes()
+    
+    def aplicar_puntaje(self, puntos_obtenidos, total_puntos):
+        """Asigna puntajes, porcentaje y aprobación a partir de los puntos calificados"""
         self.puntaje_obtenido = puntos_obtenidos
         self.puntaje_maximo = total_puntos
         self.porcentaje = (puntos_obtenidos / total_puntos * 100) if total_puntos > 0 else 0
         self.aprobado = self.porcentaje >= self.quiz.puntaje_minimo
-        self.completado = True
-        self.fecha_finalizacion = timezone.now()
-        self.save()
+    
+    def actualizar_resumenes(self):
+        """Recalcula el resumen del estudiante en este quiz y en el curso"""
+        ResumenQuiz.recalcular(self.estudiante_id, self.quiz)
+        inscripcion = Enrollment.objects.filter(
+            estudiante_id=self.estudiante_id,
+            curso_id=self.quiz.curso_id
+        ).first()
+        if inscripcion:
+            ResumenCurso.recalcular(inscripcion)
     
     class Meta:
         verbose_name = 'Intento de Cuestionario'
         verbose_name_plural = 'Intentos de Cuestionarios'
         ordering = ['-fecha_inicio']
+        indexes = [
+            # Intentos del estudiante en el detalle del quiz, ya ordenados
+            models.Index(fields=['estudiante', 'quiz', '-fecha_inicio'], name='intento_est_quiz_fecha_idx'),
+            # Mejor porcentaje y conteo de intentos completados sin leer la tabla (ResumenQuiz.recalcular)
+            models.Index(fields=['estudiante', 'quiz', 'completado', 'porcentaje'], name='intento_mejor_idx'),
+            # Intentos completados de un estudiante en todo un curso, ya ordenados (parcial, como
+            # quiz_deadline_activo_idx)
+            models.Index(fields=['estudiante', '-fecha_inicio'], condition=Q(completado=True), name='intento_completado_est_idx'),
+            # Intentos sin enviar por antigüedad (barrer_intentos); solo indexa los abiertos, que son pocos
+            models.Index(fields=['fecha_inicio'], condition=Q(completado=False), name='intento_abierto_fecha_idx'),
+        ]
 
 
 class RespuestaEstudiante(models.Model):
@@ -190,6 +371,61 @@ class RespuestaEstudiante(models.Model):
         unique_together = ['intento', 'pregunta']
 
 
+class IntentoArchivado(models.Model):
+    """
+    Intento completado de un curso cerrado, movido fuera de las tablas de
+    intentos y respuestas (ver courses/archivo.py). Conserva el id original,
+    así los enlaces a su resultado siguen funcionando, y guarda las respuestas
+    en una sola columna {pregunta_id: opcion_id} en lugar de una fila por pregunta.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    estudiante = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='intentos_archivados')
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='intentos_archivados')
+    
+    fecha_inicio = models.DateTimeField()
+    fecha_finalizacion = models.DateTimeField(null=True, blank=True)
+    
+    puntaje_obtenido = models.FloatField(default=0)
+    puntaje_maximo = models.FloatField(default=0)
+    porcentaje = models.FloatField(default=0)
+    aprobado = models.BooleanField(default=False)
+    
+    respuestas = models.JSONField(default=dict)
+    fecha_archivado = models.DateTimeField(auto_now_add=True)
+    
+    # Solo se archivan intentos completados; las plantillas de intentos lo consultan
+    completado = True
+    
+    # Se recalifica igual que un intento vigente (claves.recalificar_quiz)
+    aplicar_puntaje = IntentoCuestionario.aplicar_puntaje
+    
+    def __str__(self):
+        return f"{self.estudiante.username} - {self.quiz.titulo} - Intento {self.fecha_inicio} (archivado)"
+    
+    def respuestas_detalle(self):
+        """
+        Respuestas como objetos `RespuestaEstudiante` sin guardar, con pregunta y
+        opción cargadas, para mostrarlas igual que las de un intento vigente.
+        Se omiten las preguntas u opciones eliminadas después de archivar.
+        """
+        selecciones = {int(pregunta_id): opcion_id for pregunta_id, opcion_id in self.respuestas.items()}
+        respuestas = []
+        for pregunta in Pregunta.objects.filter(id__in=selecciones).prefetch_related('opciones'):
+            opcion = next((opcion for opcion in pregunta.opciones.all() if opcion.id == selecciones[pregunta.id]), None)
+            if opcion is not None:
+                respuestas.append(RespuestaEstudiante(pregunta=pregunta, opcion_seleccionada=opcion))
+        return respuestas
+    
+    class Meta:
+        verbose_name = 'Intento archivado'
+        verbose_name_plural = 'Intentos archivados'
+        ordering = ['-fecha_inicio']
+        indexes = [
+            # Mejor porcentaje y conteo de intentos archivados (ResumenQuiz.recalcular), como intento_mejor_idx
+            models.Index(fields=['estudiante', 'quiz', 'porcentaje'], name='archivado_mejor_idx'),
+        ]
+
+
 # ========== SISTEMA DE NOTIFICACIONES ==========
 
 class Notificacion(models.Model):
@@ -201,6 +437,12 @@ class Notificacion(models.Model):
         ('curso', '📚 Actualización de curso'),
     )
     
+    # Ventanas de recordatorio de deadline (una notificación por usuario, quiz y ventana)
+    VENTANAS = (
+        ('24h', 'Menos de 24 horas'),
+        ('3d', 'Menos de 3 días'),
+    )
+    
     usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notificaciones')
     tipo = models.CharField(max_length=20, choices=TIPOS)
     titulo = models.CharField(max_length=200)
@@ -210,6 +452,8 @@ class Notificacion(models.Model):
     quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, null=True, blank=True)
     curso = models.ForeignKey(Curso, on_delete=models.CASCADE, null=True, blank=True)
     
+    ventana = models.CharField(max_length=3, choices=VENTANAS, null=True, blank=True)
+    
     leida = models.BooleanField(default=False)
     fecha_creacion = models.DateTimeField(auto_now_add=True)
     
@@ -219,4 +463,218 @@ class Notificacion(models.Model):
     class Meta:
         verbose_name = 'Notificación'
         verbose_name_plural = 'Notificaciones'
-        ordering = ['-fecha_creacion']  # Un estudiante solo puede responder una vez por pregunta en cada intento
\ No newline at end of file
+        ordering = ['-fecha_creacion']  # Un estudiante solo puede responder una vez por pregunta en cada intento
+        indexes = [
+            # Paginación por cursor de las notificaciones de cada usuario
+            models.Index(fields=['usuario', '-fecha_creacion', '-id'], name='notificacion_usr_fecha_idx'),
+            # No leídas de cada usuario (marcar todas como leídas, reconciliar el contador)
+            models.Index(fields=['usuario', 'leida', '-fecha_creacion'], name='notificacion_usr_leida_idx'),
+            # Notificaciones de cada tipo por antigüedad (purgar_notificaciones)
+            models.Index(fields=['tipo', 'fecha_creacion'], name='notificacion_tipo_fecha_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['usuario', 'quiz', 'ventana'],
+                condition=Q(ventana__isnull=False),
+                name='notificacion_deadline_unica',
+            ),
+        ]
+
+
+# ========== RESÚMENES DE CALIFICACIONES ==========
+
+class ResumenQuiz(models.Model):
+    """Mejor resultado de un estudiante en un quiz, mantenido al completar cada intento"""
+    estudiante = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='resumenes_quiz')
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='resumenes')
+    
+    mejor_porcentaje = models.FloatField(default=0)
+    total_intentos = models.PositiveIntegerField(default=0)
+    aprobado = models.BooleanField(default=False)
+    
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.estudiante.username} - {self.quiz.titulo} - {self.mejor_porcentaje:.1f}%"
+    
+    @classmethod
+    def recalcular(cls, estudiante_id, quiz):
+        """Recalcula el resumen de un estudiante en un quiz a partir de sus intentos completados y archivados"""
+        agregado = _combinar(
+            IntentoCuestionario.objects.filter(
+                estudiante_id=estudiante_id,
+                quiz=quiz,
+                completado=True
+            ).aggregate(mejor=Max('porcentaje'), total=Count('id')),
+            IntentoArchivado.objects.filter(
+                estudiante_id=estudiante_id,
+                quiz=quiz
+            ).aggregate(mejor=Max('porcentaje'), total=Count('id')),
+        )
+        
+        if not agregado['total']:
+            cls.objects.filter(estudiante_id=estudiante_id, quiz=quiz).delete()
+            return None
+        
+        resumen, _ = cls.objects.update_or_create(
+            estudiante_id=estudiante_id,
+            quiz=quiz,
+            defaults={
+                'mejor_porcentaje': agregado['mejor'],
+                'total_intentos': agregado['total'],
+                'aprobado': agregado['mejor'] >= quiz.puntaje_minimo,
+            }
+        )
+        return resumen
+    
+    @classmethod
+    def actualizar_aprobados(cls, quiz):
+        """Reevalúa el estado de aprobación cuando cambia el puntaje mínimo del quiz"""
+        cls.objects.filter(quiz=quiz).update(aprobado=ExpressionWrapper(
+            Q(mejor_porcentaje__gte=quiz.puntaje_minimo),
+            output_field=models.BooleanField()
+        ))
+    
+    @classmethod
+    def reconstruir(cls, curso=None):
+        """Regenera desde cero los resúmenes (de un curso o de todos) agrupando los intentos"""
+        intentos = IntentoCuestionario.objects.filter(completado=True)
+        archivados = IntentoArchivado.objects.all()
+        existentes = cls.objects.all()
+        if curso is not None:
+            intentos = intentos.filter(quiz__curso=curso)
+            archivados = archivados.filter(quiz__curso=curso)
+            existentes = existentes.filter(quiz__curso=curso)
+        
+        por_par = {}
+        for consulta in (intentos, archivados):
+            for fila in consulta.values('estudiante_id', 'quiz_id', 'quiz__puntaje_minimo').annotate(
+                mejor=Max('porcentaje'),
+                total=Count('id'),
+            ):
+                par = (fila['estudiante_id'], fila['quiz_id'])
+                por_par[par] = _combinar(por_par[par], fila) if par in por_par else fila
+        agregados = por_par.values()
+        
+        with transaction.atomic():
+            existentes.delete()
+            resumenes = cls.objects.bulk_create([
+                cls(
+                    estudiante_id=fila['estudiante_id'],
+                    quiz_id=fila['quiz_id'],
+                    mejor_porcentaje=fila['mejor'],
+                    total_intentos=fila['total'],
+                    aprobado=fila['mejor'] >= fila['quiz__puntaje_minimo'],
+                )
+                for fila in agregados
+            ], batch_size=1000)
+        return len(resumenes)
+    
+    class Meta:
+        verbose_name = 'Resumen de Quiz'
+        verbose_name_plural = 'Resúmenes de Quizzes'
+        unique_together = ['estudiante', 'quiz']
+
+
+def _combinar(agregado, otro):
+    """Suma dos agregados {mejor, total} de intentos (vigentes y archivados)"""
+    mejores = [mejor for mejor in (agregado['mejor'], otro['mejor']) if mejor is not None]
+    return {**agregado, 'mejor': max(mejores, default=None), 'total': agregado['total'] + otro['total']}
+
+
+class ResumenCurso(models.Model):
+    """Promedio y estado de aprobación de una inscripción"""
+    inscripcion = models.OneToOneField(Enrollment, on_delete=models.CASCADE, related_name='resumen')
+    
+    promedio = models.FloatField(default=0)
+    quizzes_completados = models.PositiveIntegerField(default=0)
+    total_quizzes = models.PositiveIntegerField(default=0)
+    aprobado = models.BooleanField(default=False)
+    
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.inscripcion} - {self.promedio:.1f}%"
+    
+    @staticmethod
+    def _valores(suma, completados, total_quizzes):
+        promedio = suma / completados if completados > 0 else 0
+        return {
+            'promedio': promedio,
+            'quizzes_completados': completados,
+            'total_quizzes': total_quizzes,
+            'aprobado': promedio >= PROMEDIO_APROBATORIO and completados == total_quizzes,
+        }
+    
+    @classmethod
+    def recalcular(cls, inscripcion):
+        """Recalcula el resumen de una inscripción a partir de sus resúmenes por quiz"""
+        agregado = ResumenQuiz.objects.filter(
+            estudiante_id=inscripcion.estudiante_id,
+            quiz__curso_id=inscripcion.curso_id
+        ).aggregate(suma=Sum('mejor_porcentaje'), completados=Count('id'))
+        total_quizzes = Quiz.objects.filter(curso_id=inscripcion.curso_id).count()
+        
+        resumen, _ = cls.objects.update_or_create(
+            inscripcion=inscripcion,
+            defaults=cls._valores(agregado['suma'] or 0, agregado['completados'], total_quizzes)
+        )
+        return resumen
+    
+    @classmethod
+    def recalcular_curso(cls, curso):
+        """Recalcula los resúmenes de todas las inscripciones de un curso con una consulta agregada"""
+        total_quizzes = Quiz.objects.filter(curso=curso).count()
+        agregados = {
+            fila['estudiante_id']: fila
+            for fila in ResumenQuiz.objects.filter(quiz__curso=curso).values('estudiante_id').annotate(
+                suma=Sum('mejor_porcentaje'),
+                completados=Count('id'),
+            )
+        }
+        
+        resumenes = []
+        for inscripcion in Enrollment.objects.filter(curso=curso).only('id', 'estudiante_id'):
+            fila = agregados.get(inscripcion.estudiante_id, {'suma': 0, 'completados': 0})
+            resumenes.append(cls(
+                inscripcion=inscripcion,
+                **cls._valores(fila['suma'] or 0, fila['completados'], total_quizzes)
+            ))
+        
+        cls.objects.bulk_create(
+            resumenes,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['inscripcion'],
+            update_fields=['promedio', 'quizzes_completados', 'total_quizzes', 'aprobado', 'fecha_actualizacion'],
+        )
+        return len(resumenes)
+    
+    class Meta:
+        verbose_name = 'Resumen de Curso'
+        verbose_name_plural = 'Resúmenes de Cursos'
+
+
+# ========== CERTIFICADOS ==========
+
+class Certificado(models.Model):
+    """Certificado emitido, guardado como archivo e identificado por la huella de su contenido"""
+    inscripcion = models.ForeignKey(Enrollment, on_delete=models.CASCADE, related_name='certificados')
+    promedio = models.FloatField()
+    fecha_emision = models.DateField()
+    
+    # sha256 de (estudiante, curso, promedio, fecha de emisión)
+    huella = models.CharField(max_length=64, unique=True)
+    # Identificador corto para la verificación pública
+    codigo = models.CharField(max_length=12, unique=True)
+    archivo = models.FileField(upload_to='certificados/')
+    # Falso cuando la calificación cambió y se emitió otro certificado para la inscripción
+    vigente = models.BooleanField(default=True)
+    
+    def __str__(self):
+        return f"{self.codigo} - {self.inscripcion}"
+    
+    class Meta:
+        verbose_name = 'Certificado'
+        verbose_name_plural = 'Certificados'
+        ordering = ['-fecha_emision', '-id']
@@ -0,0 +1,219 @@
+import time
+from collections import Counter
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, F, Sum
+from django.utils import timezone
+from accounts.models import User
+from .models import Notificacion, Enrollment
+from .eventos import avisar_nueva_notificacion
+
+
+# Ventanas de recordatorio, de la más cercana al deadline a la más lejana:
+# (clave, anticipación, título, mensaje). Cada ventana cubre desde el final
+# de la anterior hasta su propia anticipación.
+VENTANAS_DEADLINE = [
+    (
+        '24h',
+        timedelta(hours=24),
+        '⏰ Deadline urgente: {titulo}',
+        'El quiz "{titulo}" vence en menos de 24 horas. ¡Apúrate!',
+    ),
+    (
+        '3d',
+        timedelta(days=3),
+        '📅 Próximo deadline: {titulo}',
+        'El quiz "{titulo}" vence en 3 días.',
+    ),
+]
+
+
+def _filtros_ventanas(ahora):
+    """Filtro de deadline de cada ventana: (clave, filtro, título, mensaje)"""
+    filtros = []
+    inicio = None
+    for ventana, anticipacion, titulo, mensaje in VENTANAS_DEADLINE:
+        fin = ahora + anticipacion
+        if inicio is None:
+            filtro = {'curso__quizzes__deadline__gte': ahora, 'curso__quizzes__deadline__lte': fin}
+        else:
+            filtro = {'curso__quizzes__deadline__gt': inicio, 'curso__quizzes__deadline__lte': fin}
+        filtros.append((ventana, filtro, titulo, mensaje))
+        inicio = fin
+    return filtros
+
+
+def pendientes_deadline(ventana, filtro_deadline):
+    """
+    Pares (estudiante, quiz) inscritos en un quiz activo dentro de la ventana
+    que todavía no tienen su recordatorio, resueltos con un solo anti-join.
+    """
+    ya_notificado = Notificacion.objects.filter(
+        usuario_id=OuterRef('estudiante_id'),
+        quiz_id=OuterRef('quiz_id'),
+        ventana=ventana,
+    )
+    return (
+        Enrollment.objects
+        .filter(curso__quizzes__activo=True, **filtro_deadline)
+        .annotate(quiz_id=F('curso__quizzes__id'), quiz_titulo=F('curso__quizzes__titulo'))
+        .exclude(Exists(ya_notificado))
+        .values_list('estudiante_id', 'quiz_id', 'quiz_titulo', 'curso_id')
+        .order_by()
+    )
+
+
+def _insertar(lote):
+    """
+    Inserta un lote de recordatorios y retorna cuántos se crearon realmente.
+
+    Cada lote va en su propia transacción corta para no retener el bloqueo de escritura.
+    bulk_create no envía post_save, así que el contador de no leídas se ajusta aquí:
+    se recuenta para los usuarios del lote, porque ignore_conflicts omite sin avisar
+    las filas que ya existían (por ejemplo, creadas por una ejecución concurrente).
+    Lo que sube el contador al recontarlo es justamente lo que se insertó: todas
+    llegan sin leer. Los contadores se leen después de insertar, con el bloqueo ya tomado.
+    """
+    usuario_ids = {notificacion.usuario_id for notificacion in lote}
+    usuarios = User.objects.filter(id__in=usuario_ids)
+    with transaction.atomic():
+        Notificacion.objects.bulk_create(lote, ignore_conflicts=True)
+        antes = usuarios.aggregate(total=Sum('no_leidas'))['total'] or 0
+        User.reconciliar_no_leidas(usuario_ids)
+        creadas = (usuarios.aggregate(total=Sum('no_leidas'))['total'] or 0) - antes
+        if creadas:
+            transaction.on_commit(avisar_nueva_notificacion)
+    return creadas
+
+
+def generar_notificaciones_deadlines(dry_run=False, batch_size=1000, quizzes=None, ventanas=None):
+    """
+    Genera los recordatorios de deadlines próximos (24 horas y 3 días).
+
+    Se puede limitar a ciertos quizzes (ids) y ventanas; por defecto revisa todos.
+    La deduplicación la garantiza la restricción única (usuario, quiz, ventana),
+    así que ejecuciones concurrentes o repetidas no crean duplicados.
+    Retorna, por ventana, el número de notificaciones creadas (las pendientes con
+    `dry_run`; las omitidas por una ejecución concurrente no cuentan) y el tiempo empleado.
+    """
+    ahora = timezone.now()
+    reporte = {}
+
+    for ventana, filtro_deadline, titulo, mensaje in _filtros_ventanas(ahora):
+        if ventanas is not None and ventana not in ventanas:
+            continue
+        if quizzes is not None:
+            filtro_deadline = {**filtro_deadline, 'curso__quizzes__id__in': quizzes}
+
+        inicio = time.monotonic()
+        creadas = 0
+        lote = []
+
+        for estudiante_id, quiz_id, quiz_titulo, curso_id in pendientes_deadline(ventana, filtro_deadline).iterator(chunk_size=batch_size):
+            if dry_run:
+                creadas += 1
+                continue
+            lote.append(Notificacion(
+                usuario_id=estudiante_id,
+                tipo='deadline',
+                ventana=ventana,
+                titulo=titulo.format(titulo=quiz_titulo),
+                mensaje=mensaje.format(titulo=quiz_titulo),
+                quiz_id=quiz_id,
+                curso_id=curso_id,
+            ))
+            if len(lote) >= batch_size:
+                creadas += _insertar(lote)
+                lote = []
+
+        if lote:
+            creadas += _insertar(lote)
+
+        reporte[ventana] = {
+            'creadas': creadas,
+            'segundos': time.monotonic() - inicio,
+        }
+
+    return reporte
+
+
+# ========== RETENCIÓN Y COMPACTACIÓN ==========
+
+def recordatorios_repetidos():
+    """
+    Recordatorios de deadline que ya tienen otro más reciente (por id) para el
+    mismo usuario y quiz: el de 3 días cuando ya llegó el de 24 horas.
+    """
+    mas_reciente = Notificacion.objects.filter(
+        usuario_id=OuterRef('usuario_id'),
+        quiz_id=OuterRef('quiz_id'),
+        ventana__isnull=False,
+        id__gt=OuterRef('id'),
+    )
+    return Notificacion.objects.filter(tipo='deadline', ventana__isnull=False).filter(Exists(mas_reciente))
+
+
+def notificaciones_vencidas(ahora):
+    """
+    Consultas de lo que ya no se conserva, por tipo: las leídas según
+    `NOTIFICACIONES_RETENCION_DIAS` y las no leídas después de
+    `NOTIFICACIONES_NO_LEIDAS_DIAS`. Retorna [(etiqueta, queryset)].
+    """
+    consultas = []
+    for tipo, _ in Notificacion.TIPOS:
+        dias = settings.NOTIFICACIONES_RETENCION_DIAS.get(tipo)
+        if dias is not None:
+            consultas.append((f'{tipo} leídas', Notificacion.objects.filter(
+                tipo=tipo, fecha_creacion__lt=ahora - timedelta(days=dias), leida=True
+            )))
+        if settings.NOTIFICACIONES_NO_LEIDAS_DIAS is not None:
+            consultas.append((f'{tipo} no leídas', Notificacion.objects.filter(
+                tipo=tipo, fecha_creacion__lt=ahora - timedelta(days=settings.NOTIFICACIONES_NO_LEIDAS_DIAS), leida=False
+            )))
+    return consultas
+
+
+def _eliminar_por_lotes(consulta, batch_size, pausa):
+    """
+    Elimina lo que devuelve la consulta en lotes, de lo más antiguo a lo más
+    reciente, cada uno en su propia transacción corta (y con una pausa opcional
+    entre lotes) para no retener el bloqueo de escritura. Ajusta el contador de
+    no leídas de cada usuario.
+    """
+    eliminadas = 0
+    while True:
+        lote = list(consulta.order_by('fecha_creacion').values_list('id', flat=True)[:batch_size])
+        if not lote:
+            break
+        with transaction.atomic():
+            # `leida` se vuelve a leer con las filas bloqueadas: el usuario pudo marcarlas
+            # como leídas (o eliminarlas) después de armar el lote
+            filas = list(
+                Notificacion.objects.select_for_update().filter(id__in=lote).values_list('id', 'usuario_id', 'leida')
+            )
+            Notificacion.objects.filter(id__in=[notificacion_id for notificacion_id, _, _ in filas]).delete()
+            no_leidas = Counter(usuario_id for _, usuario_id, leida in filas if not leida)
+            User.ajustar_no_leidas({usuario_id: -total for usuario_id, total in no_leidas.items()})
+        eliminadas += len(filas)
+        if len(lote) < batch_size:
+            break
+        if pausa:
+            time.sleep(pausa)
+    return eliminadas
+
+
+def purgar_notificaciones(dry_run=False, batch_size=1000, pausa=0):
+    """
+    Compacta los recordatorios de deadline repetidos y elimina las
+    notificaciones que superaron su tiempo de retención.
+    Retorna cuántas se eliminaron (o se eliminarían) por concepto.
+    """
+    consultas = [('recordatorios repetidos', recordatorios_repetidos())] + notificaciones_vencidas(timezone.now())
+    reporte = {}
+    for etiqueta, consulta in consultas:
+        if dry_run:
+            reporte[etiqueta] = consulta.count()
+        else:
+            reporte[etiqueta] = _eliminar_por_lotes(consulta, batch_size, pausa)
+    return reporte
@@ -0,0 +1,138 @@
+import base64
+import json
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+
+class PaginaCursor:
+    """Página obtenida por cursor (keyset): sabe si hay página anterior/siguiente y sus URLs"""
+
+    def __init__(self, object_list, url_anterior=None, url_siguiente=None, url_primera=None):
+        self.object_list = object_list
+        self.url_anterior = url_anterior
+        self.url_siguiente = url_siguiente
+        self.url_primera = url_primera
+
+    @property
+    def has_previous(self):
+        return self.url_anterior is not None
+
+    @property
+    def has_next(self):
+        return self.url_siguiente is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_previous or self.has_next or self.url_primera is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def _codificar(valores):
+    texto = json.dumps(valores, default=str)
+    return base64.urlsafe_b64encode(texto.encode()).decode().rstrip('=')
+
+
+def _decodificar(cursor):
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(cursor + relleno))
+    except ValueError:
+        return None
+
+
+def _convertir(modelo, campo, valor):
+    """Convierte el valor del cursor al tipo del campo (fechas, decimales...)"""
+    try:
+        return modelo._meta.get_field(campo).to_python(valor)
+    except FieldDoesNotExist:
+        return valor  # Anotaciones: se usan tal cual
+
+
+def _valores_cursor(cursor, modelo, campos):
+    """
+    Valores del cursor convertidos al tipo de cada campo, o None si el cursor no
+    es válido (alterado a mano o de otro listado): entonces se muestra la primera página.
+    """
+    valores = _decodificar(cursor)
+    if not isinstance(valores, list) or len(valores) != len(campos):
+        return None
+    if not all(isinstance(valor, (str, int, float)) for valor in valores):
+        return None
+    try:
+        valores = [_convertir(modelo, campo, valor) for (campo, _), valor in zip(campos, valores)]
+    except (ValidationError, TypeError, ValueError):
+        return None
+    return valores if None not in valores else None
+
+
+def _filtro_despues(campos, valores, invertir):
+    """
+    Condición lexicográfica "después de (v1, v2, ...)" según el orden de cada campo:
+    (f1 > v1) OR (f1 = v1 AND f2 > v2) OR ...
+    """
+    condicion = Q()
+    for i, (campo, descendente) in enumerate(campos):
+        mayor = descendente == invertir
+        paso = Q(**{f'{campo}__{"gt" if mayor else "lt"}': valores[i]})
+        for campo_previo, valor_previo in zip([c for c, _ in campos[:i]], valores[:i]):
+            paso &= Q(**{campo_previo: valor_previo})
+        condicion |= paso
+    return condicion
+
+
+def _url(request, clave=None, cursor=None):
+    parametros = request.GET.copy()
+    parametros.pop('despues', None)
+    parametros.pop('antes', None)
+    if clave:
+        parametros[clave] = cursor
+    return f'?{parametros.urlencode()}'
+
+
+def paginar_por_cursor(request, queryset, orden, por_pagina=20):
+    """
+    Pagina un queryset por cursor en lugar de OFFSET: cada página filtra a partir
+    de los valores del último (o primer) elemento de la anterior, así que su costo
+    no depende de qué tan profunda sea. `orden` debe terminar en un campo único
+    (normalmente 'id' o '-id') y conviene que esté respaldado por un índice.
+    Los cursores llegan en los parámetros GET `despues` y `antes`.
+    """
+    campos = [(campo.lstrip('-'), campo.startswith('-')) for campo in orden]
+    modelo = queryset.model
+
+    cursor = request.GET.get('despues') or request.GET.get('antes')
+    valores = _valores_cursor(cursor, modelo, campos) if cursor else None
+    # Con un cursor inválido se muestra la primera página, también si llegó en `antes`
+    hacia_atras = valores is not None and bool(request.GET.get('antes')) and not request.GET.get('despues')
+
+    if hacia_atras:
+        queryset = queryset.order_by(*[campo if descendente else f'-{campo}' for campo, descendente in campos])
+    else:
+        queryset = queryset.order_by(*orden)
+
+    if valores is not None:
+        queryset = queryset.filter(_filtro_despues(campos, valores, invertir=hacia_atras))
+
+    elementos = list(queryset[:por_pagina + 1])
+    hay_mas = len(elementos) > por_pagina
+    elementos = elementos[:por_pagina]
+    if hacia_atras:
+        elementos.reverse()
+
+    def cursor_de(elemento):
+        return _codificar([getattr(elemento, campo) for campo, _ in campos])
+
+    url_anterior = url_siguiente = None
+    if elementos:
+        if (hacia_atras and hay_mas) or (not hacia_atras and valores is not None):
+            url_anterior = _url(request, 'antes', cursor_de(elementos[0]))
+        if (not hacia_atras and hay_mas) or hacia_atras:
+            url_siguiente = _url(request, 'despues', cursor_de(elementos[-1]))
+
+    url_primera = _url(request) if valores is not None else None
+    return PaginaCursor(elementos, url_anterior, url_siguiente, url_primera)
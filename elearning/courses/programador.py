@@ -0,0 +1,132 @@
+import heapq
+import logging
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from .models import Quiz, CambioQuiz
+from .notificaciones import VENTANAS_DEADLINE, generar_notificaciones_deadlines
+
+logger = logging.getLogger(__name__)
+
+
+class ProgramadorDeadlines:
+    """
+    Programador de recordatorios de deadlines basado en eventos.
+
+    Mantiene en memoria una cola de prioridad con los momentos en que cada quiz
+    entra en una ventana de recordatorio (deadline − 3 días, deadline − 24 horas)
+    y solo despierta cuando vence el siguiente o cuando llega un cambio de quiz
+    por el registro CambioQuiz. Las entradas obsoletas (quiz editado o
+    eliminado) se descartan al salir de la cola.
+    """
+
+    def __init__(self, intervalo_cambios=30, batch_size=1000):
+        self.intervalo_cambios = intervalo_cambios
+        self.batch_size = batch_size
+        self.cola = []
+        self.deadlines = {}
+
+    def _programar(self, quiz_id, deadline):
+        self.deadlines[quiz_id] = deadline
+        for ventana, anticipacion, _, _ in VENTANAS_DEADLINE:
+            heapq.heappush(self.cola, (deadline - anticipacion, quiz_id, ventana, deadline))
+
+    def _quizzes_programables(self):
+        return Quiz.objects.filter(activo=True, deadline__gt=timezone.now())
+
+    def cargar(self):
+        """Carga inicial de todos los quizzes con deadline futuro"""
+        # Los cambios visibles antes de leer los quizzes ya quedan reflejados en la carga
+        pendientes = list(CambioQuiz.objects.values_list('id', flat=True))
+        self.cola = []
+        self.deadlines = {}
+        for quiz_id, deadline in self._quizzes_programables().values_list('id', 'deadline'):
+            self.deadlines[quiz_id] = deadline
+            for ventana, anticipacion, _, _ in VENTANAS_DEADLINE:
+                self.cola.append((deadline - anticipacion, quiz_id, ventana, deadline))
+        heapq.heapify(self.cola)
+        self._descartar_cambios(pendientes)
+        logger.info('Programador de deadlines: %s quizzes cargados', len(self.deadlines))
+
+    def _descartar_cambios(self, cambio_ids):
+        """
+        Elimina exactamente los cambios leídos. No se usa "id <= el mayor leído":
+        en PostgreSQL un id menor puede confirmarse después que uno mayor y se perdería.
+        """
+        for inicio in range(0, len(cambio_ids), self.batch_size):
+            CambioQuiz.objects.filter(id__in=cambio_ids[inicio:inicio + self.batch_size]).delete()
+
+    def aplicar_cambios(self):
+        """Lee los cambios de quizzes pendientes y reprograma esos quizzes"""
+        cambios = list(CambioQuiz.objects.values_list('id', 'quiz_id'))
+        if not cambios:
+            return 0
+
+        quiz_ids = {quiz_id for _, quiz_id in cambios}
+        for quiz_id in quiz_ids:
+            self.deadlines.pop(quiz_id, None)
+        for quiz_id, deadline in self._quizzes_programables().filter(id__in=quiz_ids).values_list('id', 'deadline'):
+            self._programar(quiz_id, deadline)
+
+        # Los cambios ya consumidos no se vuelven a leer
+        self._descartar_cambios([cambio_id for cambio_id, _ in cambios])
+        return len(quiz_ids)
+
+    def procesar_vencidos(self):
+        """Genera los recordatorios de todas las entradas cuyo momento ya llegó"""
+        ahora = timezone.now()
+        procesados = 0
+        while self.cola and self.cola[0][0] <= ahora:
+            _, quiz_id, ventana, deadline = heapq.heappop(self.cola)
+            if self.deadlines.get(quiz_id) != deadline:
+                continue  # Entrada obsoleta
+            if deadline <= ahora:
+                self.deadlines.pop(quiz_id, None)
+                continue
+            reporte = generar_notificaciones_deadlines(
+                batch_size=self.batch_size,
+                quizzes=[quiz_id],
+                ventanas=[ventana],
+            )
+            procesados += 1
+            logger.info(
+                'Recordatorios %s del quiz %s: %s creados',
+                ventana, quiz_id, sum(datos['creadas'] for datos in reporte.values())
+            )
+        return procesados
+
+    def segundos_hasta_siguiente(self):
+        """Tiempo a dormir: hasta la siguiente entrada o la siguiente revisión de cambios"""
+        espera = self.intervalo_cambios
+        if self.cola:
+            espera = min(espera, (self.cola[0][0] - timezone.now()).total_seconds())
+        return max(espera, 0)
+
+    def ejecutar(self, una_vez=False):
+        self.cargar()
+        while True:
+            self.aplicar_cambios()
+            self.procesar_vencidos()
+            if una_vez:
+                return
+            time.sleep(self.segundos_hasta_siguiente())
+
+
+def purgar_cambios(dry_run=False, batch_size=1000):
+    """
+    Elimina los cambios de quizzes que el programador no consumió en
+    `CAMBIOS_QUIZ_RETENCION_DIAS`. Sin el programador corriendo la tabla crecería
+    sin límite, y al iniciarse carga todos los quizzes sin necesitarlos.
+    """
+    limite = timezone.now() - timedelta(days=settings.CAMBIOS_QUIZ_RETENCION_DIAS)
+    antiguos = CambioQuiz.objects.filter(fecha__lt=limite)
+    if dry_run:
+        return antiguos.count()
+
+    eliminados = 0
+    while True:
+        ids = list(antiguos.order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return eliminados
+        eliminados += CambioQuiz.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,270 @@
+"""
+Medición de rendimiento por petición (opcional, con `RENDIMIENTO_ACTIVO`).
+
+El middleware registra para cada petición la vista que la atendió (nombre de
+la URL), el tiempo total, el tiempo en base de datos, el número de consultas y
+cuántas se repitieron con el mismo SQL (síntoma de N+1). Las mediciones se
+acumulan en memoria y se escriben por lotes en un archivo SQLite aparte, para
+no mezclar sus escrituras con las consultas que se están midiendo; se leen con
+`manage.py perfreport`.
+"""
+import atexit
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+LOTE_ESCRITURA = 50
+SEGUNDOS_ENTRE_ESCRITURAS = 5
+
+_ESPACIOS = re.compile(r'\s+')
+_LISTA_PARAMETROS = re.compile(r'\((?:%s, )+%s\)')
+
+
+def huella_sql(sql):
+    """Misma huella para consultas que solo cambian en sus parámetros (incluidas listas IN de distinto largo)"""
+    return _LISTA_PARAMETROS.sub('(%s...)', _ESPACIOS.sub(' ', sql.strip()))
+
+
+class MedidorConsultas:
+    """Envoltura de `execute` que cuenta consultas y tiempo en base de datos"""
+
+    def __init__(self):
+        self.consultas = 0
+        self.segundos = 0.0
+        self.huellas = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.segundos += time.perf_counter() - inicio
+            self.consultas += 1
+            self.huellas[huella_sql(sql)] += 1
+
+    @property
+    def duplicadas(self):
+        return sum(veces - 1 for veces in self.huellas.values())
+
+    def mas_repetida(self):
+        if not self.huellas:
+            return None, 0
+        return self.huellas.most_common(1)[0]
+
+
+def percentil(valores_ordenados, p):
+    """Percentil por rango más cercano de una lista ya ordenada"""
+    indice = max(0, -(-len(valores_ordenados) * p // 100) - 1)
+    return valores_ordenados[int(indice)]
+
+
+# ========== ALMACÉN ==========
+
+class Almacen:
+    """Archivo SQLite local con las mediciones"""
+
+    def __init__(self, ruta):
+        self.ruta = str(ruta)
+        self._pendientes = []
+        self._candado = threading.Lock()
+        self._ultima_escritura = time.monotonic()
+        self._crear_tabla()
+
+    def _conectar(self):
+        conexion = sqlite3.connect(self.ruta, timeout=5)
+        conexion.execute('PRAGMA journal_mode=WAL')
+        conexion.execute('PRAGMA synchronous=NORMAL')
+        return conexion
+
+    def _crear_tabla(self):
+        with self._conectar() as conexion:
+            conexion.execute("""
+                CREATE TABLE IF NOT EXISTS mediciones (
+                    fecha REAL NOT NULL,
+                    vista TEXT NOT NULL,
+                    metodo TEXT NOT NULL,
+                    estado INTEGER NOT NULL,
+                    total_ms REAL NOT NULL,
+                    db_ms REAL NOT NULL,
+                    consultas INTEGER NOT NULL,
+                    duplicadas INTEGER NOT NULL,
+                    sql_repetido TEXT
+                )
+            """)
+            conexion.execute('CREATE INDEX IF NOT EXISTS mediciones_vista_fecha ON mediciones (vista, fecha)')
+
+    def agregar(self, medicion):
+        with self._candado:
+            self._pendientes.append(medicion)
+            vencido = time.monotonic() - self._ultima_escritura >= SEGUNDOS_ENTRE_ESCRITURAS
+            if len(self._pendientes) < LOTE_ESCRITURA and not vencido:
+                return
+            lote, self._pendientes = self._pendientes, []
+            self._ultima_escritura = time.monotonic()
+        self._escribir(lote)
+
+    def vaciar(self):
+        with self._candado:
+            lote, self._pendientes = self._pendientes, []
+        self._escribir(lote)
+
+    def _escribir(self, lote):
+        if not lote:
+            return
+        try:
+            with self._conectar() as conexion:
+                conexion.executemany('INSERT INTO mediciones VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', lote)
+        except sqlite3.Error as error:
+            # Medir nunca debe tumbar una petición
+            logger.warning('No se pudieron guardar %s mediciones: %s', len(lote), error)
+
+    def leer(self, desde=None, vista=None):
+        condiciones, parametros = [], []
+        if desde is not None:
+            condiciones.append('fecha >= ?')
+            parametros.append(desde)
+        if vista:
+            condiciones.append('vista = ?')
+            parametros.append(vista)
+        donde = f"WHERE {' AND '.join(condiciones)}" if condiciones else ''
+        with self._conectar() as conexion:
+            return conexion.execute(
+                f'SELECT vista, total_ms, db_ms, consultas, duplicadas, sql_repetido FROM mediciones {donde}',
+                parametros
+            ).fetchall()
+
+    def limpiar(self):
+        with self._conectar() as conexion:
+            return conexion.execute('DELETE FROM mediciones').rowcount
+
+
+_almacen = None
+
+
+def obtener_almacen():
+    global _almacen
+    if _almacen is None:
+        _almacen = Almacen(settings.RENDIMIENTO_ARCHIVO)
+        atexit.register(_almacen.vaciar)
+    return _almacen
+
+
+# ========== MIDDLEWARE ==========
+
+class MedicionRendimientoMiddleware:
+    """
+    Mide cada petición y avisa en el log cuando una vista supera los
+    presupuestos de tiempo o de consultas. Agrega la cabecera Server-Timing
+    para verlo también en las herramientas del navegador.
+
+    Funciona igual bajo WSGI y ASGI. Con respuestas en streaming la medición
+    se cierra cuando termina el flujo: Server-Timing solo puede llevar lo que
+    tardó la vista en responder, y el presupuesto de tiempo no se aplica
+    (un flujo de eventos dura lo que dure la conexión). De un flujo asíncrono
+    solo se mide el tiempo: sus consultas corren en otros hilos.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'RENDIMIENTO_ACTIVO', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.almacen = obtener_almacen()
+        self.presupuesto_ms = settings.RENDIMIENTO_PRESUPUESTO_MS
+        self.presupuesto_consultas = settings.RENDIMIENTO_PRESUPUESTO_CONSULTAS
+        self.asincrono = iscoroutinefunction(get_response)
+        if self.asincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.asincrono:
+            return self.__acall__(request)
+        medidor = MedidorConsultas()
+        inicio = time.perf_counter()
+        with _medir_conexiones(medidor):
+            response = self.get_response(request)
+        return self._responder(request, response, medidor, inicio)
+
+    async def __acall__(self, request):
+        medidor = MedidorConsultas()
+        inicio = time.perf_counter()
+        # Las vistas síncronas corren en el hilo de sync_to_async de la petición: ahí se
+        # envuelven sus conexiones (en el hilo del event loop no habría nada que medir)
+        pila = await sync_to_async(_medir_conexiones)(medidor)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(pila.close)()
+        return self._responder(request, response, medidor, inicio)
+
+    def _responder(self, request, response, medidor, inicio):
+        vista_ms = (time.perf_counter() - inicio) * 1000
+        response['Server-Timing'] = (
+            f'total;dur={vista_ms:.1f}, db;dur={medidor.segundos * 1000:.1f};desc="{medidor.consultas} consultas"'
+        )
+        if not response.streaming:
+            self._registrar(request, response, medidor, vista_ms)
+            return response
+
+        # La medición se cierra cuando termina (o se corta) el flujo
+        contenido = response.streaming_content
+        envolver = self._flujo_asincrono if response.is_async else self._flujo
+        response.streaming_content = envolver(contenido, request, response, medidor, inicio)
+        return response
+
+    def _flujo(self, contenido, request, response, medidor, inicio):
+        try:
+            # Se itera después de que el middleware retornó: se vuelven a envolver las conexiones
+            with _medir_conexiones(medidor):
+                yield from contenido
+        finally:
+            self._registrar(request, response, medidor, (time.perf_counter() - inicio) * 1000)
+
+    async def _flujo_asincrono(self, contenido, request, response, medidor, inicio):
+        try:
+            async for parte in contenido:
+                yield parte
+        finally:
+            self._registrar(request, response, medidor, (time.perf_counter() - inicio) * 1000)
+
+    def _registrar(self, request, response, medidor, total_ms):
+        db_ms = medidor.segundos * 1000
+        coincidencia = getattr(request, 'resolver_match', None)
+        vista = coincidencia.view_name if coincidencia else '(sin ruta)'
+        sql_repetido, veces = medidor.mas_repetida()
+
+        self.almacen.agregar((
+            time.time(), vista, request.method, response.status_code, total_ms, db_ms,
+            medidor.consultas, medidor.duplicadas, sql_repetido if veces > 1 else None,
+        ))
+
+        fuera_de_tiempo = total_ms > self.presupuesto_ms and not response.streaming
+        if fuera_de_tiempo or medidor.consultas > self.presupuesto_consultas:
+            logger.warning(
+                'Vista %s fuera de presupuesto: %.0f ms (%.0f ms en BD), %s consultas, %s repetidas%s',
+                vista, total_ms, db_ms, medidor.consultas, medidor.duplicadas,
+                f'; la más repetida ({veces} veces): {sql_repetido[:200]}' if veces > 1 else '',
+            )
+
+
+def _medir_conexiones(medidor):
+    """
+    Envuelve `execute` de todas las conexiones del hilo actual con el medidor;
+    cerrar la pila retornada (o salir de su `with`) quita las envolturas
+    """
+    pila = ExitStack()
+    for conexion in connections.all():
+        pila.enter_context(conexion.execute_wrapper(medidor))
+    return pila
@@ -0,0 +1,107 @@
+"""
+Lecturas de reportes desde una réplica de la base de datos.
+
+Las vistas de reportes (libro de calificaciones, detalle de estudiante,
+exportaciones, listados del admin) se marcan con `lectura_en_replica` y sus
+consultas de lectura van al alias `replica`; todo lo demás, y toda escritura,
+va a la base principal. Para que nadie vea datos viejos justo después de
+escribir (read-your-writes), tras cualquier petición que no sea GET/HEAD el
+usuario lee de la principal durante `REPLICA_PRIMARIA_SEGUNDOS`.
+
+Sin el alias `replica` en DATABASES nada de esto tiene efecto.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+ALIAS = 'replica'
+COOKIE = 'leer_primaria'
+
+_leer_de_replica = ContextVar('leer_de_replica', default=False)
+
+
+def hay_replica():
+    return ALIAS in settings.DATABASES
+
+
+@contextmanager
+def usar_replica(request=None):
+    """Dentro del bloque, las lecturas van a la réplica (salvo que el usuario acabe de escribir)"""
+    activa = hay_replica() and not getattr(request, 'leer_de_primaria', False)
+    token = _leer_de_replica.set(activa)
+    try:
+        yield
+    finally:
+        _leer_de_replica.reset(token)
+
+
+def lectura_en_replica(vista):
+    """Decorador para vistas de solo lectura que toleran unos segundos de retraso"""
+    @wraps(vista)
+    def envoltura(request, *args, **kwargs):
+        with usar_replica(request):
+            return vista(request, *args, **kwargs)
+    return envoltura
+
+
+class EnrutadorReplica:
+    def db_for_read(self, model, **hints):
+        # Dentro de una transacción de la principal se lee lo que la transacción ve
+        if _leer_de_replica.get() and not connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Una escritura dentro de un reporte hace que el resto del bloque lea de la principal
+        if _leer_de_replica.get():
+            _leer_de_replica.set(False)
+        # Explícito: un objeto leído de la réplica se guarda en la principal
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Son la misma base de datos, solo que una va un poco atrasada
+        if {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, ALIAS}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != ALIAS
+
+
+class PrimariaTrasEscrituraMiddleware:
+    """
+    Marca las peticiones de usuarios que escribieron hace poco (cookie de
+    duración `REPLICA_PRIMARIA_SEGUNDOS`) para que `usar_replica` no las envíe
+    a la réplica.
+    """
+
+    def __init__(self, get_response):
+        if not hay_replica():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.segundos = settings.REPLICA_PRIMARIA_SEGUNDOS
+
+    def __call__(self, request):
+        request.leer_de_primaria = COOKIE in request.COOKIES
+        response = self.get_response(request)
+        if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            response.set_cookie(COOKIE, '1', max_age=self.segundos, httponly=True, samesite='Lax')
+        return response
+
+
+class ListadoEnReplicaAdmin:
+    """Mixin de ModelAdmin: los listados (GET) se leen de la réplica"""
+
+    def changelist_view(self, request, extra_context=None):
+        if request.method != 'GET':
+            return super().changelist_view(request, extra_context)
+        with usar_replica(request):
+            response = super().changelist_view(request, extra_context)
+            # El admin responde con TemplateResponse: las consultas de la página corren al renderizar
+            if hasattr(response, 'render'):
+                response.render()
+            return response
@@ -0,0 +1,183 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from accounts.models import User
+from .models import (
+    Curso, Leccion, Enrollment, Quiz, Pregunta, Opcion, CambioQuiz, IntentoCuestionario, ResumenQuiz, ResumenCurso,
+    Notificacion,
+)
+from .archivo import archivandose
+from .claves import invalidar_clave
+from . import busqueda
+from .miniaturas import esta_al_dia, generar_variantes
+from .estructura import invalidar_estructura
+from .eventos import avisar_nueva_notificacion
+
+
+# ========== RESÚMENES DE CALIFICACIONES ==========
+
+@receiver(post_save, sender=Quiz)
+def quiz_guardado_resumenes(sender, instance, created, **kwargs):
+    """Un quiz nuevo cambia el total del curso; uno editado puede cambiar su puntaje mínimo"""
+    if created:
+        ResumenCurso.recalcular_curso(instance.curso)
+    else:
+        ResumenQuiz.actualizar_aprobados(instance)
+
+
+@receiver(post_save, sender=Enrollment)
+def inscripcion_creada_resumen(sender, instance, created, **kwargs):
+    """
+    Toda inscripción tiene su resumen desde el principio: sin él, filtros y
+    certificados la tratarían como no aprobada. Al reinscribirse se recuperan
+    los resúmenes por quiz que el estudiante ya tenía.
+    """
+    if created:
+        ResumenCurso.recalcular(instance)
+
+
+@receiver(post_delete, sender=Quiz)
+def quiz_eliminado_resumenes(sender, instance, **kwargs):
+    # Se espera al commit: si se está eliminando el curso completo no queda nada que recalcular
+    curso_id = instance.curso_id
+    transaction.on_commit(lambda: ResumenCurso.recalcular_curso(curso_id))
+
+
+@receiver(post_delete, sender=IntentoCuestionario)
+def intento_eliminado_resumenes(sender, instance, **kwargs):
+    """Un intento completado que se elimina deja de contar en los resúmenes del estudiante"""
+    # Los intentos sin enviar no cuentan (los que barre barrer_intentos), y los que se
+    # archivan siguen contando como IntentoArchivado. Ninguna de las dos comprobaciones consulta
+    # la base de datos: los borrados por lotes no pagan una consulta por intento.
+    if not instance.completado or archivandose(instance.id):
+        return
+    
+    def recalcular():
+        # Si se eliminó el quiz completo, su propia señal recalcula el curso
+        quiz = Quiz.objects.filter(id=instance.quiz_id).first()
+        if quiz is not None:
+            instance.quiz = quiz
+            instance.actualizar_resumenes()
+    
+    transaction.on_commit(recalcular)
+
+
+# ========== PROGRAMADOR DE DEADLINES ==========
+
+@receiver(post_save, sender=Quiz)
+@receiver(post_delete, sender=Quiz)
+def quiz_cambiado_programador(sender, instance, **kwargs):
+    """Avisa al programador de deadlines que debe recalcular los recordatorios del quiz"""
+    CambioQuiz.objects.create(quiz_id=instance.id)
+
+
+# ========== CONTADOR DE NOTIFICACIONES NO LEÍDAS ==========
+
+@receiver(post_save, sender=Notificacion)
+def notificacion_creada_contador(sender, instance, created, **kwargs):
+    if not created:
+        return
+    if not instance.leida:
+        User.ajustar_no_leidas({instance.usuario_id: 1})
+    # Las conexiones de eventos en vivo de este proceso no esperan al siguiente intervalo
+    transaction.on_commit(avisar_nueva_notificacion)
+
+
+@receiver(pre_delete, sender=Quiz)
+@receiver(pre_delete, sender=Curso)
+def notificaciones_en_cascada_contador(sender, instance, **kwargs):
+    """Las notificaciones de un quiz o curso eliminado se borran en cascada: se recuenta a sus usuarios"""
+    filtro = {'quiz': instance} if sender is Quiz else {'curso': instance}
+    usuario_ids = set(Notificacion.objects.filter(leida=False, **filtro).values_list('usuario_id', flat=True))
+    if usuario_ids:
+        transaction.on_commit(lambda: User.reconciliar_no_leidas(usuario_ids))
+
+
+# ========== CLAVES DE RESPUESTAS ==========
+
+@receiver(post_save, sender=Quiz)
+@receiver(post_delete, sender=Quiz)
+def quiz_cambiado_clave(sender, instance, **kwargs):
+    invalidar_clave(instance.id)
+
+
+@receiver(post_save, sender=Pregunta)
+@receiver(post_delete, sender=Pregunta)
+def pregunta_cambiada_clave(sender, instance, **kwargs):
+    invalidar_clave(instance.quiz_id)
+
+
+@receiver(post_save, sender=Opcion)
+@receiver(post_delete, sender=Opcion)
+def opcion_cambiada_clave(sender, instance, **kwargs):
+    # Si la pregunta se eliminó en la misma cascada, su propia señal ya invalidó la clave
+    quiz_id = Pregunta.objects.filter(id=instance.pregunta_id).values_list('quiz_id', flat=True).first()
+    if quiz_id is not None:
+        invalidar_clave(quiz_id)
+
+
+# ========== METADATOS DE QUIZZES ==========
+
+@receiver(post_save, sender=Pregunta)
+@receiver(post_delete, sender=Pregunta)
+def pregunta_cambiada_metadatos(sender, instance, **kwargs):
+    """Número de preguntas y puntaje total del quiz, recalculados en la misma transacción"""
+    Quiz.actualizar_metadatos([instance.quiz_id])
+
+
+@receiver(post_save, sender=Opcion)
+@receiver(post_delete, sender=Opcion)
+def opcion_cambiada_metadatos(sender, instance, **kwargs):
+    Pregunta.actualizar_metadatos([instance.pregunta_id])
+
+
+# ========== MINIATURAS ==========
+
+@receiver(post_save, sender=Curso)
+def curso_guardado_miniaturas(sender, instance, **kwargs):
+    """Genera las variantes solo cuando la imagen cambió desde la última vez"""
+    if esta_al_dia(instance):
+        return
+    instance.miniaturas = generar_variantes(instance.imagen.name) if instance.imagen else {}
+    Curso.objects.filter(id=instance.id).update(miniaturas=instance.miniaturas)
+
+
+# ========== ESTRUCTURA DEL CURSO (FRAGMENTO CACHEADO) ==========
+
+@receiver(post_save, sender=Leccion)
+@receiver(post_delete, sender=Leccion)
+@receiver(post_save, sender=Quiz)
+@receiver(post_delete, sender=Quiz)
+def estructura_cambiada(sender, instance, **kwargs):
+    invalidar_estructura(instance.curso_id)
+
+
+@receiver(post_save, sender=Pregunta)
+@receiver(post_delete, sender=Pregunta)
+def pregunta_cambiada_estructura(sender, instance, **kwargs):
+    # El conteo de preguntas del quiz forma parte del fragmento
+    curso_id = Quiz.objects.filter(id=instance.quiz_id).values_list('curso_id', flat=True).first()
+    if curso_id is not None:
+        invalidar_estructura(curso_id)
+
+
+# ========== ÍNDICE DE BÚSQUEDA ==========
+
+@receiver(post_save, sender=Curso)
+def curso_guardado_busqueda(sender, instance, **kwargs):
+    busqueda.indexar_curso(instance)
+
+
+@receiver(post_delete, sender=Curso)
+def curso_eliminado_busqueda(sender, instance, **kwargs):
+    busqueda.quitar_curso_del_indice(instance.id)
+
+
+@receiver(post_save, sender=Leccion)
+def leccion_guardada_busqueda(sender, instance, **kwargs):
+    busqueda.indexar_leccion(instance)
+
+
+@receiver(post_delete, sender=Leccion)
+def leccion_eliminada_busqueda(sender, instance, **kwargs):
+    busqueda.quitar_del_indice('leccion', instance.id)
@@ -0,0 +1,108 @@
+"""
+Subidas de documentos por fragmentos.
+
+El cliente crea una subida indicando nombre y tamaño, y luego envía el archivo
+en fragmentos con PUT y la cabecera `Content-Range: bytes inicio-fin/total`.
+Cada fragmento se escribe directamente en un archivo parcial en
+`settings.SUBIDAS_DIR` leyendo el cuerpo de la petición por bloques, sin
+cargarlo completo en memoria. Si la conexión se corta, el cliente consulta
+cuántos bytes se recibieron y continúa desde ahí.
+"""
+import os
+import re
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+from .models import SubidaDocumento
+
+TAMANO_FRAGMENTO = 5 * 1024 * 1024
+TAMANO_MAXIMO = 2 * 1024 * 1024 * 1024
+BLOQUE_LECTURA = 64 * 1024
+
+_CONTENT_RANGE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+
+class ErrorSubida(Exception):
+    """Fragmento inválido; `estado` es el código HTTP con el que se responde"""
+
+    def __init__(self, mensaje, estado=400):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+class ArchivoEnsamblado(File):
+    """
+    Archivo parcial ya completo. Expone `temporary_file_path` como los archivos
+    temporales de Django, así FileSystemStorage lo mueve en lugar de copiarlo.
+    """
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def iniciar_subida(usuario, nombre, tamano):
+    if not nombre:
+        raise ErrorSubida('Falta el nombre del archivo')
+    if tamano <= 0 or tamano > TAMANO_MAXIMO:
+        raise ErrorSubida('Tamaño de archivo no permitido', 413 if tamano > 0 else 400)
+
+    os.makedirs(settings.SUBIDAS_DIR, exist_ok=True)
+    subida = SubidaDocumento.objects.create(usuario=usuario, nombre=os.path.basename(nombre)[:255], tamano=tamano)
+    open(subida.ruta_parcial, 'wb').close()
+    return subida
+
+
+def recibir_fragmento(subida_id, usuario, content_range, flujo):
+    """
+    Escribe el fragmento que llega en `flujo` (la petición) en su posición.
+    Solo se acepta el fragmento que empieza exactamente donde terminó el último
+    recibido; con otro inicio se responde 409 y el cliente debe reanudar.
+    """
+    coincidencia = _CONTENT_RANGE.match(content_range or '')
+    if not coincidencia:
+        raise ErrorSubida('Cabecera Content-Range inválida')
+    inicio, fin, total = (int(valor) for valor in coincidencia.groups())
+    longitud = fin - inicio + 1
+    if longitud <= 0 or longitud > TAMANO_FRAGMENTO:
+        raise ErrorSubida('Tamaño de fragmento no permitido', 413)
+
+    subida = SubidaDocumento.objects.filter(id=subida_id, usuario=usuario).first()
+    if subida is None:
+        raise ErrorSubida('La subida no existe', 404)
+    if total != subida.tamano or fin >= subida.tamano:
+        raise ErrorSubida('El fragmento no corresponde al archivo')
+    if inicio != subida.recibido:
+        raise ErrorSubida(f'Se esperaba el byte {subida.recibido}', 409)
+
+    # El cuerpo se lee de la red fuera de cualquier transacción: en SQLite una transacción
+    # abierta durante la lectura bloquearía todas las escrituras del sitio. Los bytes más
+    # allá de `recibido` no cuentan, así que no hace falta truncar un fragmento incompleto.
+    escritos = 0
+    with open(subida.ruta_parcial, 'r+b') as parcial:
+        parcial.seek(inicio)
+        while escritos < longitud:
+            bloque = flujo.read(min(BLOQUE_LECTURA, longitud - escritos))
+            if not bloque:
+                break
+            parcial.write(bloque)
+            escritos += len(bloque)
+
+    # Solo avanza si nadie más recibió este fragmento mientras tanto
+    ahora = timezone.now()
+    avanzada = SubidaDocumento.objects.filter(id=subida.id, recibido=inicio).update(
+        recibido=inicio + escritos, fecha_actualizacion=ahora
+    )
+    if not avanzada:
+        subida.refresh_from_db(fields=['recibido'])
+        raise ErrorSubida(f'Se esperaba el byte {subida.recibido}', 409)
+    subida.recibido = inicio + escritos
+    subida.fecha_actualizacion = ahora
+
+    if escritos < longitud:
+        raise ErrorSubida('El fragmento llegó incompleto', 400)
+    return subida
+
+
+def archivo_de_subida(subida):
+    """Archivo listo para asignarse a un FileField"""
+    return ArchivoEnsamblado(open(subida.ruta_parcial, 'rb'), name=subida.nombre)
@@ -1,3 +1,554 @@
-from django.test import TestCase
+import importlib
+import shutil
+import tempfile
+from io import StringIO
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.http import Http404
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from accounts.models import User
+from . import claves
+from .archivo import archivar_intentos
+from .notificaciones import generar_notificaciones_deadlines
+from .paginacion import _codificar, paginar_por_cursor
+from .programador import ProgramadorDeadlines, purgar_cambios
+from .models import (
+    CambioQuiz, Curso, Leccion, Enrollment, Quiz, Pregunta, Opcion, IntentoCuestionario, RespuestaEstudiante, ResumenCurso,
+    Notificacion, SubidaDocumento,
+)
+from .subidas import TAMANO_FRAGMENTO
+from .views_archivos import documento_en_media
+
+
+class DatosBase(TestCase):
+    """Instructor, estudiante inscrito, estudiante sin inscribir y un curso con una lección de texto"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.instructor = User.objects.create_user('profe', password='x', role='teacher')
+        cls.estudiante = User.objects.create_user('alumna', password='x', role='student')
+        cls.ajeno = User.objects.create_user('visitante', password='x', role='student')
+        cls.curso = Curso.objects.create(titulo='Astronomía básica', descripcion='Planetas y estrellas', instructor='profe')
+        cls.leccion = Leccion.objects.create(
+            curso=cls.curso, titulo='Órbitas', descripcion='Leyes de Kepler',
+            tipo='texto', contenido_texto='<p>El perihelio es el punto más cercano al sol</p>',
+        )
+        cls.inscripcion = Enrollment.objects.create(estudiante=cls.estudiante, curso=cls.curso)
+
+
+class BusquedaTests(DatosBase):
+    def buscar(self, texto, usuario=None):
+        self.client.logout()
+        if usuario:
+            self.client.force_login(usuario)
+        return self.client.get('/buscar/', {'q': texto}).context['resultados']
+
+    def test_titulos_y_descripciones_son_publicos(self):
+        resultados = self.buscar('Kepler')
+        self.assertEqual([(r['tipo'], r['objeto_id']) for r in resultados], [('leccion', self.leccion.id)])
+
+    def test_contenido_oculto_sin_inscripcion(self):
+        self.assertEqual(self.buscar('perihelio'), [])
+        self.assertEqual(self.buscar('perihelio', self.ajeno), [])
+
+    def test_contenido_visible_para_inscritos_e_instructores(self):
+        for usuario in (self.estudiante, self.instructor):
+            with self.subTest(usuario=usuario.username):
+                resultados = self.buscar('perihelio', usuario)
+                self.assertEqual(len(resultados), 1)
+                self.assertIn('<mark>perihelio</mark>', resultados[0]['fragmento'])
+
+    def test_fragmento_publico_no_muestra_contenido(self):
+        resultados = self.buscar('Kepler', self.ajeno)
+        self.assertNotIn('perihelio', resultados[0]['fragmento'])
+
+    def test_editar_y_eliminar_reemplazan_el_documento(self):
+        self.leccion.contenido_texto = 'Afelio'
+        self.leccion.save()
+        self.assertEqual(self.buscar('perihelio', self.instructor), [])
+        self.assertEqual(len(self.buscar('afelio')), 0)
+        self.assertEqual(len(self.buscar('afelio', self.instructor)), 1)
+        self.leccion.delete()
+        self.assertEqual(self.buscar('Kepler'), [])
+
+
+class ContadorNoLeidasTests(DatosBase):
+    def setUp(self):
+        self.quiz = Quiz.objects.create(curso=self.curso, titulo='Parcial')
+
+    def notificar(self, **extra):
+        return Notificacion.objects.create(usuario=self.estudiante, tipo='curso', titulo='Aviso', mensaje='x', **extra)
+
+    def contador(self):
+        self.estudiante.refresh_from_db()
+        return self.estudiante.no_leidas
+
+    def assertContadorReal(self):
+        reales = Notificacion.objects.filter(usuario=self.estudiante, leida=False).count()
+        self.assertEqual(self.contador(), reales)
+
+    def test_crear_marcar_y_eliminar(self):
+        primera, segunda, _ = self.notificar(), self.notificar(), self.notificar(leida=True)
+        self.assertEqual(self.contador(), 2)
+
+        self.client.force_login(self.estudiante)
+        self.client.get(f'/notificacion/{primera.id}/marcar-leida/')
+        self.client.get(f'/notificacion/{primera.id}/marcar-leida/')
+        self.assertEqual(self.contador(), 1)
+
+        self.client.get(f'/notificacion/{primera.id}/eliminar/')
+        self.assertEqual(self.contador(), 1)
+        self.client.get(f'/notificacion/{segunda.id}/eliminar/')
+        self.assertEqual(self.contador(), 0)
+        self.assertContadorReal()
+
+    def test_marcar_todas(self):
+        self.notificar(), self.notificar()
+        self.client.force_login(self.estudiante)
+        self.client.get('/notificaciones/', {'marcar_leidas': 1})
+        self.assertEqual(self.contador(), 0)
+
+    def test_eliminar_quiz_o_curso_en_cascada(self):
+        self.notificar(quiz=self.quiz)
+        self.notificar(curso=self.curso)
+        self.notificar()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.quiz.delete()
+        self.assertEqual(self.contador(), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.curso.delete()
+        self.assertEqual(self.contador(), 1)
+        self.assertContadorReal()
+
+    def test_acciones_del_admin(self):
+        admin = User.objects.create_superuser('root', password='x', role='admin')
+        notificaciones = [self.notificar() for _ in range(3)]
+        self.client.force_login(admin)
+        url = '/admin/courses/notificacion/'
+
+        self.client.post(url, {'action': 'marcar_como_leidas', '_selected_action': [notificaciones[0].id]})
+        self.assertEqual(self.contador(), 2)
+        self.client.post(url, {
+            'action': 'delete_selected', 'post': 'yes',
+            '_selected_action': [notificacion.id for notificacion in notificaciones[:2]],
+        })
+        self.assertEqual(self.contador(), 1)
+        self.assertContadorReal()
+
+    def test_recordatorios_repetidos_no_suman(self):
+        from .notificaciones import _insertar
+        recordatorio = dict(tipo='deadline', ventana='24h', titulo='t', mensaje='m', quiz_id=self.quiz.id, curso_id=self.curso.id)
+        _insertar([Notificacion(usuario=self.estudiante, **recordatorio)])
+        _insertar([Notificacion(usuario=self.estudiante, **recordatorio)])
+        self.assertEqual(self.contador(), 1)
+
+
+class ArchivosTemporales:
+    """MEDIA_ROOT y SUBIDAS_DIR en un directorio temporal que se borra al terminar cada prueba"""
+
+    def setUp(self):
+        super().setUp()
+        directorio = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directorio, ignore_errors=True)
+        ajustes = override_settings(MEDIA_ROOT=directorio, SUBIDAS_DIR=directorio)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+
+class DescargaDocumentoTests(ArchivosTemporales, DatosBase):
+    CONTENIDO = b'0123456789abcdef'
+
+    def setUp(self):
+        super().setUp()
+        self.leccion_documento = Leccion.objects.create(
+            curso=self.curso, titulo='Tablas', tipo='documento',
+            documento=SimpleUploadedFile('tablas.pdf', self.CONTENIDO),
+        )
+        self.url = f'/leccion/{self.leccion_documento.id}/documento/'
+
+    def contenido(self, respuesta):
+        return b''.join(respuesta.streaming_content)
+
+    def test_solo_inscritos_descargan(self):
+        self.assertRedirects(self.client.get(self.url), f'/login/?next={self.url}', fetch_redirect_response=False)
+        self.client.force_login(self.ajeno)
+        self.assertRedirects(self.client.get(self.url), f'/{self.curso.id}/', fetch_redirect_response=False)
+        self.client.force_login(self.estudiante)
+        respuesta = self.client.get(self.url)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(self.contenido(respuesta), self.CONTENIDO)
+        self.assertIn('private', respuesta['Cache-Control'])
+
+    def test_rango_parcial(self):
+        self.client.force_login(self.estudiante)
+        respuesta = self.client.get(self.url, HTTP_RANGE='bytes=4-7')
+        self.assertEqual(respuesta.status_code, 206)
+        self.assertEqual(respuesta['Content-Range'], f'bytes 4-7/{len(self.CONTENIDO)}')
+        self.assertEqual(self.contenido(respuesta), b'4567')
+
+        respuesta = self.client.get(self.url, HTTP_RANGE='bytes=-3')
+        self.assertEqual(self.contenido(respuesta), b'def')
+
+    def test_rango_no_satisfacible(self):
+        self.client.force_login(self.estudiante)
+        respuesta = self.client.get(self.url, HTTP_RANGE='bytes=100-200')
+        self.assertEqual(respuesta.status_code, 416)
+        self.assertEqual(respuesta['Content-Range'], f'bytes */{len(self.CONTENIDO)}')
+
+    def test_if_none_match(self):
+        self.client.force_login(self.estudiante)
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH='"otro"').status_code, 200)
+
+    def test_condicional_no_salta_la_inscripcion(self):
+        self.client.force_login(self.estudiante)
+        etag = self.client.get(self.url)['ETag']
+        self.client.force_login(self.ajeno)
+        respuesta = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag, HTTP_RANGE='bytes=0-3')
+        self.assertEqual(respuesta.status_code, 302)
+
+    def test_url_directa_de_media_pasa_por_la_descarga(self):
+        nombre = self.leccion_documento.documento.name.removeprefix('lecciones/documentos/')
+        respuesta = documento_en_media(RequestFactory().get('/'), nombre)
+        self.assertEqual(respuesta.status_code, 302)
+        self.assertEqual(respuesta.url, self.url)
+        with self.assertRaises(Http404):
+            documento_en_media(RequestFactory().get('/'), 'inexistente.pdf')
+
+
+class SubidaPorFragmentosTests(ArchivosTemporales, DatosBase):
+    def iniciar(self, tamano):
+        respuesta = self.client.post('/subidas/', {'nombre': 'apuntes.pdf', 'tamano': tamano})
+        self.assertEqual(respuesta.status_code, 201)
+        return f"/subidas/{respuesta.json()['id']}/"
+
+    def enviar(self, url, datos, content_range):
+        return self.client.put(url, datos, content_type='application/octet-stream', HTTP_CONTENT_RANGE=content_range)
+
+    def test_solo_instructores_inician_subidas(self):
+        self.client.force_login(self.estudiante)
+        self.assertEqual(self.client.post('/subidas/', {'nombre': 'a.pdf', 'tamano': 10}).status_code, 403)
+
+    def test_fragmentos_en_orden(self):
+        self.client.force_login(self.instructor)
+        url = self.iniciar(10)
+        respuesta = self.enviar(url, b'01234', 'bytes 0-4/10')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json()['recibido'], 5)
+        self.assertFalse(respuesta.json()['completa'])
+
+        respuesta = self.enviar(url, b'56789', 'bytes 5-9/10')
+        self.assertTrue(respuesta.json()['completa'])
+        self.assertEqual(self.client.get(url).json()['recibido'], 10)
+        subida = SubidaDocumento.objects.get()
+        with open(subida.ruta_parcial, 'rb') as parcial:
+            self.assertEqual(parcial.read(), b'0123456789')
+
+    def test_fragmento_fuera_de_orden(self):
+        self.client.force_login(self.instructor)
+        url = self.iniciar(10)
+        respuesta = self.enviar(url, b'56789', 'bytes 5-9/10')
+        self.assertEqual(respuesta.status_code, 409)
+        # Reenviar un fragmento ya recibido tampoco avanza
+        self.enviar(url, b'01234', 'bytes 0-4/10')
+        self.assertEqual(self.enviar(url, b'01234', 'bytes 0-4/10').status_code, 409)
+        self.assertEqual(self.client.get(url).json()['recibido'], 5)
+
+    def test_fragmento_demasiado_grande(self):
+        self.client.force_login(self.instructor)
+        total = TAMANO_FRAGMENTO * 2
+        url = self.iniciar(total)
+        respuesta = self.enviar(url, b'x', f'bytes 0-{TAMANO_FRAGMENTO}/{total}')
+        self.assertEqual(respuesta.status_code, 413)
+        self.assertEqual(self.client.get(url).json()['recibido'], 0)
+
+    def test_content_range_invalido(self):
+        self.client.force_login(self.instructor)
+        url = self.iniciar(10)
+        for cabecera in ('', 'bytes 0-4', 'bytes 0-4/*', 'bytes 0-4/20', 'bytes 8-12/10'):
+            with self.subTest(cabecera=cabecera):
+                self.assertEqual(self.enviar(url, b'01234', cabecera).status_code, 400)
+        self.assertEqual(self.client.get(url).json()['recibido'], 0)
+
+    def test_fragmento_incompleto(self):
+        self.client.force_login(self.instructor)
+        url = self.iniciar(10)
+        self.assertEqual(self.enviar(url, b'012', 'bytes 0-4/10').status_code, 400)
+        self.assertEqual(self.client.get(url).json()['recibido'], 3)
+
+    def test_subida_ajena(self):
+        self.client.force_login(self.instructor)
+        url = self.iniciar(10)
+        otro = User.objects.create_user('otra_profe', password='x', role='teacher')
+        self.client.force_login(otro)
+        self.assertEqual(self.enviar(url, b'01234', 'bytes 0-4/10').status_code, 404)
+
+
+class ResumenCursoTests(ArchivosTemporales, DatosBase):
+    """El resumen por inscripción existe siempre y sigue a los intentos del estudiante"""
+
+    def setUp(self):
+        super().setUp()
+        self.quiz = Quiz.objects.create(curso=self.curso, titulo='Leyes de Kepler')
+        pregunta = Pregunta.objects.create(quiz=self.quiz, texto='¿Qué forma tienen las órbitas?')
+        self.correcta = Opcion.objects.create(pregunta=pregunta, texto='Elipses', es_correcta=True)
+        Opcion.objects.create(pregunta=pregunta, texto='Cuadrados')
+        self.url_certificado = f'/{self.curso.id}/certificado/{self.estudiante.id}/'
+
+    def responder(self, opcion):
+        intento = IntentoCuestionario.objects.create(estudiante=self.estudiante, quiz=self.quiz)
+        RespuestaEstudiante.objects.create(intento=intento, pregunta=opcion.pregunta, opcion_seleccionada=opcion)
+        intento.calcular_resultado()
+        return intento
+
+    def resumen(self):
+        return ResumenCurso.objects.get(inscripcion__estudiante=self.estudiante, inscripcion__curso=self.curso)
+
+    def test_inscripcion_nueva_tiene_resumen(self):
+        resumen = self.resumen()
+        self.assertEqual((resumen.promedio, resumen.quizzes_completados, resumen.total_quizzes), (0, 0, 1))
+        self.assertFalse(resumen.aprobado)
+
+    def test_certificado_de_estudiante_aprobado(self):
+        self.responder(self.correcta)
+        self.assertTrue(self.resumen().aprobado)
+        self.client.force_login(self.instructor)
+        respuesta = self.client.get(self.url_certificado)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta['Content-Type'], 'application/pdf')
+
+    def test_eliminar_intento_recalcula_resumen_y_certificado(self):
+        intento = self.responder(self.correcta)
+        with self.captureOnCommitCallbacks(execute=True):
+            intento.delete()
+        resumen = self.resumen()
+        self.assertEqual((resumen.promedio, resumen.quizzes_completados), (0, 0))
+        self.assertFalse(resumen.aprobado)
+
+        self.client.force_login(self.instructor)
+        respuesta = self.client.get(self.url_certificado)
+        self.assertRedirects(respuesta, f'/{self.curso.id}/calificaciones/', fetch_redirect_response=False)
+
+    def test_reinscripcion_recupera_calificaciones(self):
+        self.responder(self.correcta)
+        Enrollment.objects.filter(estudiante=self.estudiante, curso=self.curso).delete()
+        self.client.force_login(self.estudiante)
+        self.client.get(f'/{self.curso.id}/inscribirse/')
+        self.assertTrue(self.resumen().aprobado)
+
+        self.client.force_login(self.instructor)
+        self.assertEqual(self.client.get(self.url_certificado).status_code, 200)
+        libro = self.client.get(f'/{self.curso.id}/calificaciones/', {'estado': 'aprobado'})
+        self.assertEqual([fila['estudiante'] for fila in libro.context['datos_estudiantes']], [self.estudiante])
+
+    def test_detalle_coincide_con_libro(self):
+        self.responder(self.correcta.pregunta.opciones.get(es_correcta=False))
+        self.responder(self.correcta)
+        self.client.force_login(self.instructor)
+        libro = self.client.get(f'/{self.curso.id}/calificaciones/').context['datos_estudiantes'][0]
+        detalle = self.client.get(f'/{self.curso.id}/estudiante/{self.estudiante.id}/').context
+        # El promedio es el de los mejores intentos, no el de todos los intentos
+        self.assertEqual(detalle['promedio_general'], libro['promedio'])
+        self.assertEqual(detalle['promedio_general'], 100)
+        self.assertEqual((detalle['quizzes_completados'], detalle['total_quizzes']), (1, 1))
+        [dato] = detalle['datos_quizzes']
+        self.assertEqual((dato['porcentaje'], dato['total_intentos'], len(dato['intentos'])), (100, 2, 2))
+
+    def test_archivar_no_consulta_por_intento(self):
+        for _ in range(3):
+            self.responder(self.correcta)
+        Quiz.objects.filter(id=self.quiz.id).update(activo=False)
+        with CaptureQueriesContext(connection) as consultas, self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(archivar_intentos(timezone.now() + timedelta(days=1)), 3)
+        lecturas_archivo = [
+            consulta['sql'] for consulta in consultas
+            if consulta['sql'].startswith('SELECT') and 'intentoarchivado' in consulta['sql']
+        ]
+        self.assertEqual(lecturas_archivo, [])
+        # Los archivados siguen contando en los resúmenes
+        self.assertFalse(IntentoCuestionario.objects.exists())
+        self.assertTrue(self.resumen().aprobado)
+
+    def test_certificado_sin_resumen_lo_calcula(self):
+        self.responder(self.correcta)
+        ResumenCurso.objects.all().delete()
+        self.client.force_login(self.instructor)
+        self.assertEqual(self.client.get(self.url_certificado).status_code, 200)
+        self.assertTrue(self.resumen().aprobado)
+
+
+class ClavesTests(DatosBase):
+    def setUp(self):
+        self.quiz = Quiz.objects.create(curso=self.curso, titulo='Mareas')
+        pregunta = Pregunta.objects.create(quiz=self.quiz, texto='¿Qué causa las mareas?')
+        self.correcta = Opcion.objects.create(pregunta=pregunta, texto='La Luna', es_correcta=True)
+
+    def test_recalificar_con_intentos_sin_respuestas(self):
+        vacio = IntentoCuestionario.objects.create(estudiante=self.estudiante, quiz=self.quiz)
+        vacio.calcular_resultado()
+        intento = IntentoCuestionario.objects.create(estudiante=self.estudiante, quiz=self.quiz)
+        RespuestaEstudiante.objects.create(intento=intento, pregunta=self.correcta.pregunta, opcion_seleccionada=self.correcta)
+        intento.calcular_resultado()
+
+        self.assertEqual(claves.recalificar_quiz(self.quiz), 2)
+        vacio.refresh_from_db()
+        intento.refresh_from_db()
+        self.assertEqual((vacio.porcentaje, intento.porcentaje), (0, 100))
+
+    def test_claves_locales_acotadas(self):
+        quizzes = [Quiz.objects.create(curso=self.curso, titulo=f'Quiz {numero}') for numero in range(4)]
+        with mock.patch.object(claves, 'MAXIMO_CLAVES_LOCALES', 2), \
+                mock.patch.object(claves, '_claves_locales', claves.OrderedDict()):
+            for quiz in quizzes[:3]:
+                claves.obtener_clave(quiz.id)
+            self.assertEqual(list(claves._claves_locales), [quizzes[1].id, quizzes[2].id])
+            # Usar una clave la vuelve la más reciente: se descarta la otra
+            claves.obtener_clave(quizzes[1].id)
+            claves.obtener_clave(quizzes[3].id)
+            self.assertEqual(list(claves._claves_locales), [quizzes[1].id, quizzes[3].id])
+
+
+class ProgramadorTests(DatosBase):
+    def test_cambio_con_id_menor_confirmado_despues(self):
+        quiz = Quiz.objects.create(curso=self.curso, titulo='Eclipses', deadline=timezone.now() + timedelta(days=10))
+        programador = ProgramadorDeadlines()
+        programador.cargar()
+        self.assertFalse(CambioQuiz.objects.exists())
+
+        Quiz.objects.filter(id=quiz.id).update(deadline=timezone.now() + timedelta(days=20))
+        # En PostgreSQL un cambio con id menor puede hacerse visible después de otro mayor
+        tardio = CambioQuiz.objects.create(quiz_id=quiz.id)
+        CambioQuiz.objects.create(id=tardio.id + 10, quiz_id=quiz.id)
+        self.assertEqual(programador.aplicar_cambios(), 1)
+        CambioQuiz.objects.create(id=tardio.id + 5, quiz_id=quiz.id)
+        self.assertEqual(programador.aplicar_cambios(), 1)
+        self.assertFalse(CambioQuiz.objects.exists())
+
+    def test_purgar_cambios_sin_consumir(self):
+        antiguo = CambioQuiz.objects.create(quiz_id=1)
+        CambioQuiz.objects.filter(id=antiguo.id).update(fecha=timezone.now() - timedelta(days=2))
+        reciente = CambioQuiz.objects.create(quiz_id=2)
+        self.assertEqual(purgar_cambios(dry_run=True), 1)
+        self.assertEqual(purgar_cambios(batch_size=1), 1)
+        self.assertEqual(list(CambioQuiz.objects.values_list('id', flat=True)), [reciente.id])
+
+
+class RecordatoriosDeadlineTests(DatosBase):
+    def setUp(self):
+        self.quiz = Quiz.objects.create(curso=self.curso, titulo='Cometas', deadline=timezone.now() + timedelta(hours=12))
+
+    def test_reporte_cuenta_las_insertadas(self):
+        self.assertEqual(generar_notificaciones_deadlines(dry_run=True)['24h']['creadas'], 1)
+        self.assertEqual(generar_notificaciones_deadlines()['24h']['creadas'], 1)
+        self.assertEqual(generar_notificaciones_deadlines()['24h']['creadas'], 0)
+        self.assertEqual(Notificacion.objects.filter(tipo='deadline').count(), 1)
+
+    def test_reporte_no_cuenta_las_omitidas(self):
+        # Como si otra ejecución hubiera insertado el recordatorio después de armar los pendientes
+        pendiente = (self.estudiante.id, self.quiz.id, self.quiz.titulo, self.curso.id)
+        generar_notificaciones_deadlines()
+        with mock.patch('courses.notificaciones.pendientes_deadline') as pendientes:
+            pendientes.return_value.iterator.return_value = iter([pendiente])
+            self.assertEqual(generar_notificaciones_deadlines(ventanas=['24h'])['24h']['creadas'], 0)
+        self.assertEqual(Notificacion.objects.filter(tipo='deadline').count(), 1)
+
+    def test_recordatorios_antiguos_reciben_ventana(self):
+        antiguo = dict(
+            usuario=self.estudiante, tipo='deadline', quiz=self.quiz, curso=self.curso,
+            titulo=f'⏰ Deadline urgente: {self.quiz.titulo}', mensaje='m',
+        )
+        repetido = Notificacion.objects.create(**antiguo)
+        reciente = Notificacion.objects.create(**antiguo)
+        migracion = importlib.import_module('courses.migrations.0021_ventana_recordatorios_antiguos')
+        migracion.asignar_ventanas(apps, None)
+
+        self.assertEqual(Notificacion.objects.get(id=reciente.id).ventana, '24h')
+        self.assertIsNone(Notificacion.objects.get(id=repetido.id).ventana)
+        self.assertEqual(generar_notificaciones_deadlines()['24h']['creadas'], 0)
+
+
+class PaginacionCursorTests(DatosBase):
+    ORDEN = ('-fecha_creacion', '-id')
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for numero in range(4):
+            Curso.objects.create(titulo=f'Curso {numero}', descripcion='d', instructor='profe')
+
+    def pagina(self, **parametros):
+        request = RequestFactory().get('/', parametros)
+        return paginar_por_cursor(request, Curso.objects.all(), self.ORDEN, por_pagina=2)
+
+    def ids(self, pagina):
+        return [curso.id for curso in pagina]
+
+    def test_recorrido_completo_en_ambos_sentidos(self):
+        esperados = list(Curso.objects.order_by(*self.ORDEN).values_list('id', flat=True))
+        vistos, paginas = [], []
+        pagina = self.pagina()
+        self.assertFalse(pagina.has_previous)
+        while True:
+            vistos += self.ids(pagina)
+            paginas.append(self.ids(pagina))
+            if not pagina.has_next:
+                break
+            pagina = self.pagina(despues=pagina.url_siguiente.split('despues=')[1])
+        self.assertEqual(vistos, esperados)
+
+        # Hacia atrás se vuelve a la página anterior, en el mismo orden
+        anterior = self.pagina(antes=pagina.url_anterior.split('antes=')[1])
+        self.assertEqual(self.ids(anterior), paginas[-2])
+
+    def test_cursor_alterado_muestra_la_primera_pagina(self):
+        primera = self.ids(self.pagina())
+        alterados = [
+            'NQ',                                  # "5": no es una lista
+            'WyJ4IiwieCJd',                        # ["x", "x"]: no es una fecha
+            '%%%',                                 # no es base64
+            '_-_-',                                # base64 que no es JSON
+            _codificar([1]),                       # longitud distinta a la del orden
+            _codificar([None, 1]),                 # valores nulos
+            _codificar([{'a': 1}, 1]),             # tipos no permitidos
+            _codificar(['2026-01-01T00:00:00', 'x']),  # id no numérico
+        ]
+        for cursor in alterados:
+            for parametro in ('despues', 'antes'):
+                with self.subTest(cursor=cursor, parametro=parametro):
+                    pagina = self.pagina(**{parametro: cursor})
+                    self.assertEqual(self.ids(pagina), primera)
+
+    def test_cursor_alterado_en_la_vista(self):
+        respuesta = self.client.get('/', {'despues': 'WyJ4IiwieCJd'})
+        self.assertEqual(respuesta.status_code, 200)
+
+
+class SeedScaleTests(TestCase):
+    def generar(self, *argumentos):
+        call_command(
+            'seed_scale', *argumentos, estudiantes=6, instructores=1, cursos=2, lecciones=1, quizzes=2,
+            preguntas=2, opciones=2, inscripciones=1, intentos=1, notificaciones=2, prefijo='prueba',
+            stdout=StringIO(),
+        )
+
+    def test_datos_consistentes_y_repetibles(self):
+        self.generar()
+        self.assertEqual(User.objects.filter(username__startswith='prueba_').count(), 7)
+        self.assertEqual(Enrollment.objects.count(), 6)
+        # Lo que mantienen las señales queda al día aunque todo se insertó con bulk_create
+        self.assertEqual(ResumenCurso.objects.count(), Enrollment.objects.count())
+        self.assertEqual(User.reconciliar_no_leidas(), 0)
+        self.assertFalse(Quiz.objects.filter(num_preguntas=0).exists())
+
+        conteos = [modelo.objects.count() for modelo in (User, Curso, Enrollment, IntentoCuestionario, Notificacion)]
+        self.generar('--limpiar')
+        self.assertEqual([modelo.objects.count() for modelo in (User, Curso, Enrollment, IntentoCuestionario, Notificacion)], conteos)
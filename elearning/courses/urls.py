@@ -9,6 +9,8 @@ from .views import (
     inscribirse_curso,
     mis_cursos
 )
+from .views_busqueda import buscar_contenido
+from .views_archivos import crear_subida_documento, subida_documento, descargar_documento
 from .views_quiz import (
     crear_quiz,
     editar_quiz,
@@ -20,10 +22,12 @@ from .views_quiz import (
     agregar_opcion,
     realizar_quiz,
     responder_quiz,
+    autoguardar_respuesta,
     resultado_quiz,
 )
 from .views_notificaciones import (
     mis_notificaciones,
+    eventos_notificaciones,
     marcar_leida,
     eliminar_notificacion,
     generar_notificaciones_manual,
@@ -31,8 +35,10 @@ from .views_notificaciones import (
 
 from .views_calificaciones import (
     calificaciones_curso,
+    exportar_calificaciones,
     generar_certificado,
     detalle_estudiante_curso,
+    verificar_certificado,
 )
 
 urlpatterns = [
@@ -42,11 +48,15 @@ urlpatterns = [
     path('<int:course_id>/', detalle_curso, name='detalle_curso'),
     path('<int:course_id>/inscribirse/', inscribirse_curso, name='inscribirse_curso'),
     path('mis-cursos/', mis_cursos, name='mis_cursos'),
+    path('buscar/', buscar_contenido, name='buscar'),
     
     # Rutas de lecciones
     path('<int:course_id>/agregar-leccion/', agregar_leccion, name='agregar_leccion'),
     path('leccion/<int:leccion_id>/editar/', editar_leccion, name='editar_leccion'),
     path('leccion/<int:leccion_id>/eliminar/', eliminar_leccion, name='eliminar_leccion'),
+    path('leccion/<int:leccion_id>/documento/', descargar_documento, name='descargar_documento'),
+    path('subidas/', crear_subida_documento, name='crear_subida_documento'),
+    path('subidas/<uuid:subida_id>/', subida_documento, name='subida_documento'),
     
     # Rutas de quizzes
     path('<int:course_id>/crear-quiz/', crear_quiz, name='crear_quiz'),
@@ -63,16 +73,20 @@ urlpatterns = [
     
     # Rutas de intentos
     path('intento/<int:intento_id>/responder/', responder_quiz, name='responder_quiz'),
+    path('intento/<int:intento_id>/autoguardar/', autoguardar_respuesta, name='autoguardar_respuesta'),
     path('intento/<int:intento_id>/resultado/', resultado_quiz, name='resultado_quiz'),
     
     # Rutas de notificaciones
     path('notificaciones/', mis_notificaciones, name='mis_notificaciones'),
+    path('notificaciones/eventos/', eventos_notificaciones, name='eventos_notificaciones'),
     path('notificacion/<int:notificacion_id>/marcar-leida/', marcar_leida, name='marcar_leida'),
     path('notificacion/<int:notificacion_id>/eliminar/', eliminar_notificacion, name='eliminar_notificacion'),
     path('generar-notificaciones/', generar_notificaciones_manual, name='generar_notificaciones_manual'),
 
     # Rutas de calificaciones
     path('<int:course_id>/calificaciones/', calificaciones_curso, name='calificaciones_curso'),
+    path('<int:course_id>/calificaciones/exportar/', exportar_calificaciones, name='exportar_calificaciones'),
     path('<int:course_id>/certificado/<int:student_id>/', generar_certificado, name='generar_certificado'),
     path('<int:course_id>/estudiante/<int:student_id>/', detalle_estudiante_curso, name='detalle_estudiante_curso'),
+    path('certificado/verificar/<str:codigo>/', verificar_certificado, name='verificar_certificado'),
 ]
\ No newline at end of file
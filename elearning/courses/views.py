@@ -3,11 +3,17 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from .models import Curso, Leccion, Enrollment
 from .forms import CursoForm, LeccionForm
+from .paginacion import paginar_por_cursor
+from .estructura import renderizar_estructura
+
+
+CURSOS_POR_PAGINA = 12
+INSCRIPCIONES_POR_PAGINA = 12
 
 
 def home(request):
-    cursos = Curso.objects.all()
-    return render(request, 'courses/home.html', {"cursos": cursos})
+    pagina = paginar_por_cursor(request, Curso.objects.all(), ('-fecha_creacion', '-id'), CURSOS_POR_PAGINA)
+    return render(request, 'courses/home.html', {"cursos": pagina.object_list, "pagina": pagina})
 
 
 @login_required
@@ -30,21 +36,20 @@ def crear_curso(request):
 
 def detalle_curso(request, course_id):
     curso = get_object_or_404(Curso, id=course_id)
-    lecciones = curso.lecciones.all()
-    
-    # Verificar si el usuario está inscrito
-    is_enrolled = False
-    if request.user.is_authenticated:
-        is_enrolled = Enrollment.objects.filter(estudiante=request.user, curso=curso).exists()
     
     # Verificar si es el instructor o admin
     puede_editar = False
     if request.user.is_authenticated and request.user.role in ['teacher', 'admin']:
         puede_editar = True
+    
+    # Verificar si el usuario está inscrito (solo aplica a estudiantes)
+    is_enrolled = False
+    if request.user.is_authenticated and not puede_editar:
+        is_enrolled = Enrollment.objects.filter(estudiante=request.user, curso=curso).exists()
 
     return render(request, "courses/detalle_curso.html", {
         "course": curso,
-        "lessons": lecciones,
+        "estructura": renderizar_estructura(request, curso, is_enrolled or puede_editar, puede_editar),
         "is_enrolled": is_enrolled,
         "puede_editar": puede_editar,
     })
@@ -60,11 +65,12 @@ def agregar_leccion(request, course_id):
         return redirect('detalle_curso', course_id=curso.id)
     
     if request.method == "POST":
-        form = LeccionForm(request.POST, request.FILES)
+        form = LeccionForm(request.POST, request.FILES, usuario=request.user)
         if form.is_valid():
             leccion = form.save(commit=False)
             leccion.curso = curso
             leccion.save()
+            form.finalizar_subida()
             messages.success(request, f'Lección "{leccion.titulo}" agregada exitosamente')
             return redirect('detalle_curso', course_id=curso.id)
     else:
@@ -87,9 +93,10 @@ def editar_leccion(request, leccion_id):
         return redirect('detalle_curso', course_id=curso.id)
     
     if request.method == "POST":
-        form = LeccionForm(request.POST, request.FILES, instance=leccion)
+        form = LeccionForm(request.POST, request.FILES, instance=leccion, usuario=request.user)
         if form.is_valid():
             form.save()
+            form.finalizar_subida()
             messages.success(request, f'Lección "{leccion.titulo}" actualizada')
             return redirect('detalle_curso', course_id=curso.id)
     else:
@@ -151,8 +158,10 @@ def mis_cursos(request):
         messages.warning(request, 'Esta sección es solo para estudiantes')
         return redirect('home')
     
-    inscripciones = Enrollment.objects.filter(estudiante=request.user).select_related('curso')
+    inscripciones = Enrollment.objects.filter(estudiante=request.user).select_related('curso', 'resumen')
+    pagina = paginar_por_cursor(request, inscripciones, ('-fecha_inscripcion', '-id'), INSCRIPCIONES_POR_PAGINA)
     
     return render(request, 'courses/mis_cursos.html', {
-        'inscripciones': inscripciones
+        'inscripciones': pagina.object_list,
+        'pagina': pagina,
     })
\ No newline at end of file
@@ -0,0 +1,100 @@
+import os
+
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_http_methods, require_POST
+from django.views.static import serve
+
+from .descargas import servir_archivo
+from .miniaturas import DIRECTORIO
+from .models import Enrollment, Leccion, SubidaDocumento
+from .subidas import TAMANO_FRAGMENTO, ErrorSubida, iniciar_subida, recibir_fragmento
+
+# Prefijo (relativo a MEDIA_ROOT) de los documentos de lecciones, que solo ven los inscritos
+DIRECTORIO_DOCUMENTOS = Leccion._meta.get_field('documento').upload_to
+
+
+def servir_miniatura(request, path):
+    """Sirve una miniatura en desarrollo; su nombre lleva el hash del contenido, así que nunca cambia"""
+    respuesta = serve(request, path, document_root=os.path.join(settings.MEDIA_ROOT, DIRECTORIO))
+    patch_cache_control(respuesta, public=True, max_age=31536000, immutable=True)
+    return respuesta
+
+
+def documento_en_media(request, path):
+    """
+    En desarrollo, las URLs directas a documentos de lecciones (bajo MEDIA_URL)
+    no se sirven como archivos estáticos: pasan por la descarga que verifica la inscripción.
+    """
+    leccion = Leccion.objects.filter(documento=DIRECTORIO_DOCUMENTOS + path).only('id').first()
+    if leccion is None:
+        raise Http404('Documento no encontrado')
+    return redirect('descargar_documento', leccion_id=leccion.id)
+
+
+# ========== SUBIDAS POR FRAGMENTOS ==========
+
+def _estado_subida(subida, status=200):
+    return JsonResponse({
+        'id': str(subida.id),
+        'nombre': subida.nombre,
+        'tamano': subida.tamano,
+        'recibido': subida.recibido,
+        'completa': subida.completa,
+        'tamano_fragmento': TAMANO_FRAGMENTO,
+    }, status=status)
+
+
+@login_required
+@require_POST
+def crear_subida_documento(request):
+    """Inicia una subida: recibe `nombre` y `tamano` y devuelve el id para enviar los fragmentos"""
+    if request.user.role not in ['teacher', 'admin']:
+        return JsonResponse({'error': 'No tienes permiso para subir documentos'}, status=403)
+
+    try:
+        tamano = int(request.POST.get('tamano', ''))
+        subida = iniciar_subida(request.user, request.POST.get('nombre', ''), tamano)
+    except ValueError:
+        return JsonResponse({'error': 'Tamaño inválido'}, status=400)
+    except ErrorSubida as error:
+        return JsonResponse({'error': str(error)}, status=error.estado)
+    return _estado_subida(subida, status=201)
+
+
+@login_required
+@require_http_methods(['GET', 'PUT'])
+def subida_documento(request, subida_id):
+    """GET: cuántos bytes se han recibido (para reanudar). PUT: recibe un fragmento"""
+    if request.method == 'GET':
+        subida = get_object_or_404(SubidaDocumento, id=subida_id, usuario=request.user)
+        return _estado_subida(subida)
+
+    try:
+        subida = recibir_fragmento(subida_id, request.user, request.headers.get('Content-Range'), request)
+    except ErrorSubida as error:
+        return JsonResponse({'error': str(error)}, status=error.estado)
+    return _estado_subida(subida)
+
+
+# ========== DESCARGAS ==========
+
+@login_required
+def descargar_documento(request, leccion_id):
+    leccion = get_object_or_404(Leccion.objects.select_related('curso'), id=leccion_id)
+    if not leccion.documento:
+        raise Http404('La lección no tiene documento')
+
+    # Las mismas reglas que en el detalle del curso: inscritos, instructores y admins
+    puede_ver = request.user.role in ['teacher', 'admin'] or Enrollment.objects.filter(
+        estudiante=request.user, curso=leccion.curso
+    ).exists()
+    if not puede_ver:
+        messages.warning(request, 'Inscríbete para ver el contenido')
+        return redirect('detalle_curso', course_id=leccion.curso_id)
+
+    return servir_archivo(request, leccion.documento)
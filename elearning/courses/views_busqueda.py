@@ -0,0 +1,63 @@
+from django.shortcuts import render
+from .busqueda import buscar
+from .models import Curso, Enrollment
+from .paginacion import PaginaCursor
+
+
+RESULTADOS_POR_PAGINA = 20
+PAGINAS_MAXIMAS = 50  # Más allá de esto conviene refinar la búsqueda
+
+
+def _url_pagina(request, numero):
+    parametros = request.GET.copy()
+    parametros.pop('pagina', None)
+    if numero > 1:
+        parametros['pagina'] = numero
+    return f'?{parametros.urlencode()}'
+
+
+def _cursos_con_contenido(usuario):
+    """Cursos cuyo contenido de lecciones puede ver el usuario (None: todos), como en detalle_curso"""
+    if not usuario.is_authenticated:
+        return set()
+    if usuario.role in ['teacher', 'admin']:
+        return None
+    return set(Enrollment.objects.filter(estudiante=usuario).values_list('curso_id', flat=True))
+
+
+def buscar_contenido(request):
+    """Búsqueda de texto completo en cursos y lecciones, ordenada por relevancia"""
+    texto = request.GET.get('q', '').strip()
+    try:
+        numero = min(max(int(request.GET.get('pagina', 1)), 1), PAGINAS_MAXIMAS)
+    except ValueError:
+        numero = 1
+
+    resultados = []
+    if texto:
+        # Se pide un resultado de más para saber si hay página siguiente sin contar el total
+        resultados = buscar(
+            texto, RESULTADOS_POR_PAGINA + 1, (numero - 1) * RESULTADOS_POR_PAGINA,
+            cursos_con_contenido=_cursos_con_contenido(request.user),
+        )
+    hay_mas = len(resultados) > RESULTADOS_POR_PAGINA and numero < PAGINAS_MAXIMAS
+    resultados = resultados[:RESULTADOS_POR_PAGINA]
+
+    # Títulos de los cursos a los que pertenecen las lecciones, en una sola consulta
+    titulos = dict(Curso.objects.filter(
+        id__in={resultado['curso_id'] for resultado in resultados}
+    ).values_list('id', 'titulo'))
+    for resultado in resultados:
+        resultado['curso_titulo'] = titulos.get(resultado['curso_id'], '')
+
+    pagina = PaginaCursor(
+        resultados,
+        url_anterior=_url_pagina(request, numero - 1) if numero > 1 else None,
+        url_siguiente=_url_pagina(request, numero + 1) if hay_mas else None,
+        url_primera=_url_pagina(request, 1) if numero > 2 else None,
+    )
+    return render(request, 'courses/buscar.html', {
+        'q': texto,
+        'resultados': resultados,
+        'pagina': pagina,
+    })
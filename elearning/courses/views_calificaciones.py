@@ -1,17 +1,29 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import HttpResponse
-from django.db.models import Avg, Count, Q
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import inch
-from datetime import datetime
-from .models import Curso, Quiz, IntentoCuestionario, Enrollment
+import csv
+import tempfile
+from django.http import FileResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from .models import Curso, Enrollment, ResumenCurso, Certificado
+from .calificaciones import LibroCalificaciones, consultar_inscripciones, resumen_curso, intentos_por_quiz, iterar_filas
+from .paginacion import paginar_por_cursor
+from .certificados import obtener_certificado
+from .replica import lectura_en_replica, usar_replica
 from accounts.models import User
 
+try:
+    from openpyxl import Workbook
+except ImportError:  # La exportación a XLSX es opcional
+    Workbook = None
+
+
+ESTUDIANTES_POR_PAGINA = 50
+
 
 @login_required
+@lectura_en_replica
 def calificaciones_curso(request, course_id):
     """Vista para que el instructor vea las calificaciones de todos los estudiantes"""
     curso = get_object_or_404(Curso, id=course_id)
@@ -21,79 +33,108 @@ def calificaciones_curso(request, course_id):
         messages.error(request, 'No tienes permiso para ver estas calificaciones')
         return redirect('detalle_curso', course_id=curso.id)
     
-    # Obtener todos los estudiantes inscritos
-    inscripciones = Enrollment.objects.filter(curso=curso).select_related('estudiante')
-    
-    # Obtener todos los quizzes del curso
-    quizzes = curso.quizzes.all().order_by('orden')
+    # Filtros y orden del lado del servidor
+    busqueda = request.GET.get('q', '').strip()
+    estado = request.GET.get('estado', '')
+    orden = request.GET.get('orden', '')
+    inscripciones, orden_cursor = consultar_inscripciones(curso, busqueda=busqueda, estado=estado, orden=orden)
     
-    # Preparar datos de calificaciones
-    datos_estudiantes = []
-    total_aprobados = 0
-    total_reprobados = 0
-    
-    for inscripcion in inscripciones:
-        estudiante = inscripcion.estudiante
-        
-        # Obtener calificaciones de cada quiz
-        calificaciones_quizzes = []
-        suma_porcentajes = 0
-        quizzes_completados = 0
-        
-        for quiz in quizzes:
-            # Obtener el mejor intento del estudiante en este quiz
-            mejor_intento = IntentoCuestionario.objects.filter(
-                estudiante=estudiante,
-                quiz=quiz,
-                completado=True
-            ).order_by('-porcentaje').first()
-            
-            if mejor_intento:
-                calificaciones_quizzes.append({
-                    'quiz': quiz,
-                    'porcentaje': mejor_intento.porcentaje,
-                    'aprobado': mejor_intento.aprobado,
-                    'intento': mejor_intento
-                })
-                suma_porcentajes += mejor_intento.porcentaje
-                quizzes_completados += 1
-            else:
-                calificaciones_quizzes.append({
-                    'quiz': quiz,
-                    'porcentaje': None,
-                    'aprobado': False,
-                    'intento': None
-                })
-        
-        # Calcular promedio
-        promedio = suma_porcentajes / quizzes_completados if quizzes_completados > 0 else 0
-        aprobado_curso = promedio >= 70 and quizzes_completados == quizzes.count()
-        
-        if aprobado_curso:
-            total_aprobados += 1
-        else:
-            total_reprobados += 1
-        
-        datos_estudiantes.append({
-            'estudiante': estudiante,
-            'inscripcion': inscripcion,
-            'calificaciones': calificaciones_quizzes,
-            'promedio': promedio,
-            'quizzes_completados': quizzes_completados,
-            'total_quizzes': quizzes.count(),
-            'aprobado': aprobado_curso
-        })
+    # Solo se construye la matriz de la página actual
+    pagina = paginar_por_cursor(request, inscripciones, orden_cursor, ESTUDIANTES_POR_PAGINA)
+    libro = LibroCalificaciones(curso, inscripciones=pagina.object_list)
     
     return render(request, 'courses/calificaciones_curso.html', {
         'curso': curso,
-        'quizzes': quizzes,
-        'datos_estudiantes': datos_estudiantes,
-        'total_estudiantes': inscripciones.count(),
-        'total_aprobados': total_aprobados,
-        'total_reprobados': total_reprobados,
+        'quizzes': libro.quizzes,
+        'datos_estudiantes': libro.filas(),
+        'pagina': pagina,
+        'busqueda': busqueda,
+        'estado': estado,
+        'orden': orden,
+        **resumen_curso(curso),
     })
 
 
+class _Eco:
+    """Pseudo-archivo para csv.writer: retorna cada línea en lugar de guardarla"""
+    def write(self, valor):
+        return valor
+
+
+def _encabezados_exportacion(quizzes):
+    return (
+        ['Usuario', 'Nombre', 'Email']
+        + [f'{quiz.titulo} (%)' for quiz in quizzes]
+        + ['Promedio (%)', 'Quizzes completados', 'Aprobado']
+    )
+
+
+def _fila_exportacion(fila):
+    estudiante = fila['estudiante']
+    return (
+        [estudiante.username, estudiante.get_full_name(), estudiante.email]
+        + [
+            round(cal['porcentaje'], 1) if cal['porcentaje'] is not None else ''
+            for cal in fila['calificaciones']
+        ]
+        + [
+            round(fila['promedio'], 1),
+            f"{fila['quizzes_completados']}/{fila['total_quizzes']}",
+            'Sí' if fila['aprobado'] else 'No',
+        ]
+    )
+
+
+@login_required
+@lectura_en_replica
+def exportar_calificaciones(request, course_id):
+    """Exportar las calificaciones del curso en CSV (por streaming) o XLSX"""
+    curso = get_object_or_404(Curso, id=course_id)
+    
+    if request.user.role not in ['teacher', 'admin']:
+        messages.error(request, 'No tienes permiso para exportar estas calificaciones')
+        return redirect('detalle_curso', course_id=curso.id)
+    
+    formato = request.GET.get('formato', 'csv')
+    quizzes = list(curso.quizzes.all().order_by('orden'))
+    nombre = f'calificaciones_{curso.id}'
+    
+    if formato == 'xlsx':
+        if Workbook is None:
+            messages.error(request, 'La exportación a Excel requiere instalar openpyxl')
+            return redirect('calificaciones_curso', course_id=curso.id)
+        
+        # Modo de solo escritura: las filas se vuelcan a un archivo temporal, no a memoria
+        libro = Workbook(write_only=True)
+        hoja = libro.create_sheet('Calificaciones')
+        hoja.append(_encabezados_exportacion(quizzes))
+        for fila in iterar_filas(curso):
+            hoja.append(_fila_exportacion(fila))
+        archivo = tempfile.TemporaryFile()
+        libro.save(archivo)
+        archivo.seek(0)
+        return FileResponse(
+            archivo,
+            as_attachment=True,
+            filename=f'{nombre}.xlsx',
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        )
+    
+    escritor = csv.writer(_Eco())
+    
+    def lineas():
+        # Las filas se leen al enviar la respuesta, ya fuera de la vista
+        with usar_replica(request):
+            yield '\ufeff'  # BOM para que Excel detecte UTF-8
+            yield escritor.writerow(_encabezados_exportacion(quizzes))
+            for fila in iterar_filas(curso):
+                yield escritor.writerow(_fila_exportacion(fila))
+    
+    response = StreamingHttpResponse(lineas(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{nombre}.csv"'
+    return response
+
+
 @login_required
 def generar_certificado(request, course_id, student_id):
     """Generar certificado PDF para un estudiante"""
@@ -108,73 +149,51 @@ def generar_certificado(request, course_id, student_id):
     # Verificar que el estudiante esté inscrito
     inscripcion = get_object_or_404(Enrollment, curso=curso, estudiante=estudiante)
     
-    # Calcular promedio
-    quizzes = curso.quizzes.all()
-    suma_porcentajes = 0
-    quizzes_completados = 0
-    
-    for quiz in quizzes:
-        mejor_intento = IntentoCuestionario.objects.filter(
-            estudiante=estudiante,
-            quiz=quiz,
-            completado=True
-        ).order_by('-porcentaje').first()
-        
-        if mejor_intento:
-            suma_porcentajes += mejor_intento.porcentaje
-            quizzes_completados += 1
+    # Promedio mantenido al completar cada intento; si faltara el resumen se calcula ahora
+    resumen = ResumenCurso.objects.filter(inscripcion=inscripcion).first() or ResumenCurso.recalcular(inscripcion)
+    promedio = resumen.promedio
     
-    promedio = suma_porcentajes / quizzes_completados if quizzes_completados > 0 else 0
-    aprobado = promedio >= 70 and quizzes_completados == quizzes.count()
-    
-    if not aprobado:
+    if not resumen.aprobado:
         messages.error(request, f'{estudiante.username} no ha aprobado el curso')
         return redirect('calificaciones_curso', course_id=curso.id)
     
-    # Crear el PDF
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="certificado_{estudiante.username}_{curso.titulo}.pdf"'
-    
-    # Crear el PDF con ReportLab
-    p = canvas.Canvas(response, pagesize=A4)
-    width, height = A4
-    
-    # Configurar el certificado
-    p.setFont("Helvetica-Bold", 36)
-    p.drawCentredString(width/2, height - 2*inch, "CERTIFICADO")
-    
-    p.setFont("Helvetica", 16)
-    p.drawCentredString(width/2, height - 2.8*inch, "Se otorga a:")
-    
-    p.setFont("Helvetica-Bold", 24)
-    p.drawCentredString(width/2, height - 3.5*inch, estudiante.get_full_name() or estudiante.username)
-    
-    p.setFont("Helvetica", 16)
-    p.drawCentredString(width/2, height - 4.2*inch, "Por haber completado exitosamente el curso:")
-    
-    p.setFont("Helvetica-Bold", 20)
-    p.drawCentredString(width/2, height - 4.9*inch, curso.titulo)
-    
-    p.setFont("Helvetica", 14)
-    p.drawCentredString(width/2, height - 5.6*inch, f"Con un promedio de: {promedio:.1f}%")
-    
-    p.setFont("Helvetica-Oblique", 12)
-    p.drawCentredString(width/2, height - 6.3*inch, f"Instructor: {curso.instructor}")
-    p.drawCentredString(width/2, height - 6.7*inch, f"Fecha: {datetime.now().strftime('%d de %B de %Y')}")
-    
-    # Línea decorativa
-    p.line(2*inch, height - 7.5*inch, width - 2*inch, height - 7.5*inch)
-    
-    p.setFont("Helvetica", 10)
-    p.drawCentredString(width/2, 1*inch, "E-learning Platform - Certificado de Finalización")
+    # El PDF solo se genera de nuevo si cambió la calificación
+    certificado = obtener_certificado(
+        inscripcion,
+        promedio,
+        lambda codigo: request.build_absolute_uri(reverse('verificar_certificado', args=[codigo]))
+    )
+    etag = f'"{certificado.huella}"'
     
-    p.showPage()
-    p.save()
+    no_modificado = get_conditional_response(request, etag=etag)
+    if no_modificado is not None:
+        return no_modificado
     
+    response = FileResponse(
+        certificado.archivo.open('rb'),
+        as_attachment=True,
+        filename=f'certificado_{estudiante.username}_{curso.titulo}.pdf',
+        content_type='application/pdf'
+    )
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, max_age=86400)
     return response
 
 
+def verificar_certificado(request, codigo):
+    """Verificación pública de un certificado a partir de su código"""
+    certificado = Certificado.objects.filter(codigo=codigo.upper()).select_related(
+        'inscripcion__estudiante', 'inscripcion__curso'
+    ).first()
+    
+    return render(request, 'courses/verificar_certificado.html', {
+        'certificado': certificado,
+        'codigo': codigo,
+    })
+
+
 @login_required
+@lectura_en_replica
 def detalle_estudiante_curso(request, course_id, student_id):
     """Ver el detalle completo de un estudiante en un curso"""
     curso = get_object_or_404(Curso, id=course_id)
@@ -186,41 +205,23 @@ def detalle_estudiante_curso(request, course_id, student_id):
         return redirect('home')
     
     # Verificar inscripción
-    inscripcion = get_object_or_404(Enrollment, curso=curso, estudiante=estudiante)
-    
-    # Obtener todos los intentos del estudiante
-    quizzes = curso.quizzes.all().order_by('orden')
-    datos_quizzes = []
-    
-    for quiz in quizzes:
-        intentos = IntentoCuestionario.objects.filter(
-            estudiante=estudiante,
-            quiz=quiz,
-            completado=True
-        ).order_by('-fecha_inicio')
-        
-        mejor_intento = intentos.order_by('-porcentaje').first() if intentos.exists() else None
-        
-        datos_quizzes.append({
-            'quiz': quiz,
-            'intentos': intentos,
-            'mejor_intento': mejor_intento,
-            'total_intentos': intentos.count()
-        })
-    
-    # Calcular estadísticas
-    intentos_totales = IntentoCuestionario.objects.filter(
-        estudiante=estudiante,
-        quiz__curso=curso,
-        completado=True
-    )
+    inscripcion = get_object_or_404(Enrollment.objects.select_related('estudiante'), curso=curso, estudiante=estudiante)
     
-    promedio_general = intentos_totales.aggregate(Avg('porcentaje'))['porcentaje__avg'] or 0
+    # Mejores porcentajes y promedio desde el mismo libro que la página de calificaciones
+    fila = LibroCalificaciones(curso, inscripciones=[inscripcion]).filas()[0]
+    # El historial de intentos, vigentes y archivados, solo se usa para listarlos
+    intentos_quiz = intentos_por_quiz(curso, estudiante)
+    datos_quizzes = [
+        {**calificacion, 'intentos': intentos_quiz.get(calificacion['quiz'].id, [])}
+        for calificacion in fila['calificaciones']
+    ]
     
     return render(request, 'courses/detalle_estudiante_curso.html', {
         'curso': curso,
         'estudiante': estudiante,
         'inscripcion': inscripcion,
         'datos_quizzes': datos_quizzes,
-        'promedio_general': promedio_general,
+        'promedio_general': fila['promedio'],
+        'quizzes_completados': fila['quizzes_completados'],
+        'total_quizzes': fila['total_quizzes'],
     })
\ No newline at end of file
@@ -1,9 +1,15 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.utils import timezone
-from datetime import timedelta
-from .models import Notificacion, Quiz, Enrollment
+from django.http import HttpResponse, StreamingHttpResponse
+from accounts.models import User
+from .models import Notificacion
+from .notificaciones import generar_notificaciones_deadlines
+from .eventos import en_vivo, flujo_eventos
+from .paginacion import paginar_por_cursor
+
+
+NOTIFICACIONES_POR_PAGINA = 20
 
 
 @login_required
@@ -13,21 +19,48 @@ def mis_notificaciones(request):
     
     # Marcar como leídas si el usuario lo solicita
     if request.GET.get('marcar_leidas'):
-        notificaciones.filter(leida=False).update(leida=True)
+        marcadas = notificaciones.filter(leida=False).update(leida=True)
+        User.ajustar_no_leidas({request.user.id: -marcadas})
         messages.success(request, 'Todas las notificaciones marcadas como leídas')
         return redirect('mis_notificaciones')
     
+    pagina = paginar_por_cursor(
+        request,
+        notificaciones.select_related('quiz', 'curso'),
+        ('-fecha_creacion', '-id'),
+        NOTIFICACIONES_POR_PAGINA
+    )
+    
     return render(request, 'courses/notificaciones.html', {
-        'notificaciones': notificaciones
+        'notificaciones': pagina.object_list,
+        'pagina': pagina,
     })
 
 
+@login_required
+async def eventos_notificaciones(request):
+    """Flujo de server-sent events con las notificaciones nuevas y el contador de no leídas"""
+    if not en_vivo(request):
+        # Sin ASGI no hay eventos; con 204 el navegador deja de reconectarse
+        return HttpResponse(status=204)
+    usuario = await request.auser()
+    ultimo_recibido = request.headers.get('Last-Event-ID', '')
+    response = StreamingHttpResponse(
+        flujo_eventos(usuario.id, int(ultimo_recibido) if ultimo_recibido.isdigit() else None),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Que Nginx no acumule los eventos
+    return response
+
+
 @login_required
 def marcar_leida(request, notificacion_id):
     """Marcar una notificación como leída"""
     notificacion = get_object_or_404(Notificacion, id=notificacion_id, usuario=request.user)
-    notificacion.leida = True
-    notificacion.save()
+    # Solo descuenta si la notificación no estaba leída (evita dobles descuentos con clics repetidos)
+    if Notificacion.objects.filter(id=notificacion.id, leida=False).update(leida=True):
+        User.ajustar_no_leidas({request.user.id: -1})
     
     # Redirigir al contenido relacionado si existe
     if notificacion.quiz:
@@ -42,79 +75,16 @@ def marcar_leida(request, notificacion_id):
 def eliminar_notificacion(request, notificacion_id):
     """Eliminar una notificación"""
     notificacion = get_object_or_404(Notificacion, id=notificacion_id, usuario=request.user)
-    notificacion.delete()
+    # Se decide por lo que se borró, no por lo leído antes: pudo marcarse como leída mientras tanto
+    no_leidas, _ = Notificacion.objects.filter(id=notificacion.id, leida=False).delete()
+    if no_leidas:
+        User.ajustar_no_leidas({request.user.id: -1})
+    else:
+        Notificacion.objects.filter(id=notificacion.id).delete()
     messages.success(request, 'Notificación eliminada')
     return redirect('mis_notificaciones')
 
 
-def generar_notificaciones_deadlines():
-    """
-    Función auxiliar para generar notificaciones de deadlines próximos.
-    Se puede llamar periódicamente con un cron job o Celery.
-    """
-    ahora = timezone.now()
-    en_24_horas = ahora + timedelta(hours=24)
-    en_3_dias = ahora + timedelta(days=3)
-    
-    # Buscar quizzes con deadline en las próximas 24 horas
-    quizzes_urgentes = Quiz.objects.filter(
-        deadline__gte=ahora,
-        deadline__lte=en_24_horas,
-        activo=True
-    )
-    
-    for quiz in quizzes_urgentes:
-        # Obtener estudiantes inscritos en el curso
-        estudiantes = Enrollment.objects.filter(curso=quiz.curso).values_list('estudiante', flat=True)
-        
-        for estudiante_id in estudiantes:
-            # Verificar si ya existe una notificación similar reciente
-            existe = Notificacion.objects.filter(
-                usuario_id=estudiante_id,
-                quiz=quiz,
-                tipo='deadline',
-                fecha_creacion__gte=ahora - timedelta(hours=12)
-            ).exists()
-            
-            if not existe:
-                Notificacion.objects.create(
-                    usuario_id=estudiante_id,
-                    tipo='deadline',
-                    titulo=f'⏰ Deadline urgente: {quiz.titulo}',
-                    mensaje=f'El quiz "{quiz.titulo}" vence en menos de 24 horas. ¡Apúrate!',
-                    quiz=quiz,
-                    curso=quiz.curso
-                )
-    
-    # Buscar quizzes con deadline en 3 días
-    quizzes_proximos = Quiz.objects.filter(
-        deadline__gte=en_24_horas,
-        deadline__lte=en_3_dias,
-        activo=True
-    )
-    
-    for quiz in quizzes_proximos:
-        estudiantes = Enrollment.objects.filter(curso=quiz.curso).values_list('estudiante', flat=True)
-        
-        for estudiante_id in estudiantes:
-            existe = Notificacion.objects.filter(
-                usuario_id=estudiante_id,
-                quiz=quiz,
-                tipo='deadline',
-                fecha_creacion__gte=ahora - timedelta(days=2)
-            ).exists()
-            
-            if not existe:
-                Notificacion.objects.create(
-                    usuario_id=estudiante_id,
-                    tipo='deadline',
-                    titulo=f'📅 Próximo deadline: {quiz.titulo}',
-                    mensaje=f'El quiz "{quiz.titulo}" vence en 3 días.',
-                    quiz=quiz,
-                    curso=quiz.curso
-                )
-
-
 @login_required
 def generar_notificaciones_manual(request):
     """Vista para generar notificaciones manualmente (solo para testing)"""
@@ -122,6 +92,7 @@ def generar_notificaciones_manual(request):
         messages.error(request, 'No tienes permiso para esta acción')
         return redirect('home')
     
-    generar_notificaciones_deadlines()
-    messages.success(request, 'Notificaciones de deadlines generadas')
+    reporte = generar_notificaciones_deadlines()
+    total = sum(ventana['creadas'] for ventana in reporte.values())
+    messages.success(request, f'Notificaciones de deadlines generadas: {total}')
     return redirect('mis_notificaciones')
\ No newline at end of file
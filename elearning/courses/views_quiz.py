@@ -2,8 +2,15 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.utils import timezone
-from .models import Curso, Quiz, Pregunta, Opcion, IntentoCuestionario, RespuestaEstudiante, Enrollment
+import json
+
+from django.http import Http404, JsonResponse
+from django.db import transaction
+from django.views.decorators.http import require_POST
+from .models import Curso, Quiz, Pregunta, Opcion, IntentoCuestionario, IntentoArchivado, RespuestaEstudiante, Enrollment
 from .forms import QuizForm, PreguntaForm, OpcionForm
+from . import autoguardado
+from .claves import obtener_clave
 
 
 @login_required
@@ -92,17 +99,20 @@ def detalle_quiz(request, quiz_id):
     is_enrolled = Enrollment.objects.filter(estudiante=request.user, curso=curso).exists()
     puede_editar = request.user.role in ['teacher', 'admin']
     
-    # Obtener intentos del estudiante
+    # Obtener intentos del estudiante (vigentes y archivados)
     intentos = []
+    intentos_realizados = 0
     puede_intentar = False
     if request.user.role == 'student' and is_enrolled:
-        intentos = IntentoCuestionario.objects.filter(
+        intentos = list(IntentoCuestionario.objects.filter(
             estudiante=request.user,
             quiz=quiz
-        ).order_by('-fecha_inicio')
+        ))
+        intentos += IntentoArchivado.objects.filter(estudiante=request.user, quiz=quiz).defer('respuestas')
+        intentos.sort(key=lambda intento: intento.fecha_inicio, reverse=True)
         
         # Verificar si puede hacer un nuevo intento
-        intentos_realizados = intentos.filter(completado=True).count()
+        intentos_realizados = sum(1 for intento in intentos if intento.completado)
         puede_intentar = (
             quiz.esta_disponible() and
             intentos_realizados < quiz.intentos_maximos
@@ -115,6 +125,7 @@ def detalle_quiz(request, quiz_id):
         'is_enrolled': is_enrolled,
         'puede_editar': puede_editar,
         'intentos': intentos,
+        'intentos_restantes': max(quiz.intentos_maximos - intentos_realizados, 0),
         'puede_intentar': puede_intentar,
     })
 
@@ -242,22 +253,34 @@ def realizar_quiz(request, quiz_id):
         messages.error(request, 'Este quiz ya no está disponible')
         return redirect('detalle_quiz', quiz_id=quiz.id)
     
-    # Verificar intentos
+    # Verificar intentos (los archivados también cuentan, por si el quiz se reabre)
     intentos_previos = IntentoCuestionario.objects.filter(
         estudiante=request.user,
         quiz=quiz,
         completado=True
-    ).count()
+    ).count() + IntentoArchivado.objects.filter(estudiante=request.user, quiz=quiz).count()
     
     if intentos_previos >= quiz.intentos_maximos:
         messages.warning(request, 'Has agotado todos tus intentos para este quiz')
         return redirect('detalle_quiz', quiz_id=quiz.id)
     
-    # Crear nuevo intento
-    intento = IntentoCuestionario.objects.create(
+    if quiz.num_preguntas == 0:
+        messages.warning(request, 'Este quiz todavía no tiene preguntas')
+        return redirect('detalle_quiz', quiz_id=quiz.id)
+    
+    # Retomar el intento sin enviar, si lo hay, en lugar de abrir otro
+    intento = IntentoCuestionario.objects.filter(
         estudiante=request.user,
-        quiz=quiz
-    )
+        quiz=quiz,
+        completado=False
+    ).order_by('-fecha_inicio').first()
+    if intento is not None:
+        messages.info(request, 'Continúas con tu intento anterior; tus respuestas guardadas siguen marcadas')
+    else:
+        intento = IntentoCuestionario.objects.create(
+            estudiante=request.user,
+            quiz=quiz
+        )
     
     return redirect('responder_quiz', intento_id=intento.id)
 
@@ -265,11 +288,11 @@ def realizar_quiz(request, quiz_id):
 @login_required
 def responder_quiz(request, intento_id):
     """Interfaz para responder el quiz"""
-    intento = get_object_or_404(IntentoCuestionario, id=intento_id)
+    intento = get_object_or_404(IntentoCuestionario.objects.select_related('quiz'), id=intento_id)
     quiz = intento.quiz
     
     # Verificar que sea el dueño del intento
-    if intento.estudiante != request.user:
+    if intento.estudiante_id != request.user.id:
         messages.error(request, 'No tienes permiso para ver este intento')
         return redirect('home')
     
@@ -278,42 +301,99 @@ def responder_quiz(request, intento_id):
         return redirect('resultado_quiz', intento_id=intento.id)
     
     preguntas = quiz.preguntas.all().prefetch_related('opciones')
+    pregunta_ids = [pregunta.id for pregunta in preguntas]
+    # Lo que el estudiante ya había elegido (autoguardado), por si la página se recargó
+    guardadas = autoguardado.selecciones_guardadas(intento, pregunta_ids)
     
     if request.method == "POST":
-        # Guardar respuestas
+        # Validar las opciones contra las preguntas ya cargadas, sin consultas por pregunta
+        respuestas = []
         for pregunta in preguntas:
+            opciones = {str(opcion.id): opcion for opcion in pregunta.opciones.all()}
             opcion_id = request.POST.get(f'pregunta_{pregunta.id}')
             if opcion_id:
-                opcion = get_object_or_404(Opcion, id=opcion_id)
-                RespuestaEstudiante.objects.update_or_create(
+                if opcion_id not in opciones:
+                    raise Http404('La opción seleccionada no pertenece a la pregunta')
+            else:
+                # Sin respuesta en el formulario (por ejemplo, envío automático por tiempo): vale la autoguardada
+                opcion_id = str(guardadas.get(pregunta.id))
+            if opcion_id in opciones:
+                respuestas.append(RespuestaEstudiante(
                     intento=intento,
                     pregunta=pregunta,
-                    defaults={'opcion_seleccionada': opcion}
-                )
+                    opcion_seleccionada=opciones[opcion_id]
+                ))
         
-        # Calcular resultado
-        intento.calcular_resultado()
+        # Guardar todas las respuestas y calcular el resultado en una sola transacción
+        with transaction.atomic():
+            RespuestaEstudiante.objects.bulk_create(
+                respuestas,
+                update_conflicts=True,
+                unique_fields=['intento', 'pregunta'],
+                update_fields=['opcion_seleccionada'],
+            )
+            intento.calcular_resultado(respuestas)
+            autoguardado.descartar(intento.id, pregunta_ids)
         messages.success(request, 'Quiz completado. Aquí están tus resultados.')
         return redirect('resultado_quiz', intento_id=intento.id)
     
     return render(request, 'courses/responder_quiz.html', {
         'intento': intento,
         'quiz': quiz,
-        'preguntas': preguntas
+        'preguntas': preguntas,
+        'seleccionadas': set(guardadas.values()),
     })
 
 
+@login_required
+@require_POST
+def autoguardar_respuesta(request, intento_id):
+    """
+    Guarda una respuesta mientras se resuelve el quiz. Recibe JSON
+    `{"pregunta": id, "opcion": id}`; con `"forzar": true` (al salir de la
+    página) además escribe en la base de datos todo lo pendiente.
+    """
+    intento = get_object_or_404(IntentoCuestionario, id=intento_id, estudiante=request.user)
+    if intento.completado:
+        return JsonResponse({'error': 'El intento ya fue enviado'}, status=409)
+    
+    try:
+        datos = json.loads(request.body)
+        forzar = bool(datos.get('forzar'))
+        pregunta_id = int(datos['pregunta']) if 'pregunta' in datos else None
+        opcion_id = int(datos['opcion']) if pregunta_id is not None else None
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return JsonResponse({'error': 'Se esperaba {"pregunta": id, "opcion": id}'}, status=400)
+    
+    clave = obtener_clave(intento.quiz_id)
+    if pregunta_id is None:
+        if not forzar:
+            return JsonResponse({'error': 'Falta la pregunta'}, status=400)
+        autoguardado.escribir_pendientes(intento, clave.puntos)
+        return JsonResponse({'pendientes': 0, 'escrito': True})
+    
+    if not clave.opcion_valida(pregunta_id, opcion_id):
+        return JsonResponse({'error': 'La opción no pertenece a una pregunta de este quiz'}, status=400)
+    pendientes, escrito = autoguardado.registrar(intento, pregunta_id, opcion_id, clave.puntos, forzar=forzar)
+    return JsonResponse({'pendientes': pendientes, 'escrito': escrito})
+
+
 @login_required
 def resultado_quiz(request, intento_id):
-    """Ver el resultado de un intento"""
-    intento = get_object_or_404(IntentoCuestionario, id=intento_id)
+    """Ver el resultado de un intento (vigente o archivado)"""
+    intento = IntentoCuestionario.objects.filter(id=intento_id).first()
+    if intento is None:
+        intento = get_object_or_404(IntentoArchivado, id=intento_id)
     
     # Verificar permisos
-    if intento.estudiante != request.user and request.user.role not in ['teacher', 'admin']:
+    if intento.estudiante_id != request.user.id and request.user.role not in ['teacher', 'admin']:
         messages.error(request, 'No tienes permiso para ver este resultado')
         return redirect('home')
     
-    respuestas = intento.respuestas.all().select_related('pregunta', 'opcion_seleccionada')
+    if isinstance(intento, IntentoArchivado):
+        respuestas = intento.respuestas_detalle()
+    else:
+        respuestas = intento.respuestas.all().select_related('pregunta', 'opcion_seleccionada')
     
     return render(request, 'courses/resultado_quiz.html', {
         'intento': intento,
@@ -0,0 +1,125 @@
+"""
+Configuración de la base de datos a partir de variables de entorno.
+
+Sin variables se usa SQLite en `db.sqlite3`: las escrituras concurrentes (por
+ejemplo, varios estudiantes enviando un quiz) esperan su turno en lugar de
+fallar con "database is locked". `ELEARNING_DB_JOURNAL=WAL` activa además el
+modo WAL, en el que los lectores no esperan a los escritores; no es el valor
+por defecto porque queda grabado en el archivo y `db.sqlite3` es la base de
+desarrollo que viene en el repositorio. Con `ELEARNING_DB_MOTOR=postgresql` se
+usa PostgreSQL con un pool de conexiones o, si el pool se desactiva, con
+conexiones persistentes.
+
+`ELEARNING_DB_REPLICA` agrega el alias `replica` para las vistas de reportes
+(ver courses/replica.py): en SQLite es la ruta de una copia que se refresca
+con `manage.py actualizar_replica`; en PostgreSQL, el host de una réplica.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+# 256 MB de la base mapeados en memoria: las lecturas no copian páginas al cache de SQLite
+MMAP_SQLITE = 256 * 1024 * 1024
+
+
+def _entero(nombre, por_defecto):
+    valor = os.environ.get(nombre, '')
+    return int(valor) if valor.strip() else por_defecto
+
+
+def configuracion_base_datos(base_dir):
+    """Retorna el dict de `DATABASES['default']` según `ELEARNING_DB_MOTOR`"""
+    motor = os.environ.get('ELEARNING_DB_MOTOR', 'sqlite').lower()
+    if motor in ('postgresql', 'postgres'):
+        return _postgresql()
+    if motor != 'sqlite':
+        raise ImproperlyConfigured(f'ELEARNING_DB_MOTOR debe ser "sqlite" o "postgresql", no "{motor}"')
+    return _sqlite(base_dir)
+
+
+def configuracion_replica(principal):
+    """Dict del alias `replica` a partir de la configuración principal, o None si no hay réplica"""
+    destino = os.environ.get('ELEARNING_DB_REPLICA')
+    if not destino:
+        return None
+    if principal['ENGINE'] == 'django.db.backends.sqlite3':
+        replica = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            # Solo lectura: la copia se reemplaza completa y nunca debe crear su propio WAL
+            'NAME': f'file:{destino}?mode=ro',
+            'OPTIONS': {
+                'init_command': f"PRAGMA mmap_size={_entero('ELEARNING_DB_MMAP', MMAP_SQLITE)}",
+                'timeout': _entero('ELEARNING_DB_TIMEOUT', 20),
+            },
+        }
+    else:
+        replica = {
+            **principal,
+            'HOST': destino,
+            'PORT': os.environ.get('ELEARNING_DB_REPLICA_PUERTO', principal['PORT']),
+            'OPTIONS': {**principal['OPTIONS']},
+        }
+    # En las pruebas la réplica es la misma base que la principal
+    replica['TEST'] = {'MIRROR': 'default'}
+    return replica
+
+
+def _sqlite(base_dir):
+    # Sin ELEARNING_DB_JOURNAL no se toca el modo del archivo (el journal_mode se guarda en la base)
+    journal = os.environ.get('ELEARNING_DB_JOURNAL', '').strip().upper()
+    pragmas = [
+        f"PRAGMA mmap_size={_entero('ELEARNING_DB_MMAP', MMAP_SQLITE)}",
+        'PRAGMA temp_store=MEMORY',
+    ]
+    if journal:
+        pragmas += [
+            f'PRAGMA journal_mode={journal}',
+            # Con WAL, NORMAL sigue siendo seguro ante caídas de la aplicación y evita un fsync por commit
+            f"PRAGMA synchronous={'NORMAL' if journal == 'WAL' else 'FULL'}",
+        ]
+    return {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('ELEARNING_DB_NOMBRE') or base_dir / 'db.sqlite3',
+        'OPTIONS': {
+            'init_command': ';'.join(pragmas),
+            # Segundos que una escritura espera el bloqueo antes de fallar (busy timeout)
+            'timeout': _entero('ELEARNING_DB_TIMEOUT', 20),
+            # Las transacciones toman el bloqueo de escritura al empezar: así una transacción que
+            # leyó y luego escribe no choca con otra y falla sin esperar el busy timeout. El costo:
+            # todo atomic(), aunque solo lea, excluye a los demás escritores mientras dura, así que
+            # las transacciones deben ser cortas y las lecturas largas van fuera de atomic()
+            'transaction_mode': 'IMMEDIATE',
+        },
+    }
+
+
+def _postgresql():
+    configuracion = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('ELEARNING_DB_NOMBRE', 'elearning'),
+        'USER': os.environ.get('ELEARNING_DB_USUARIO', ''),
+        'PASSWORD': os.environ.get('ELEARNING_DB_CLAVE', ''),
+        'HOST': os.environ.get('ELEARNING_DB_HOST', ''),
+        'PORT': os.environ.get('ELEARNING_DB_PUERTO', ''),
+        # Antes de reutilizar una conexión se verifica que siga viva
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
+    }
+
+    pool = _entero('ELEARNING_DB_POOL', 10)
+    if pool > 0:
+        # Pool de psycopg (requiere `psycopg[pool]`); Django no permite combinarlo con CONN_MAX_AGE
+        configuracion['CONN_MAX_AGE'] = 0
+        configuracion['OPTIONS']['pool'] = {
+            'min_size': min(2, pool),
+            'max_size': pool,
+            'timeout': _entero('ELEARNING_DB_POOL_TIMEOUT', 10),
+        }
+    else:
+        # Sin pool: cada proceso conserva su conexión entre peticiones
+        configuracion['CONN_MAX_AGE'] = _entero('ELEARNING_DB_CONN_MAX_AGE', 60)
+
+    if os.environ.get('ELEARNING_DB_PGBOUNCER'):
+        # PgBouncer en modo transacción no conserva los cursores del lado del servidor
+        configuracion['DISABLE_SERVER_SIDE_CURSORS'] = True
+    return configuracion
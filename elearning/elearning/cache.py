@@ -0,0 +1,31 @@
+"""
+Configuración del cache a partir de variables de entorno.
+
+Sin variables se usa el cache en memoria de cada proceso: basta para
+`runserver` o un solo proceso. Con varios procesos (por ejemplo
+`uvicorn --workers 4`) el cache debe ser compartido para que todos vean lo
+mismo: `ELEARNING_CACHE=redis://host:6379/0` usa Redis (requiere el paquete
+`redis`) y `ELEARNING_CACHE=db` una tabla de la base de datos (crearla con
+`manage.py createcachetable`).
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+# Backends cuyo contenido no ven los demás procesos
+CACHES_LOCALES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def configuracion_cache():
+    """Retorna el dict de `CACHES` según `ELEARNING_CACHE`"""
+    destino = os.environ.get('ELEARNING_CACHE', '').strip()
+    if not destino:
+        return {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    if destino.startswith(('redis://', 'rediss://')):
+        return {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': destino}}
+    if destino == 'db':
+        return {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'elearning_cache'}}
+    raise ImproperlyConfigured(f'ELEARNING_CACHE debe ser una URL redis:// o "db", no "{destino}"')
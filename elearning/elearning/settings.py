@@ -1,6 +1,9 @@
 from pathlib import Path
 import os
 
+from .base_datos import configuracion_base_datos, configuracion_replica
+from .cache import configuracion_cache
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -27,6 +30,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'courses.rendimiento.MedicionRendimientoMiddleware',  # Solo actúa con RENDIMIENTO_ACTIVO = True
+    'courses.replica.PrimariaTrasEscrituraMiddleware',  # Solo actúa si hay una base 'replica'
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -48,6 +53,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'courses.eventos.contexto_eventos',
             ],
         },
     },
@@ -57,12 +63,20 @@ WSGI_APPLICATION = 'elearning.wsgi.application'
 
 
 # Database
+# SQLite (WAL) por defecto o PostgreSQL con ELEARNING_DB_MOTOR=postgresql; ver elearning/base_datos.py
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': configuracion_base_datos(BASE_DIR),
 }
+_replica = configuracion_replica(DATABASES['default'])
+if _replica:
+    DATABASES['replica'] = _replica
+
+# Los reportes leen de la réplica (si existe), salvo justo después de que el usuario escribió algo
+DATABASE_ROUTERS = ['courses.replica.EnrutadorReplica']
+REPLICA_PRIMARIA_SEGUNDOS = 30
+
+# En memoria de cada proceso por defecto; con varios procesos, ELEARNING_CACHE (ver elearning/cache.py)
+CACHES = configuracion_cache()
 
 
 # Password validation
@@ -97,6 +111,47 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Subidas de documentos por fragmentos: se ensamblan aquí y luego se mueven a MEDIA_ROOT
+# (conviene que esté en el mismo disco para que el movimiento sea un simple rename)
+SUBIDAS_DIR = BASE_DIR / 'subidas'
+
+# Descargas de documentos: None (las sirve Django), 'x-accel-redirect' (Nginx) o 'x-sendfile' (Apache)
+DESCARGAS_ACELERADAS = None
+DESCARGAS_ACCEL_PREFIJO = '/protegido/'
+
+# Medición de rendimiento por petición (ver `manage.py perfreport`)
+RENDIMIENTO_ACTIVO = False
+RENDIMIENTO_ARCHIVO = BASE_DIR / 'rendimiento.sqlite3'
+RENDIMIENTO_PRESUPUESTO_MS = 500
+RENDIMIENTO_PRESUPUESTO_CONSULTAS = 30
+
+# Notificaciones en vivo (server-sent events, con ASGI): cada cuánto se revisa la base de datos
+EVENTOS_INTERVALO_SEGUNDOS = 2
+
+# Autoguardado de respuestas de quizzes: se escriben en la base de datos cada tantos cambios o segundos
+AUTOGUARDADO_MAXIMO_PENDIENTES = 10
+AUTOGUARDADO_SEGUNDOS = 60
+
+# Intentos sin enviar más antiguos que esto se califican o eliminan con `manage.py barrer_intentos`
+INTENTOS_ABANDONADOS_HORAS = 24
+
+# Intentos de cursos cerrados más antiguos que esto se mueven al archivo con `manage.py archivar_intentos`
+ARCHIVO_INTENTOS_DIAS = 180
+
+# Retención de notificaciones (`manage.py purgar_notificaciones`): días que se conservan las leídas
+# de cada tipo (None: para siempre) y días tras los que se eliminan también las no leídas
+NOTIFICACIONES_RETENCION_DIAS = {
+    'deadline': 30,
+    'nuevo_quiz': 90,
+    'resultado': 365,
+    'curso': 90,
+}
+NOTIFICACIONES_NO_LEIDAS_DIAS = 365
+
+# Cambios de quizzes que el programador de deadlines no consumió (porque no estaba corriendo)
+# se eliminan pasados estos días con `manage.py generar_notificaciones_deadlines`
+CAMBIOS_QUIZ_RETENCION_DIAS = 1
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
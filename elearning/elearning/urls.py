@@ -4,6 +4,7 @@ from accounts.views import register_view, login_view, logout_view
 from django.contrib import admin
 from django.conf import settings
 from django.conf.urls.static import static
+from courses.views_archivos import DIRECTORIO_DOCUMENTOS, documento_en_media, servir_miniatura
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -16,4 +17,8 @@ urlpatterns = [
 
 # El manejo de medios SIEMPRE hasta el final
 if settings.DEBUG:
+    # Las miniaturas tienen nombres inmutables: se sirven con cache de larga duración
+    urlpatterns += static(settings.MEDIA_URL + 'cursos/miniaturas/', view=servir_miniatura)
+    # Los documentos de lecciones no se sirven directamente: pasan por la descarga que verifica la inscripción
+    urlpatterns += static(settings.MEDIA_URL + DIRECTORIO_DOCUMENTOS, view=documento_en_media)
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)